@@ -0,0 +1 @@
+"""Audit of pliegos (tender documents) for tenders that passed triage."""
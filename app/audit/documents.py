@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+from typing import BinaryIO, Callable, ContextManager, Iterator, List, Mapping, Optional, Tuple
+
+from app.capture.database import Database
+from app.capture.transport import HttpTransport, RateLimiter, is_http_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("data/runtime/pliegos")
+READ_CHUNK_BYTES = 256 * 1024
+
+# Links every document URI of a tender that currently passes the hard filter.
+LINK_PASSED_SQL = """
+    INSERT OR IGNORE INTO tender_documents (tender_id, url)
+    SELECT t.id, j.value
+    FROM tenders_filtered AS f
+    JOIN tenders_raw AS t ON t.id = f.tender_id, json_each(t.document_urls) AS j
+    WHERE f.passed_filter = 1 AND j.value != ''
+"""
+
+# URLs never fetched, or failed fewer than ``max_attempts`` times, of tenders still passing the filter.
+PENDING_URLS_SQL = """
+    SELECT DISTINCT d.url
+    FROM tender_documents AS d
+    JOIN tenders_filtered AS p ON p.tender_id = d.tender_id AND p.passed_filter = 1
+    LEFT JOIN document_fetches AS f ON f.url = d.url
+    WHERE f.url IS NULL OR (f.sha256 IS NULL AND f.attempts < ?)
+    ORDER BY d.url
+    LIMIT ?
+"""
+
+RECORD_FETCH_SQL = """
+    INSERT INTO document_fetches (url, sha256, size, content_type, etag, last_modified, fetched_at, attempts, error)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+    ON CONFLICT(url) DO UPDATE
+    SET sha256 = excluded.sha256,
+        size = excluded.size,
+        content_type = excluded.content_type,
+        etag = excluded.etag,
+        last_modified = excluded.last_modified,
+        fetched_at = excluded.fetched_at,
+        attempts = document_fetches.attempts + 1,
+        error = excluded.error
+"""
+
+# A failed attempt keeps the hash, size and validators of an earlier successful fetch.
+RECORD_FAILURE_SQL = """
+    INSERT INTO document_fetches (url, fetched_at, attempts, error)
+    VALUES (?, ?, 1, ?)
+    ON CONFLICT(url) DO UPDATE
+    SET fetched_at = excluded.fetched_at,
+        attempts = document_fetches.attempts + 1,
+        error = excluded.error
+"""
+
+# Least recently used blobs first.
+LRU_BLOBS_SQL = "SELECT sha256, size FROM document_blobs ORDER BY last_used_at, sha256"
+
+
+def ensure_document_tables(conn: sqlite3.Connection) -> None:
+    """Create the document link, fetch and cache index tables; stages reading them call this first."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tender_documents (
+            tender_id INTEGER NOT NULL REFERENCES tenders_raw (id),
+            url TEXT NOT NULL,
+            PRIMARY KEY (tender_id, url)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tender_documents_url ON tender_documents (url)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_fetches (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT,
+            size INTEGER,
+            content_type TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_document_fetches_sha256 ON document_fetches (sha256)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            stored_at TEXT NOT NULL,
+            last_used_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_document_blobs_lru ON document_blobs (last_used_at)")
+
+
+# Opens a document URL and yields its body and response headers.
+DocumentOpener = Callable[[str], ContextManager[Tuple[BinaryIO, Mapping[str, str]]]]
+
+
+def blob_path(cache_dir: Path, sha256: str) -> Path:
+    """Where the cache keeps the document with this content hash."""
+    return cache_dir / sha256[:2] / sha256
+
+
+@dataclass(slots=True)
+class DocumentFetchConfig:
+    cache_dir: Path = DEFAULT_CACHE_DIR
+    max_cache_bytes: int = 2 * 1024**3
+    # Larger responses are abandoned; a pliego is rarely above a few dozen MB.
+    max_document_bytes: int = 100 * 1024**2
+    workers: int = 4
+    requests_per_second: float = 2.0
+    timeout_seconds: float = 60
+    max_attempts: int = 3
+
+
+@dataclass(slots=True)
+class DocumentFetchResult:
+    linked: int = 0
+    downloaded: int = 0
+    # Downloads whose content was already stored under another URL.
+    reused: int = 0
+    failed: int = 0
+    evicted: int = 0
+    evicted_bytes: int = 0
+
+
+@dataclass(slots=True)
+class _Download:
+    url: str
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    partial_path: Path
+
+
+class DocumentFetcher:
+    """Download the pliegos of tenders that passed the hard filter into a content-addressed cache.
+
+    Document URIs come from ``tenders_raw.document_urls`` (captured from the
+    CODICE ``DocumentReference``/``Attachment`` elements). Each run links the
+    URIs of passing tenders in ``tender_documents`` and downloads the ones not
+    fetched yet on a small thread pool. Each download streams to disk while it
+    is hashed, and the file is stored as ``<cache_dir>/<sha256[:2]>/<sha256>``.
+    The same pliego published under several lots or republications is
+    therefore stored once.
+
+    ``document_fetches`` maps each URL to its hash, size and HTTP validators.
+    ``document_blobs`` holds one row per stored file with its last use. When
+    the cache grows past ``max_cache_bytes``, the least recently used files are
+    evicted. Their URL rows stay, and ``path_for`` downloads them again on
+    demand.
+
+    Only http(s) URLs are fetched: the URIs come from the remote feed. Tests
+    pass their own ``opener`` instead of the HTTP transport.
+
+    Every SQLite write happens on the calling thread; workers only download.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        config: Optional[DocumentFetchConfig] = None,
+        transport: Optional[HttpTransport] = None,
+        database: Optional[Database] = None,
+        opener: Optional[DocumentOpener] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.config = config or DocumentFetchConfig()
+        self._open = opener or self._open_http
+        self.database = database or Database.shared(db_path)
+        self.transport = transport or HttpTransport(
+            timeout_seconds=self.config.timeout_seconds,
+            rate_limiter=RateLimiter(self.config.requests_per_second, burst=self.config.workers),
+        )
+        self.config.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            ensure_document_tables(conn)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def run(self, limit: Optional[int] = None) -> DocumentFetchResult:
+        result = DocumentFetchResult()
+        with self.database.transaction() as conn:
+            # Before the first hard-filter run no tender has passed triage.
+            if not _table_exists(conn, "tenders_filtered"):
+                return result
+            result.linked = conn.execute(LINK_PASSED_SQL).rowcount
+            # Each pending URL is tried once per run; the transport already retries transient errors.
+            pending = conn.execute(PENDING_URLS_SQL, (self.config.max_attempts, -1 if limit is None else limit))
+            urls = [row[0] for row in pending]
+        if urls:
+            self._fetch_all(urls, result)
+        result.evicted, result.evicted_bytes = self.evict()
+        logger.info(
+            "Pliego fetch finished. linked=%s downloaded=%s reused=%s failed=%s evicted=%s",
+            result.linked,
+            result.downloaded,
+            result.reused,
+            result.failed,
+            result.evicted,
+        )
+        return result
+
+    def path_for(self, url: str) -> Optional[Path]:
+        """Cached file for ``url``, downloaded again if it was evicted; ``None`` when it cannot be fetched."""
+        with self.database.connection() as conn:
+            row = conn.execute("SELECT sha256 FROM document_fetches WHERE url = ?", (url,)).fetchone()
+        if row and row[0]:
+            path = self.blob_path(row[0])
+            if path.exists():
+                self._touch(row[0])
+                return path
+        result = DocumentFetchResult()
+        self._fetch_all([url], result)
+        with self.database.connection() as conn:
+            row = conn.execute("SELECT sha256 FROM document_fetches WHERE url = ?", (url,)).fetchone()
+        # A failed refetch keeps the earlier hash, whose file may have been evicted.
+        path = self.blob_path(row[0]) if row and row[0] else None
+        return path if path is not None and path.exists() else None
+
+    def documents_for(self, tender_id: int) -> List[Tuple[str, Optional[str]]]:
+        """``(url, sha256)`` of every linked document of a tender; the hash is ``None`` until fetched."""
+        with self.database.connection() as conn:
+            return conn.execute(
+                """
+                SELECT d.url, f.sha256
+                FROM tender_documents AS d
+                LEFT JOIN document_fetches AS f ON f.url = d.url
+                WHERE d.tender_id = ?
+                ORDER BY d.url
+                """,
+                (tender_id,),
+            ).fetchall()
+
+    def blob_path(self, sha256: str) -> Path:
+        return blob_path(self.config.cache_dir, sha256)
+
+    def evict(self) -> Tuple[int, int]:
+        """Drop least recently used files until the cache fits ``max_cache_bytes``; return ``(files, bytes)``."""
+        evicted: List[Tuple[str, int]] = []
+        with self.database.transaction() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM document_blobs").fetchone()[0]
+            if total <= self.config.max_cache_bytes:
+                return 0, 0
+            for sha256, size in conn.execute(LRU_BLOBS_SQL).fetchall():
+                if total <= self.config.max_cache_bytes:
+                    break
+                evicted.append((sha256, size))
+                total -= size
+            conn.executemany("DELETE FROM document_blobs WHERE sha256 = ?", [(sha256,) for sha256, _ in evicted])
+        for sha256, _ in evicted:
+            self.blob_path(sha256).unlink(missing_ok=True)
+        freed = sum(size for _, size in evicted)
+        logger.info("Evicted %s cached pliegos (%s bytes)", len(evicted), freed)
+        return len(evicted), freed
+
+    def _fetch_all(self, urls: List[str], result: DocumentFetchResult) -> None:
+        with ThreadPoolExecutor(max_workers=max(self.config.workers, 1), thread_name_prefix="pliego-fetch") as pool:
+            futures = {pool.submit(self._download, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    download = future.result()
+                except Exception as exc:
+                    logger.warning("Could not fetch pliego %s: %r", url, exc)
+                    self._record_failure(url, exc)
+                    result.failed += 1
+                    continue
+                if self._store(download):
+                    result.downloaded += 1
+                else:
+                    result.reused += 1
+
+    def _download(self, url: str) -> _Download:
+        if not is_http_url(url):
+            raise ValueError(f"Refusing to fetch a non-HTTP document URL: {url}")
+        digest = hashlib.sha256()
+        size = 0
+        partial_dir = self.config.cache_dir / "partial"
+        partial_dir.mkdir(exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=partial_dir, delete=False)
+        try:
+            with handle, self._open(url) as (body, headers):
+                for chunk in iter(lambda: body.read(READ_CHUNK_BYTES), b""):
+                    size += len(chunk)
+                    if size > self.config.max_document_bytes:
+                        raise ValueError(f"{url} is larger than {self.config.max_document_bytes} bytes")
+                    digest.update(chunk)
+                    handle.write(chunk)
+        except BaseException:
+            os.unlink(handle.name)
+            raise
+        return _Download(
+            url=url,
+            sha256=digest.hexdigest(),
+            size=size,
+            content_type=headers.get("Content-Type"),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            partial_path=Path(handle.name),
+        )
+
+    @contextmanager
+    def _open_http(self, url: str) -> Iterator[Tuple[BinaryIO, Mapping[str, str]]]:
+        with self.transport.open(url, {"Accept": "*/*"}) as response:
+            yield response.body, response.headers
+
+    def _store(self, download: _Download) -> bool:
+        """Move the download into the cache and index it; ``False`` when the content was already stored."""
+        now = datetime.now(timezone.utc).isoformat()
+        target = self.blob_path(download.sha256)
+        with self.database.transaction() as conn:
+            known = conn.execute("SELECT 1 FROM document_blobs WHERE sha256 = ?", (download.sha256,)).fetchone()
+            if known is not None and target.exists():
+                download.partial_path.unlink()
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(download.partial_path, target)
+            conn.execute(
+                """
+                INSERT INTO document_blobs (sha256, size, stored_at, last_used_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET last_used_at = excluded.last_used_at
+                """,
+                (download.sha256, download.size, now, now),
+            )
+            conn.execute(
+                RECORD_FETCH_SQL,
+                (
+                    download.url,
+                    download.sha256,
+                    download.size,
+                    download.content_type,
+                    download.etag,
+                    download.last_modified,
+                    now,
+                    None,
+                ),
+            )
+        return known is None
+
+    def _record_failure(self, url: str, exc: Exception) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self.database.transaction() as conn:
+            conn.execute(RECORD_FAILURE_SQL, (url, now, repr(exc)))
+
+    def _touch(self, sha256: str) -> None:
+        with self.database.transaction() as conn:
+            conn.execute(
+                "UPDATE document_blobs SET last_used_at = ? WHERE sha256 = ?",
+                (datetime.now(timezone.utc).isoformat(), sha256),
+            )
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
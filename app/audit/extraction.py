@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+import re
+import shutil
+import subprocess
+from typing import List, Optional, Sequence, Tuple
+import unicodedata
+from xml.etree import ElementTree as ET
+import zipfile
+
+from app.scoring.features import normalize_text
+
+try:  # pypdf when installed; otherwise poppler's pdftotext if it is on PATH
+    from pypdf import PdfReader
+
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+MAX_CHUNK_CHARS = 2000
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_ODT_TEXT_NS = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+# Section headings of a pliego: "CLÁUSULA 12.", "ANEXO II", "CAPÍTULO IV", "3.2 Solvencia técnica"...
+_KEYWORD_HEADING_RE = re.compile(
+    r"(?:cl[aá]usula|cap[ií]tulo|anexo|art[ií]culo|t[ií]tulo|secci[oó]n|apartado)\b", re.IGNORECASE
+)
+_NUMBERED_HEADING_RE = re.compile(r"\d{1,2}(?:\.\d{1,2}){0,3}\.?\s+[A-ZÁÉÍÓÚÑ]")
+_MAX_HEADING_CHARS = 140
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACES_RE = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Clause kinds recognised from section headings (accent-free, lower case); first match wins.
+CLAUSE_KINDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("criterios_adjudicacion", ("criterios de adjudicacion", "criterios de valoracion", "criterios de evaluacion")),
+    ("solvencia", ("solvencia",)),
+    ("presupuesto", ("presupuesto", "valor estimado", "precio del contrato")),
+    ("plazo", ("plazo de ejecucion", "duracion del contrato", "plazo de duracion")),
+    ("garantias", ("garantia",)),
+    ("penalidades", ("penalidad",)),
+    ("subcontratacion", ("subcontratacion",)),
+)
+
+
+class UnsupportedDocument(Exception):
+    """No extractor available for the document's format."""
+
+
+@dataclass(slots=True)
+class TextChunk:
+    ordinal: int
+    heading: str
+    kind: str
+    text: str
+
+
+def extract_text(path: Path) -> Tuple[str, str]:
+    """Return ``(extractor, text)`` for a cached document, sniffing its format from the content."""
+    with path.open("rb") as handle:
+        head = handle.read(8)
+    if head.startswith(b"%PDF"):
+        return _extract_pdf(path)
+    if head.startswith(b"PK"):
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            if "word/document.xml" in names:
+                return "docx", _paragraphs_text(archive.read("word/document.xml"), f"{_WORD_NS}p", f"{_WORD_NS}t")
+            if "content.xml" in names:
+                return "odt", _paragraphs_text(archive.read("content.xml"), f"{_ODT_TEXT_NS}p", None)
+        raise UnsupportedDocument("zip archive without a word processing document")
+    data = path.read_bytes()
+    text = _decode(data)
+    if text is None:
+        raise UnsupportedDocument(f"binary format {head[:4]!r}")
+    if re.search(r"<(?:html|body|p|div)\b", text[:4096], re.IGNORECASE):
+        return "html", _html_text(text)
+    return "text", text
+
+
+def normalize_document_text(text: str) -> str:
+    """NFC, words split across lines re-joined, runs of spaces and blank lines collapsed."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    text = "\n".join(_SPACES_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def split_sections(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[TextChunk]:
+    """Split normalised text at section headings, then into chunks of at most ``max_chars`` on line boundaries.
+
+    Each chunk keeps the heading of its section and the clause kind recognised from it.
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for line in text.split("\n"):
+        if _is_heading(line):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+
+    chunks: List[TextChunk] = []
+    for heading, lines in sections:
+        kind = clause_kind(heading)
+        first = len(chunks)
+        buffer: List[str] = []
+        size = 0
+        for line in lines:
+            if buffer and size + len(line) > max_chars:
+                chunks.append(TextChunk(len(chunks), heading, kind, "\n".join(buffer).strip()))
+                buffer, size = [], 0
+            # Lines longer than a chunk (text without line breaks) are cut as they are.
+            while len(line) > max_chars:
+                chunks.append(TextChunk(len(chunks), heading, kind, line[:max_chars]))
+                line = line[max_chars:]
+            buffer.append(line)
+            size += len(line) + 1
+        body = "\n".join(buffer).strip()
+        # A heading right before its subsections still gets a (bodiless) chunk so it can be found.
+        if body or (heading and len(chunks) == first):
+            chunks.append(TextChunk(len(chunks), heading, kind, body))
+    return chunks
+
+
+def _is_heading(line: str) -> bool:
+    if not line or len(line) > _MAX_HEADING_CHARS or line.endswith((",", ";")):
+        return False
+    return bool(_KEYWORD_HEADING_RE.match(line) or _NUMBERED_HEADING_RE.match(line))
+
+
+def clause_kind(heading: str) -> str:
+    normalized = normalize_text(heading)
+    for kind, keywords in CLAUSE_KINDS:
+        if any(keyword in normalized for keyword in keywords):
+            return kind
+    return ""
+
+
+def extract_chunks(sha256: str, path: str, max_chars: int = MAX_CHUNK_CHARS) -> Tuple[str, str, List[TextChunk], str]:
+    """Process-pool entry point: ``(sha256, extractor, chunks, error)``; never raises."""
+    try:
+        extractor, text = extract_text(Path(path))
+    except UnsupportedDocument as exc:
+        return sha256, "", [], f"unsupported: {exc}"
+    except Exception as exc:
+        return sha256, "", [], repr(exc)
+    return sha256, extractor, split_sections(normalize_document_text(text), max_chars), ""
+
+
+def _extract_pdf(path: Path) -> Tuple[str, str]:
+    if HAS_PYPDF:
+        reader = PdfReader(str(path))
+        return "pypdf", "\n".join(page.extract_text() or "" for page in reader.pages)
+    pdftotext = shutil.which("pdftotext")
+    if pdftotext:
+        completed = subprocess.run(
+            [pdftotext, "-layout", "-enc", "UTF-8", str(path), "-"],
+            capture_output=True,
+            check=True,
+            timeout=300,
+        )
+        return "pdftotext", completed.stdout.decode("utf-8", errors="replace")
+    raise UnsupportedDocument("PDF needs pypdf or pdftotext")
+
+
+def _paragraphs_text(xml: bytes, paragraph_tag: str, text_tag: Optional[str]) -> str:
+    root = ET.fromstring(xml)
+    paragraphs = []
+    for paragraph in root.iter(paragraph_tag):
+        if text_tag is None:
+            paragraphs.append("".join(paragraph.itertext()))
+        else:
+            paragraphs.append("".join(node.text or "" for node in paragraph.iter(text_tag)))
+    return "\n".join(paragraphs)
+
+
+def _decode(data: bytes) -> Optional[str]:
+    if b"\x00" in data[:4096]:
+        return None
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+class _HtmlText(HTMLParser):
+    _BLOCKS = frozenset("p div br li tr h1 h2 h3 h4 h5 h6 table section article".split())
+    _SKIP = frozenset(("script", "style"))
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: Sequence[Tuple[str, Optional[str]]]) -> None:
+        if tag in self._SKIP:
+            self._skipping += 1
+        elif tag in self._BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in self._BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def _html_text(html: str) -> str:
+    parser = _HtmlText()
+    parser.feed(html)
+    parser.close()
+    return "".join(parser.parts)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+from pathlib import Path
+import sqlite3
+from typing import List, Optional, Tuple
+
+from app.audit.documents import DEFAULT_CACHE_DIR, blob_path, ensure_document_tables
+from app.audit.extraction import MAX_CHUNK_CHARS, TextChunk, extract_chunks
+from app.capture.database import Database
+from app.capture.search import to_fts_query
+
+logger = logging.getLogger(__name__)
+
+# Cached documents whose content hash has not been extracted yet.
+PENDING_BLOBS_SQL = """
+    SELECT b.sha256
+    FROM document_blobs AS b
+    LEFT JOIN document_texts AS t ON t.sha256 = b.sha256
+    WHERE t.sha256 IS NULL
+    ORDER BY b.stored_at
+    LIMIT ?
+"""
+
+# Content hashes of every fetched document of a tender.
+TENDER_HASHES_SQL = """
+    SELECT f.sha256
+    FROM tender_documents AS d
+    JOIN document_fetches AS f ON f.url = d.url
+    WHERE d.tender_id = ? AND f.sha256 IS NOT NULL
+"""
+
+INSERT_TEXT_SQL = """
+    INSERT OR REPLACE INTO document_texts (sha256, extractor, chars, chunks, extracted_at, error)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_CHUNK_SQL = """
+    INSERT INTO document_chunks (sha256, ordinal, heading, kind, text) VALUES (?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(slots=True)
+class ExtractionRunResult:
+    extracted: int = 0
+    chunks: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class ClauseHit:
+    sha256: str
+    ordinal: int
+    heading: str
+    kind: str
+    text: str
+    snippet: str = ""
+    score: float = 0.0
+
+
+def ensure_chunk_tables(conn: sqlite3.Connection) -> None:
+    """Create the per-document text, chunk and FTS5 chunk index tables and their sync triggers."""
+    ensure_document_tables(conn)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_texts (
+            sha256 TEXT PRIMARY KEY,
+            extractor TEXT NOT NULL,
+            chars INTEGER NOT NULL,
+            chunks INTEGER NOT NULL,
+            extracted_at TEXT NOT NULL,
+            error TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_chunks (
+            id INTEGER PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            ordinal INTEGER NOT NULL,
+            heading TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            text TEXT NOT NULL,
+            UNIQUE (sha256, ordinal)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_document_chunks_kind ON document_chunks (kind, sha256)")
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
+            heading,
+            text,
+            content = 'document_chunks',
+            content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_chunks_fts_after_insert AFTER INSERT ON document_chunks BEGIN
+            INSERT INTO document_chunks_fts (rowid, heading, text) VALUES (new.id, new.heading, new.text);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_chunks_fts_after_delete AFTER DELETE ON document_chunks BEGIN
+            INSERT INTO document_chunks_fts (document_chunks_fts, rowid, heading, text)
+            VALUES ('delete', old.id, old.heading, old.text);
+        END
+        """
+    )
+
+
+class PliegoIndex:
+    """Extract the text of cached pliegos once and serve clause lookups from an FTS5 chunk index.
+
+    Extraction is keyed by the document's SHA-256. A pliego shared by several
+    lots or republications is therefore extracted once, and its text outlives
+    the cached file if that file is evicted. ``run`` sends pending documents to
+    a process pool: PDF parsing is CPU bound and would hold the GIL. Results
+    are written from the calling thread, one transaction per document.
+
+    Each document is split at its section headings (cláusulas, anexos,
+    numbered sections) into chunks of at most ``max_chunk_chars``. Chunks whose
+    heading names a known clause (award criteria, solvency, budget...) carry
+    its ``kind``. Chunks are linked to tenders through ``tender_documents`` and
+    ``document_fetches``.
+
+    Documents that cannot be extracted are recorded with their error and are
+    not retried unless ``run(retry_failed=True)``, e.g. after installing pypdf
+    or poppler.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_chunk_chars: int = MAX_CHUNK_CHARS,
+        database: Optional[Database] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.cache_dir = cache_dir
+        self.max_chunk_chars = max_chunk_chars
+        self.database = database or Database.shared(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            ensure_chunk_tables(conn)
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        limit: Optional[int] = None,
+        retry_failed: bool = False,
+    ) -> ExtractionRunResult:
+        result = ExtractionRunResult()
+        with self.database.transaction() as conn:
+            if retry_failed:
+                conn.execute("DELETE FROM document_texts WHERE error IS NOT NULL")
+            pending = [row[0] for row in conn.execute(PENDING_BLOBS_SQL, (-1 if limit is None else limit,))]
+        if not pending:
+            return result
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(extract_chunks, sha256, str(blob_path(self.cache_dir, sha256)), self.max_chunk_chars)
+                for sha256 in pending
+            ]
+            for future in as_completed(futures):
+                sha256, extractor, chunks, error = future.result()
+                self._store(sha256, extractor, chunks, error)
+                if error:
+                    logger.warning("Could not extract pliego %s: %s", sha256, error)
+                    result.failed += 1
+                else:
+                    result.extracted += 1
+                    result.chunks += len(chunks)
+
+        logger.info(
+            "Pliego extraction finished. extracted=%s chunks=%s failed=%s",
+            result.extracted,
+            result.chunks,
+            result.failed,
+        )
+        return result
+
+    def clauses(self, tender_id: int, kind: str) -> List[ClauseHit]:
+        """Every chunk of ``kind`` (e.g. ``criterios_adjudicacion``) in the tender's documents, in document order."""
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT sha256, ordinal, heading, kind, text
+                FROM document_chunks
+                WHERE kind = ? AND sha256 IN ({TENDER_HASHES_SQL})
+                ORDER BY sha256, ordinal
+                """,
+                (kind, tender_id),
+            ).fetchall()
+        return [ClauseHit(*row) for row in rows]
+
+    def search(
+        self,
+        text: str,
+        tender_id: Optional[int] = None,
+        limit: int = 10,
+        highlight: Tuple[str, str] = ("[", "]"),
+        snippet_tokens: int = 24,
+    ) -> List[ClauseHit]:
+        """Best BM25 chunk matches (heading weighted over body), optionally within one tender's documents."""
+        match = to_fts_query(text)
+        if not match:
+            return []
+        sql = [
+            """
+            SELECT c.sha256, c.ordinal, c.heading, c.kind, c.text,
+                   snippet(document_chunks_fts, 1, ?, ?, '…', ?),
+                   bm25(document_chunks_fts, 3.0, 1.0) AS rank
+            FROM document_chunks_fts
+            JOIN document_chunks AS c ON c.id = document_chunks_fts.rowid
+            WHERE document_chunks_fts MATCH ?
+            """
+        ]
+        params: List[object] = [highlight[0], highlight[1], snippet_tokens, match]
+        if tender_id is not None:
+            sql.append(f"AND c.sha256 IN ({TENDER_HASHES_SQL})")
+            params.append(tender_id)
+        sql.append("ORDER BY rank LIMIT ?")
+        params.append(limit)
+        with self.database.connection() as conn:
+            rows = conn.execute("\n".join(sql), params).fetchall()
+        return [ClauseHit(*row[:5], snippet=row[5], score=-row[6]) for row in rows]
+
+    def _store(self, sha256: str, extractor: str, chunks: List[TextChunk], error: str) -> None:
+        with self.database.transaction() as conn:
+            conn.execute("DELETE FROM document_chunks WHERE sha256 = ?", (sha256,))
+            conn.executemany(
+                INSERT_CHUNK_SQL,
+                [(sha256, chunk.ordinal, chunk.heading, chunk.kind, chunk.text) for chunk in chunks],
+            )
+            conn.execute(
+                INSERT_TEXT_SQL,
+                (
+                    sha256,
+                    extractor,
+                    sum(len(chunk.text) for chunk in chunks),
+                    len(chunks),
+                    datetime.now(timezone.utc).isoformat(),
+                    error or None,
+                ),
+            )
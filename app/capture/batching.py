@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split any iterable into lists of at most ``size`` items without materialising it."""
+    iterator = iter(items)
+    size = max(size, 1)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
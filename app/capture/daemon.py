@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import random
+import signal
+import threading
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.capture.service import CaptureInterrupted
+
+logger = logging.getLogger(__name__)
+
+try:
+    _MADRID: Optional[ZoneInfo] = ZoneInfo("Europe/Madrid")
+except ZoneInfoNotFoundError:  # e.g. Windows without the tzdata package
+    _MADRID = None
+
+
+@dataclass(slots=True)
+class PollSchedule:
+    """How long the daemon waits between polls of the feed.
+
+    Right after a poll that brought new or changed tenders the wait is
+    ``active_seconds``, because PLACSP publishes in bursts. Otherwise it starts
+    at ``business_seconds`` during Spanish business hours and
+    ``off_hours_seconds`` outside them. It then grows by ``backoff`` with each
+    idle or failed poll in a row, up to ``max_business_seconds`` or
+    ``max_off_hours_seconds``. Every wait is spread by ``jitter`` so several
+    daemons do not poll in step.
+    """
+
+    active_seconds: float = 30.0
+    business_seconds: float = 45.0
+    max_business_seconds: float = 90.0
+    off_hours_seconds: float = 300.0
+    max_off_hours_seconds: float = 1800.0
+    backoff: float = 1.5
+    business_start_hour: int = 8
+    business_end_hour: int = 20
+    jitter: float = 0.1
+
+    def is_business_hours(self, moment: datetime) -> bool:
+        local = _madrid_time(moment)
+        return local.weekday() < 5 and self.business_start_hour <= local.hour < self.business_end_hour
+
+    def next_interval(self, moment: datetime, idle_polls: int) -> float:
+        """Seconds to wait at ``moment`` after ``idle_polls`` polls in a row without changes (0: the last one had some)."""
+        growth = self.backoff ** max(idle_polls - 1, 0)
+        if idle_polls == 0:
+            seconds = self.active_seconds
+        elif self.is_business_hours(moment):
+            seconds = min(self.business_seconds * growth, self.max_business_seconds)
+        else:
+            seconds = min(self.off_hours_seconds * growth, self.max_off_hours_seconds)
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+@dataclass(slots=True)
+class DaemonResult:
+    polls: int = 0
+    failed_polls: int = 0
+    changed: int = 0
+
+
+class CaptureDaemon:
+    """Run ``poll`` repeatedly until stopped.
+
+    ``poll`` captures once and returns how many tenders were new or changed.
+    It is built once by the caller, so the HTTP client, its keep-alive
+    connections and the SQLite connection stay open from one poll to the next.
+    A poll that raises is logged and counted as idle, so the next wait backs
+    off; the daemon keeps running.
+
+    ``stop_event`` is shared with the ``CaptureService`` (or scheduler) behind
+    ``poll``: SIGTERM or SIGINT sets it, the running capture stops after its
+    current batch and the daemon exits instead of waiting for the next poll.
+    """
+
+    def __init__(
+        self,
+        poll: Callable[[], int],
+        schedule: Optional[PollSchedule] = None,
+        stop_event: Optional[threading.Event] = None,
+        max_polls: Optional[int] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self.poll = poll
+        self.schedule = schedule or PollSchedule()
+        self.stop_event = stop_event or threading.Event()
+        self.max_polls = max_polls
+        self.clock = clock
+
+    def install_signal_handlers(self) -> None:
+        """Stop on SIGTERM/SIGINT; only possible from the main thread."""
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._handle_signal)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(self) -> DaemonResult:
+        result = DaemonResult()
+        idle_polls = 0
+        while not self.stop_event.is_set():
+            changed = 0
+            try:
+                changed = self.poll()
+            except CaptureInterrupted:
+                logger.info("Capture interrupted by stop request")
+                break
+            except Exception:
+                result.failed_polls += 1
+                logger.exception("Capture poll failed; backing off")
+            result.polls += 1
+            result.changed += changed
+            idle_polls = 0 if changed else idle_polls + 1
+            if self.max_polls is not None and result.polls >= self.max_polls:
+                break
+            wait = self.schedule.next_interval(self.clock(), idle_polls)
+            logger.info("Poll %s: %s new or changed tenders; next poll in %.0fs", result.polls, changed, wait)
+            self.stop_event.wait(wait)
+        logger.info(
+            "Capture daemon stopped after %s polls (%s failed, %s tenders new or changed)",
+            result.polls,
+            result.failed_polls,
+            result.changed,
+        )
+        return result
+
+    def _handle_signal(self, signum: int, frame: object) -> None:
+        logger.info("Received %s; stopping after the current batch", signal.Signals(signum).name)
+        self.stop()
+
+
+def _madrid_time(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    if _MADRID is not None:
+        return moment.astimezone(_MADRID)
+    # Without the tz database, CET is close enough to pick a polling interval.
+    return moment.astimezone(timezone(timedelta(hours=1)))
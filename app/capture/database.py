@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+import weakref
+
+_SHARED: "weakref.WeakValueDictionary[Path, Database]" = weakref.WeakValueDictionary()
+_SHARED_LOCK = threading.Lock()
+
+
+class Database:
+    """One long-lived, tuned SQLite connection shared by every store of a database file.
+
+    The connection runs in WAL mode with ``synchronous=NORMAL``, a sized page cache
+    and memory-mapped reads. Keeping it open lets sqlite3 reuse its prepared
+    statements across calls. ``transaction()`` is re-entrant: nested blocks join the
+    outermost one, so callers can group writes of several stores atomically.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        cache_size_kib: int = 64 * 1024,
+        mmap_size_bytes: int = 256 * 1024 * 1024,
+        cached_statements: int = 256,
+    ) -> None:
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=cached_statements,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_size_bytes)}")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @classmethod
+    def shared(cls, db_path: Path) -> "Database":
+        """Return the process-wide instance for ``db_path``, opening it on first use."""
+        key = db_path.resolve()
+        with _SHARED_LOCK:
+            database = _SHARED.get(key)
+            if database is None:
+                database = cls(db_path)
+                _SHARED[key] = database
+            return database
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the connection for reads without opening a transaction."""
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def close(self) -> None:
+        with _SHARED_LOCK:
+            key = self.db_path.resolve()
+            if _SHARED.get(key) is self:
+                del _SHARED[key]
+        with self._lock:
+            self._conn.close()
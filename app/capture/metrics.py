@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import ContextManager, Dict, Iterator, List, Optional
+
+from app.capture.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Stages timed during a capture run, in pipeline order.
+STAGES = ("download", "decode", "parse", "transform", "persist")
+
+INSERT_RUN_SQL = """
+    INSERT INTO capture_runs (
+        run_id, source, status, started_at, finished_at, duration_seconds,
+        fetched, inserted, updated, unchanged, error, metrics
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class MetricsRecorder:
+    """Accumulate stage timings and counters for one capture run.
+
+    Safe to share between the download threads and the parsing thread. Hot
+    loops should check ``enabled`` and add their totals once per page or batch
+    rather than per entry.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timings = {}
+            self.counters = {}
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def incr(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def timer(self, stage: str) -> ContextManager[None]:
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+
+class NullMetricsRecorder(MetricsRecorder):
+    """Recorder used when metrics are off: every call is a no-op."""
+
+    enabled = False
+    _NULL_TIMER = nullcontext()
+
+    def __init__(self) -> None:
+        self.timings = {}
+        self.counters = {}
+
+    def reset(self) -> None:
+        pass
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        pass
+
+    def incr(self, counter: str, amount: int = 1) -> None:
+        pass
+
+    def timer(self, stage: str) -> ContextManager[None]:
+        return self._NULL_TIMER
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {"timings": {}, "counters": {}}
+
+
+NULL_METRICS = NullMetricsRecorder()
+
+
+@dataclass(slots=True)
+class CaptureRunRecord:
+    run_id: str
+    source: str
+    status: str
+    started_at: datetime
+    finished_at: datetime
+    fetched: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+class RunLedger:
+    """Append-only ``capture_runs`` table: one row per capture run with its metrics.
+
+    With ``textfile_path`` each recorded run also rewrites a Prometheus
+    textfile-collector file (see ``write_textfile``).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        database: Optional[Database] = None,
+        textfile_path: Optional[Path] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.database = database or Database.shared(db_path)
+        self.textfile_path = textfile_path
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS capture_runs (
+                    run_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT NOT NULL,
+                    duration_seconds REAL NOT NULL,
+                    fetched INTEGER NOT NULL,
+                    inserted INTEGER NOT NULL,
+                    updated INTEGER NOT NULL,
+                    unchanged INTEGER NOT NULL,
+                    error TEXT,
+                    metrics TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_capture_runs_started_at ON capture_runs (started_at)")
+
+    def record(self, run: CaptureRunRecord) -> None:
+        with self.database.transaction() as conn:
+            conn.execute(
+                INSERT_RUN_SQL,
+                (
+                    run.run_id,
+                    run.source,
+                    run.status,
+                    run.started_at.isoformat(),
+                    run.finished_at.isoformat(),
+                    run.duration_seconds,
+                    run.fetched,
+                    run.inserted,
+                    run.updated,
+                    run.unchanged,
+                    run.error,
+                    json.dumps({"timings": run.timings, "counters": run.counters}, sort_keys=True),
+                ),
+            )
+        if self.textfile_path is not None:
+            write_textfile(self.textfile_path, run)
+
+    def recent(self, limit: int = 20) -> List[CaptureRunRecord]:
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT run_id, source, status, started_at, finished_at,
+                       fetched, inserted, updated, unchanged, error, metrics
+                FROM capture_runs
+                ORDER BY started_at DESC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        runs = []
+        for *fields, started_at, finished_at, fetched, inserted, updated, unchanged, error, metrics in rows:
+            data = json.loads(metrics)
+            runs.append(
+                CaptureRunRecord(
+                    *fields,
+                    started_at=datetime.fromisoformat(started_at),
+                    finished_at=datetime.fromisoformat(finished_at),
+                    fetched=fetched,
+                    inserted=inserted,
+                    updated=updated,
+                    unchanged=unchanged,
+                    error=error,
+                    timings=data.get("timings", {}),
+                    counters=data.get("counters", {}),
+                )
+            )
+        return runs
+
+
+def write_textfile(path: Path, run: CaptureRunRecord, prefix: str = "tenderloin_capture") -> None:
+    """Write the run as a Prometheus textfile-collector / OpenMetrics file, replaced atomically."""
+    labels = f'source="{_escape_label(run.source)}"'
+    lines = [
+        f"# HELP {prefix}_last_run_timestamp_seconds Unix time the last capture run finished.",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds{{{labels}}} {run.finished_at.timestamp():.3f}",
+        f"# HELP {prefix}_last_run_success Whether the last capture run succeeded.",
+        f"# TYPE {prefix}_last_run_success gauge",
+        f"{prefix}_last_run_success{{{labels}}} {0 if run.status == 'failed' else 1}",
+        f"# HELP {prefix}_last_run_duration_seconds Wall time of the last capture run.",
+        f"# TYPE {prefix}_last_run_duration_seconds gauge",
+        f"{prefix}_last_run_duration_seconds{{{labels}}} {run.duration_seconds:.6f}",
+        f"# HELP {prefix}_last_run_stage_seconds Time spent per stage in the last capture run.",
+        f"# TYPE {prefix}_last_run_stage_seconds gauge",
+    ]
+    for stage in (*STAGES, *sorted(set(run.timings) - set(STAGES))):
+        seconds = run.timings.get(stage, 0.0)
+        lines.append(f'{prefix}_last_run_stage_seconds{{{labels},stage="{stage}"}} {seconds:.6f}')
+    lines += [
+        f"# HELP {prefix}_last_run_rows Tenders per outcome in the last capture run.",
+        f"# TYPE {prefix}_last_run_rows gauge",
+    ]
+    for outcome in ("fetched", "inserted", "updated", "unchanged"):
+        lines.append(f'{prefix}_last_run_rows{{{labels},outcome="{outcome}"}} {getattr(run, outcome)}')
+    lines += [
+        f"# HELP {prefix}_last_run_events Counters (bytes, pages, requests, retries) of the last capture run.",
+        f"# TYPE {prefix}_last_run_events gauge",
+    ]
+    for counter in sorted(run.counters):
+        lines.append(f'{prefix}_last_run_events{{{labels},counter="{counter}"}} {run.counters[counter]}')
+    lines.append("# EOF")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import sqlite3
+from typing import Callable, Sequence
+
+from app.capture.normalize import iso_to_epoch, join_cpv_codes, normalize_cpv_prefix, normalize_region_code
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema.tenders_raw.version"
+
+
+@dataclass(slots=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _add_triage_columns(conn: sqlite3.Connection) -> None:
+    for column, column_type in (
+        ("published_ts", "INTEGER"),
+        ("deadline_ts", "INTEGER"),
+        ("created_ts", "INTEGER"),
+        ("cpv_prefix", "TEXT NOT NULL DEFAULT ''"),
+        ("region_code", "TEXT NOT NULL DEFAULT ''"),
+    ):
+        conn.execute(f"ALTER TABLE tenders_raw ADD COLUMN {column} {column_type}")
+
+    rows = conn.execute("SELECT id, published_at, deadline_at, created_at, cpv, region FROM tenders_raw").fetchall()
+    conn.executemany(
+        """
+        UPDATE tenders_raw
+        SET published_ts = ?, deadline_ts = ?, created_ts = ?, cpv_prefix = ?, region_code = ?
+        WHERE id = ?
+        """,
+        [
+            (
+                iso_to_epoch(published_at),
+                iso_to_epoch(deadline_at),
+                iso_to_epoch(created_at),
+                normalize_cpv_prefix(cpv),
+                normalize_region_code(region),
+                row_id,
+            )
+            for row_id, published_at, deadline_at, created_at, cpv, region in rows
+        ],
+    )
+
+
+def _add_updated_at_index(conn: sqlite3.Connection) -> None:
+    # Lets downstream stages read only rows new or changed since their watermark.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tenders_raw_updated_at ON tenders_raw (updated_at)")
+
+
+def _add_cpv_codes(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE tenders_raw ADD COLUMN cpv_codes TEXT NOT NULL DEFAULT ''")
+    rows = conn.execute("SELECT id, cpv FROM tenders_raw").fetchall()
+    conn.executemany(
+        "UPDATE tenders_raw SET cpv_codes = ? WHERE id = ?",
+        [(join_cpv_codes(cpv), row_id) for row_id, cpv in rows],
+    )
+
+
+def _add_document_urls(conn: sqlite3.Connection) -> None:
+    # JSON array, so later stages can expand it with json_each().
+    conn.execute("ALTER TABLE tenders_raw ADD COLUMN document_urls TEXT NOT NULL DEFAULT '[]'")
+
+
+def _add_published_index(conn: sqlite3.Connection) -> None:
+    # Month partitions of the columnar export are read as published_ts ranges.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tenders_raw_published ON tenders_raw (published_ts)")
+
+
+def _drop_triage_indexes(conn: sqlite3.Connection) -> None:
+    # The hard filter reads changed rows by updated_at; nothing queried these indexes.
+    for index in ("idx_tenders_raw_triage", "idx_tenders_raw_deadline", "idx_tenders_raw_cpv_prefix"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+MIGRATIONS: Sequence[Migration] = (
+    Migration(1, "typed timestamps, CPV prefix and region code", _add_triage_columns),
+    Migration(2, "updated_at index for incremental downstream stages", _add_updated_at_index),
+    Migration(3, "every CPV code of a tender in cpv_codes", _add_cpv_codes),
+    Migration(4, "pliego and annex URIs in document_urls", _add_document_urls),
+    Migration(5, "published_ts index for partitioned exports", _add_published_index),
+    Migration(6, "drop the unused triage indexes", _drop_triage_indexes),
+)
+
+
+def apply_migrations(
+    conn: sqlite3.Connection,
+    migrations: Sequence[Migration] = MIGRATIONS,
+    key: str = SCHEMA_VERSION_KEY,
+) -> int:
+    """Apply pending migrations in order and record the version reached in ``pipeline_state``.
+
+    Runs inside the caller's transaction, so a failed migration leaves both the
+    schema and the recorded version untouched.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    row = conn.execute("SELECT value FROM pipeline_state WHERE key = ?", (key,)).fetchone()
+    current = int(row[0]) if row else 0
+    for migration in sorted(migrations, key=lambda item: item.version):
+        if migration.version <= current:
+            continue
+        logger.info("Applying schema migration %s: %s", migration.version, migration.description)
+        migration.apply(conn)
+        current = migration.version
+        conn.execute(
+            """
+            INSERT INTO pipeline_state(key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE
+            SET value = excluded.value,
+                updated_at = excluded.updated_at
+            """,
+            (key, str(current), datetime.now(timezone.utc).isoformat()),
+        )
+    return current
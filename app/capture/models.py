@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass(slots=True)
@@ -20,3 +20,15 @@ class TenderRaw:
     cpv: str
     budget_amount: Optional[float]
     source: str = "placsp"
+    # Every CPV the entry carries (one per lot is common); ``cpv`` keeps the first.
+    cpv_codes: List[str] = field(default_factory=list)
+    # Pliego and annex URIs from the entry's DocumentReference/Attachment elements.
+    document_urls: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class FeedValidators:
+    """HTTP cache validators of a feed's first page, replayed as conditional request headers."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
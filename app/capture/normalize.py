@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import math
+import re
+from typing import Dict, Iterable, List, Optional
+
+_NUTS_RE = re.compile(r"^[A-Z]{2}[0-9A-Z]{0,3}$")
+_CPV_DIGITS_RE = re.compile(r"\d{8}")
+_DAY_FIRST_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+
+# Distinct non-ISO date strings kept; archive columns repeat a few thousand dates.
+PARSE_CACHE_SIZE = 65536
+
+
+def to_epoch(value: Optional[datetime]) -> Optional[int]:
+    """Seconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def iso_to_epoch(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return to_epoch(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def parse_datetime(value: str) -> Optional[datetime]:
+    """Parse a feed or archive timestamp; ``None`` when empty or unrecognised.
+
+    Accepts ISO 8601 (``2026-02-10``, ``2026-01-10T09:00:00Z``, with offset),
+    ``dd/mm/yyyy`` with an optional time as in the xlsx archive, and RFC 2822.
+    ISO text, almost every value in the feed, goes straight to
+    ``datetime.fromisoformat``. The other formats are recognised by their shape
+    and cached, since they come from columns that repeat a few thousand dates.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return _parse_datetime_text(value) if isinstance(value, str) else None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_datetime_text(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if len(value) >= 10 and value[4] == "-" and value[:4].isdigit():
+        try:
+            return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+        except ValueError:
+            return None
+    if "/" in value[:3]:
+        match = _DAY_FIRST_RE.fullmatch(value)
+        if match is None:
+            return None
+        day, month, year, hour, minute, second = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+        except ValueError:
+            return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_amount(value: object) -> Optional[float]:
+    """Parse a budget amount: numbers as-is, ``"125000.50"``, ``"1.234.567,89 €"``.
+
+    A comma marks Spanish formatting: dots are thousands separators and the
+    comma is the decimal point. The currency sign and spaces are only stripped
+    when the plain conversion fails, which the feed's bare amounts never do.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, float) or (isinstance(value, int) and not isinstance(value, bool)):
+        return float(value)
+    raw = str(value)
+    if "," in raw:
+        raw = raw.replace(".", "").replace(",", ".")
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw.replace("€", "").replace(" ", "").replace("\xa0", ""))
+    except ValueError:
+        return None
+
+
+def parse_datetime_column(values: Iterable[object]) -> List[Optional[datetime]]:
+    """``parse_datetime`` over a column batch that may also hold datetime/date cells and NaN for blanks.
+
+    Date columns repeat a few thousand values, so each distinct string is parsed once per batch.
+    """
+    parsed: Dict[str, Optional[datetime]] = {}
+    result: List[Optional[datetime]] = []
+    for value in values:
+        if isinstance(value, str):
+            try:
+                result.append(parsed[value])
+            except KeyError:
+                result.append(parsed.setdefault(value, parse_datetime(value)))
+        else:
+            result.append(_cell_to_datetime(value))
+    return result
+
+
+def parse_amount_column(values: Iterable[object]) -> List[Optional[float]]:
+    """``parse_amount`` over a column batch; NaN blanks become ``None``."""
+    return [None if isinstance(value, float) and math.isnan(value) else parse_amount(value) for value in values]
+
+
+def iso_date_column(values: Iterable[object]) -> List[Optional[str]]:
+    """Dates of a column as ``yyyy-mm-dd`` text (day-first for ``dd/mm/yyyy``); ``None`` when unparseable."""
+    return [moment.date().isoformat() if moment else None for moment in parse_datetime_column(values)]
+
+
+def _cell_to_datetime(value: object) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value == value else None  # pandas NaT is a datetime that is not equal to itself
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return None
+
+
+def normalize_cpv_prefix(cpv: str) -> str:
+    """Reduce a CPV code to its significant digits: ``79341000-7`` -> ``79341``.
+
+    Trailing zeros only mark the level in the CPV hierarchy, so the prefix is what
+    family matching compares against. Codes without eight digits normalise to ``""``.
+    """
+    match = _CPV_DIGITS_RE.search(cpv or "")
+    if match is None:
+        return ""
+    digits = match.group(0).rstrip("0")
+    return digits.ljust(2, "0")
+
+
+def join_cpv_codes(cpv: str, cpv_codes: Iterable[str] = ()) -> str:
+    """Space-separated, de-duplicated eight-digit CPV codes of a tender, ``cpv`` first."""
+    codes: List[str] = []
+    for value in (cpv, *cpv_codes):
+        for code in _CPV_DIGITS_RE.findall(value or ""):
+            if code not in codes:
+                codes.append(code)
+    return " ".join(codes)
+
+
+def normalize_region_code(region: str) -> str:
+    """Return the NUTS code held in ``region`` (``ES300``), or ``""`` for free-text regions."""
+    code = (region or "").strip().upper()
+    if _NUTS_RE.match(code):
+        return code
+    return ""
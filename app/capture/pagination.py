@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import queue
+import threading
+from typing import Callable, Deque, Iterator, Optional, Set, Tuple
+from urllib.parse import urljoin
+from xml.etree import ElementTree as ET
+
+ATOM = "http://www.w3.org/2005/Atom"
+logger = logging.getLogger(__name__)
+
+# Chunks a prefetched page may buffer ahead of its parser (64 KiB each in the client).
+PAGE_BUFFER_CHUNKS = 8
+_END = object()
+
+
+class PageCancelled(Exception):
+    """The walk was closed while the page was still downloading."""
+
+
+class PageStream:
+    """Chunks of one page, handed from its download thread to the parser through a bounded queue.
+
+    The downloader blocks once ``max_chunks`` chunks are waiting, so a page
+    prefetched ahead of the parser holds at most that much memory however
+    large it is. Iterating yields the chunks in order and re-raises the
+    download's error, if any, after the chunks received before it.
+    """
+
+    def __init__(self, max_chunks: int = PAGE_BUFFER_CHUNKS) -> None:
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(max_chunks, 1))
+        self._cancelled = threading.Event()
+
+    def put(self, chunk: bytes) -> None:
+        self._put(chunk)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        try:
+            self._put(_END if error is None else error)
+        except PageCancelled:
+            pass
+
+    def cancel(self) -> None:
+        """Unblock and abort the downloader; the remaining chunks are discarded."""
+        self._cancelled.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
+
+    def _put(self, item: object) -> None:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise PageCancelled()
+
+
+PageFetcher = Callable[[str, Callable[[Optional[str]], None], PageStream], None]
+
+
+class NextLinkScanner:
+    """Find the ``rel="next"`` link of an Atom page from its first bytes.
+
+    PLACSP writes the pagination links in the feed header, so the scan usually
+    finishes with the first chunk and the next download can start while the
+    rest of the page is still arriving.
+    """
+
+    def __init__(self, page_url: str) -> None:
+        self.page_url = page_url
+        self.done = False
+        self.next_url: Optional[str] = None
+        self._parser = ET.XMLPullParser(events=("start",))
+        self._depth_one: Optional[ET.Element] = None
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return True
+        try:
+            self._parser.feed(chunk)
+            self._read_events()
+        except ET.ParseError:
+            # Not an Atom document (e.g. a JSON test payload): no pagination.
+            self.done = True
+        return self.done
+
+    def close(self) -> Optional[str]:
+        if not self.done:
+            try:
+                self._parser.close()
+                self._read_events()
+            except ET.ParseError:
+                pass
+            self.done = True
+        return self.next_url
+
+    def _read_events(self) -> None:
+        for _, element in self._parser.read_events():
+            if element.tag == f"{{{ATOM}}}entry":
+                self.done = True
+                return
+            if element.tag == f"{{{ATOM}}}link" and element.attrib.get("rel") == "next":
+                href = element.attrib.get("href", "")
+                self.next_url = urljoin(self.page_url, href) if href else None
+                self.done = True
+                return
+
+
+class PagePrefetcher:
+    """Walk a chain of Atom pages, downloading up to ``depth`` pages ahead of the consumer.
+
+    ``fetch(url, on_next_link, stream)`` downloads one page into ``stream`` and
+    must call ``on_next_link`` exactly once, as soon as the page's next URL (or
+    ``None``) is known. Pages are yielded in chain order as ``(url, stream)``
+    while they are still downloading; each stream buffers at most
+    ``buffer_chunks`` chunks. URLs already visited in this walk are never
+    fetched again.
+    """
+
+    def __init__(
+        self,
+        fetch: PageFetcher,
+        first_url: str,
+        depth: int = 4,
+        max_pages: Optional[int] = None,
+        buffer_chunks: int = PAGE_BUFFER_CHUNKS,
+    ) -> None:
+        self._fetch = fetch
+        self._depth = max(depth, 1)
+        self._max_pages = max_pages
+        self._buffer_chunks = buffer_chunks
+        # One more worker than queued pages: the page being parsed is still downloading.
+        self._pool = ThreadPoolExecutor(max_workers=self._depth + 1, thread_name_prefix="placsp-page")
+        self._lock = threading.Lock()
+        self._pages: Deque[Tuple[str, PageStream]] = deque()
+        self._streams: Set[PageStream] = set()
+        self._next_url: Optional[str] = first_url
+        self._seen: Set[str] = set()
+        self._submitted = 0
+        self._closed = False
+
+    def __enter__(self) -> "PagePrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[str, PageStream]]:
+        with self._lock:
+            self._submit_ready()
+        while True:
+            with self._lock:
+                if not self._pages:
+                    return
+                url, stream = self._pages.popleft()
+                self._submit_ready()
+            yield url, stream
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._pages.clear()
+            streams = list(self._streams)
+        for stream in streams:
+            stream.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _download(self, url: str, stream: PageStream) -> None:
+        try:
+            self._fetch(url, self._on_next_link, stream)
+        except PageCancelled:
+            pass
+        except BaseException as exc:
+            stream.finish(exc)
+        else:
+            stream.finish()
+        finally:
+            with self._lock:
+                self._streams.discard(stream)
+
+    def _on_next_link(self, url: Optional[str]) -> None:
+        with self._lock:
+            self._next_url = url
+            self._submit_ready()
+
+    def _submit_ready(self) -> None:
+        while (
+            not self._closed
+            and self._next_url is not None
+            and len(self._pages) < self._depth
+            and (self._max_pages is None or self._submitted < self._max_pages)
+        ):
+            url, self._next_url = self._next_url, None
+            if url in self._seen:
+                logger.warning("Pagination loop detected at %s; stopping crawl", url)
+                return
+            self._seen.add(url)
+            self._submitted += 1
+            stream = PageStream(self._buffer_chunks)
+            self._streams.add(stream)
+            self._pages.append((url, stream))
+            self._pool.submit(self._download, url, stream)
@@ -1,24 +1,35 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from email.utils import parsedate_to_datetime
+from functools import partial
+from itertools import chain
 import json
 import logging
+import sys
 import time
 from pathlib import Path
-from typing import Iterable, List, Optional
-from urllib.error import HTTPError, URLError
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 from xml.etree import ElementTree as ET
 
-from app.capture.models import TenderRaw
+from app.capture.metrics import NULL_METRICS, MetricsRecorder
+from app.capture.models import FeedValidators, TenderRaw
+from app.capture.normalize import parse_amount, parse_datetime
+from app.capture.pagination import NextLinkScanner, PagePrefetcher, PageStream
+from app.capture.transport import HttpTransport, is_http_url
 
 ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+ATOM_ENTRY_TAG = f"{{{ATOM_NS['atom']}}}entry"
+STREAM_CHUNK_BYTES = 64 * 1024
 logger = logging.getLogger(__name__)
 
 
+class FeedNotModified(Exception):
+    """The feed answered 304 Not Modified to a conditional request."""
+
+
 @dataclass(slots=True)
 class PlacspClientConfig:
     source_url: str
@@ -26,28 +37,135 @@ class PlacspClientConfig:
     source_name: str = "placsp"
     retry_attempts: int = 3
     retry_backoff_seconds: float = 1.0
+    max_pages: Optional[int] = None
+    prefetch_pages: int = 4
+    # "auto" sniffs each page; "atom" or "json" force a parser.
+    feed_format: str = "auto"
 
 
 class PlacspClient:
     """Fetch PLACSP tenders from an Atom feed or JSON file URL for local tests."""
 
-    def __init__(self, config: PlacspClientConfig) -> None:
+    def __init__(
+        self,
+        config: PlacspClientConfig,
+        transport: Optional[HttpTransport] = None,
+        metrics: MetricsRecorder = NULL_METRICS,
+    ) -> None:
         self.config = config
+        self.metrics = metrics
+        self.parser = FeedParser(config.source_name, config.feed_format, metrics)
+        self.transport = transport or HttpTransport(
+            timeout_seconds=config.timeout_seconds,
+            retry_attempts=config.retry_attempts,
+            retry_backoff_seconds=config.retry_backoff_seconds,
+            metrics=metrics,
+        )
+
+    def close(self) -> None:
+        self.transport.close()
 
     def fetch_since(self, since: Optional[datetime]) -> List[TenderRaw]:
-        payload = self._download_payload(since)
-        if payload.lstrip().startswith("{") or payload.lstrip().startswith("["):
-            return self._parse_json(payload)
-        return self._parse_atom(payload)
-
-    def _download_payload(self, since: Optional[datetime]) -> str:
+        return list(self.iter_since(since))
+
+    def iter_since(
+        self,
+        since: Optional[datetime],
+        validators: Optional[FeedValidators] = None,
+    ) -> Iterator[TenderRaw]:
+        """Yield tenders page by page following the feed's ``rel="next"`` chain.
+
+        Later pages are downloaded on a small thread pool while the current one is
+        parsed. The walk stops after the first page whose entries are all older than
+        ``since``; without ``since`` only ``max_pages`` pages (default one) are read.
+
+        When ``validators`` is given the first page is requested conditionally:
+        ``FeedNotModified`` is raised on a 304, otherwise the validators are updated
+        in place from the response so the caller can persist them after a successful run.
+        """
+        max_pages = self.config.max_pages
+        if max_pages is None and since is None:
+            max_pages = 1
+        first_url = self._first_page_url(since)
+
+        def fetch(url: str, on_next_link: Callable[[Optional[str]], None], stream: PageStream) -> None:
+            self._download_page(url, on_next_link, stream, validators if url == first_url else None)
+
+        prefetcher = PagePrefetcher(
+            fetch,
+            first_url,
+            depth=self.config.prefetch_pages,
+            max_pages=max_pages,
+        )
+        with prefetcher:
+            for url, stream in prefetcher:
+                page_entries = 0
+                page_is_stale = since is not None
+                for tender in self.parser.parse_chunks(stream):
+                    page_entries += 1
+                    if page_is_stale and not _is_older(tender.published_at, since):
+                        page_is_stale = False
+                    yield tender
+                if page_entries and page_is_stale:
+                    logger.info("Page %s is older than %s; stopping pagination", url, since)
+                    return
+
+    def _first_page_url(self, since: Optional[datetime]) -> str:
         url = self.config.source_url
         if since and url.startswith("http"):
             query = urlencode({"from": since.isoformat()})
             url = f"{url}{'&' if '?' in url else '?'}{query}"
+        return url
+
+    def _download_page(
+        self,
+        url: str,
+        on_next_link: Callable[[Optional[str]], None],
+        stream: PageStream,
+        validators: Optional[FeedValidators] = None,
+    ) -> None:
+        """Download one page into ``stream`` chunk by chunk; the parser reads them as they arrive."""
+        scanner: Optional[NextLinkScanner] = NextLinkScanner(url)
+        downloaded = 0
+        started = time.perf_counter()
+        try:
+            with self._open_url(url, validators) as body:
+                for chunk in iter(partial(body.read, STREAM_CHUNK_BYTES), b""):
+                    downloaded += len(chunk)
+                    if scanner is not None and scanner.feed(chunk):
+                        on_next_link(_checked_next_link(url, scanner.next_url))
+                        scanner = None
+                    stream.put(chunk)
+        except BaseException:
+            if scanner is not None:
+                on_next_link(None)
+            raise
+        if scanner is not None:
+            on_next_link(_checked_next_link(url, scanner.close()))
+        if self.metrics.enabled:
+            # Includes the decompression time also reported as "decode", and time waiting for the parser.
+            self.metrics.add_time("download", time.perf_counter() - started)
+            self.metrics.incr("pages")
+            self.metrics.incr("bytes_downloaded", downloaded)
+
+    def _parse_page(self, payload: bytes) -> Iterator[TenderRaw]:
+        return self.parser.parse_page(payload)
+
+    def _parse_atom(self, xml_text: str) -> List[TenderRaw]:
+        return self.parser.parse_atom(xml_text)
 
+    def _parse_json(self, raw_json: str) -> List[TenderRaw]:
+        return self.parser.parse_json(raw_json)
+
+    @contextmanager
+    def _open_url(self, url: str, validators: Optional[FeedValidators] = None) -> Iterator[BinaryIO]:
         if url.startswith("file://"):
-            return Path(url.removeprefix("file://")).read_text(encoding="utf-8")
+            # Local payloads are for tests and offline runs; a remote feed never leads to them.
+            if is_http_url(self.config.source_url):
+                raise ValueError(f"Refusing to open {url} for the remote feed {self.config.source_url}")
+            with Path(url.removeprefix("file://")).open("rb") as handle:
+                yield handle
+            return
 
         headers = {
             "User-Agent": (
@@ -58,83 +176,147 @@ class PlacspClient:
             "Accept": "application/atom+xml,application/xml,text/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
         }
-
-        attempts = max(self.config.retry_attempts, 1)
-        last_error: Exception | None = None
-        for attempt in range(1, attempts + 1):
-            try:
-                request = Request(url, headers=headers)
-                with urlopen(request, timeout=self.config.timeout_seconds) as response:  # noqa: S310
-                    return response.read().decode("utf-8", errors="replace")
-            except (HTTPError, URLError, TimeoutError) as exc:
-                last_error = exc
-                logger.warning(
-                    "Download attempt %s/%s failed for %s: %s",
-                    attempt,
-                    attempts,
-                    url,
-                    exc,
-                )
-                if attempt < attempts:
-                    sleep_seconds = self.config.retry_backoff_seconds * attempt
-                    time.sleep(sleep_seconds)
-
-        logger.error("Failed to download PLACSP payload after %s attempts", attempts)
-        if last_error is not None:
-            raise last_error
-        raise RuntimeError("Unknown download error without exception")
-
-    def _parse_atom(self, xml_text: str) -> List[TenderRaw]:
-        print(xml_text[:500])
-        root = ET.fromstring(xml_text)
-        tenders: List[TenderRaw] = []
-
-        for entry in root.findall("atom:entry", namespaces=ATOM_NS):
-            external_id = _text(entry.find("atom:id", namespaces=ATOM_NS))
-            title = _text(entry.find("atom:title", namespaces=ATOM_NS))
-            summary = _text(entry.find("atom:summary", namespaces=ATOM_NS))
-            published_raw = _text(entry.find("atom:updated", namespaces=ATOM_NS))
-            link = ""
-            link_node = entry.find("atom:link", namespaces=ATOM_NS)
-            if link_node is not None:
-                link = link_node.attrib.get("href", "")
-
-            published_at = _parse_datetime(published_raw) or datetime.now(timezone.utc)
-            deadline_at = _parse_datetime(
-                _find_first_text_by_localname(entry, ["DeadlineDate", "EndDate", "PresentationPeriod"])
-            )
-            buyer_name = _find_first_text_by_localname(entry, ["PartyName", "BuyerProfile", "ContractingParty"]) or ""
-            region = _find_first_text_by_localname(entry, ["NUTSCode", "Region", "PlaceExecution"]) or ""
-            cpv = _find_first_text_by_localname(entry, ["ItemClassificationCode", "CPV", "CPVCode"]) or ""
-            budget_amount = _parse_float(
-                _find_first_text_by_localname(entry, ["TotalAmount", "BudgetAmount", "EstimatedOverallContractAmount"])
-            )
-
-            tenders.append(
-                TenderRaw(
-                    external_id=external_id or link or title,
-                    title=title,
-                    summary=summary,
-                    link=link,
-                    published_at=published_at,
-                    deadline_at=deadline_at,
-                    buyer_name=buyer_name,
-                    region=region,
-                    cpv=cpv,
-                    budget_amount=budget_amount,
-                    source=self.config.source_name,
-                )
-            )
-
-        return tenders
-
-    def _parse_json(self, raw_json: str) -> List[TenderRaw]:
-        data = json.loads(raw_json)
+        if validators is not None:
+            if validators.etag:
+                headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                headers["If-Modified-Since"] = validators.last_modified
+
+        with self.transport.open(url, headers) as response:
+            if response.status == 304:
+                raise FeedNotModified(url)
+            if validators is not None:
+                validators.etag = response.headers.get("ETag")
+                validators.last_modified = response.headers.get("Last-Modified")
+            yield response.body
+
+
+class FeedParser:
+    """Turn Atom (CODICE) or JSON feed pages into ``TenderRaw`` records.
+
+    Needs no network: ``PlacspClient`` feeds it the pages it downloads, and the
+    backfill workers call ``parse_page`` on archive members directly.
+    """
+
+    def __init__(
+        self,
+        source_name: str = "placsp",
+        feed_format: str = "auto",
+        metrics: MetricsRecorder = NULL_METRICS,
+    ) -> None:
+        self.source_name = source_name
+        self.feed_format = feed_format
+        self.metrics = metrics
+
+    def parse_page(self, payload: bytes) -> Iterator[TenderRaw]:
+        chunks = (payload[offset : offset + STREAM_CHUNK_BYTES] for offset in range(0, len(payload), STREAM_CHUNK_BYTES))
+        return self.parse_chunks(chunks)
+
+    def parse_chunks(self, chunks: Iterable[bytes]) -> Iterator[TenderRaw]:
+        """Parse a page from its chunks; Atom is parsed as they arrive, JSON once complete."""
+        iterator = iter(chunks)
+        head: List[bytes] = []
+        feed_format = self.feed_format
+        if feed_format == "auto":
+            # Sniff the first significant byte: "{" or "[" is JSON, anything else Atom.
+            feed_format = "atom"
+            for chunk in iterator:
+                head.append(chunk)
+                significant = chunk.lstrip(b"\xef\xbb\xbf \t\r\n")
+                if significant:
+                    feed_format = "json" if significant[:1] in (b"{", b"[") else "atom"
+                    break
+        if feed_format == "json":
+            payload = b"".join(chain(head, iterator))
+            with self.metrics.timer("decode"):
+                raw_json = payload.decode("utf-8", errors="replace")
+            return iter(self.parse_json(raw_json))
+        return self._iter_atom(chain(head, iterator))
+
+    def parse_atom(self, xml_text: str) -> List[TenderRaw]:
+        return list(self._iter_atom([xml_text.encode("utf-8")]))
+
+    def _iter_atom(self, chunks: Iterable[bytes]) -> Iterator[TenderRaw]:
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root: Optional[ET.Element] = None
+        # Timings are summed locally and reported once per page to keep the per-entry cost flat.
+        timed = self.metrics.enabled
+        clock = time.perf_counter
+        parse_seconds = transform_seconds = 0.0
+        try:
+            for chunk in chunks:
+                if timed:
+                    started = clock()
+                    parser.feed(chunk)
+                    parse_seconds += clock() - started
+                else:
+                    parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if root is None:
+                        root = element
+                    elif event == "end" and element.tag == ATOM_ENTRY_TAG:
+                        if timed:
+                            started = clock()
+                            tender = self._entry_to_tender(element)
+                            transform_seconds += clock() - started
+                        else:
+                            tender = self._entry_to_tender(element)
+                        yield tender
+                        # Drop the finished entry so the tree never grows past one entry.
+                        element.clear()
+                        root.remove(element)
+            parser.close()
+        finally:
+            if timed:
+                self.metrics.add_time("parse", parse_seconds)
+                self.metrics.add_time("transform", transform_seconds)
+
+    def _entry_to_tender(self, entry: ET.Element) -> TenderRaw:
+        external_id = _text(entry.find("atom:id", namespaces=ATOM_NS))
+        title = _text(entry.find("atom:title", namespaces=ATOM_NS))
+        summary = _text(entry.find("atom:summary", namespaces=ATOM_NS))
+        published_raw = _text(entry.find("atom:updated", namespaces=ATOM_NS))
+        link = ""
+        link_node = entry.find("atom:link", namespaces=ATOM_NS)
+        if link_node is not None:
+            link = link_node.attrib.get("href", "")
+
+        fields, lists = _ENTRY_FIELDS.extract(entry)
+        published_at = parse_datetime(published_raw) or datetime.now(timezone.utc)
+        deadline_at = parse_datetime(fields.get("deadline", ""))
+        buyer_name = fields.get("buyer", "")
+        region = fields.get("region", "")
+        cpv = fields.get("cpv", "")
+        budget_amount = parse_amount(fields.get("budget"))
+
+        return TenderRaw(
+            external_id=external_id or link or title,
+            title=title,
+            summary=summary,
+            link=link,
+            published_at=published_at,
+            deadline_at=deadline_at,
+            buyer_name=buyer_name,
+            region=region,
+            cpv=cpv,
+            budget_amount=budget_amount,
+            source=self.source_name,
+            cpv_codes=lists.get("cpv", []),
+            document_urls=lists.get("documents", []),
+        )
+
+    def parse_json(self, raw_json: str) -> List[TenderRaw]:
+        with self.metrics.timer("parse"):
+            data = json.loads(raw_json)
         items = data if isinstance(data, list) else data.get("items", [])
+        with self.metrics.timer("transform"):
+            return self._json_items_to_tenders(items)
+
+    def _json_items_to_tenders(self, items: Iterable[Dict[str, object]]) -> List[TenderRaw]:
         tenders: List[TenderRaw] = []
         for item in items:
-            published = _parse_datetime(item.get("published_at", "")) or datetime.now(timezone.utc)
-            deadline = _parse_datetime(item.get("deadline_at", ""))
+            published = parse_datetime(item.get("published_at", "")) or datetime.now(timezone.utc)
+            deadline = parse_datetime(item.get("deadline_at", ""))
             tenders.append(
                 TenderRaw(
                     external_id=str(item.get("external_id") or item.get("id") or item.get("link") or published.isoformat()),
@@ -146,13 +328,20 @@ class PlacspClient:
                     buyer_name=str(item.get("buyer_name", "")),
                     region=str(item.get("region", "")),
                     cpv=str(item.get("cpv", "")),
-                    budget_amount=_parse_float(item.get("budget_amount")),
-                    source=self.config.source_name,
+                    budget_amount=parse_amount(item.get("budget_amount")),
+                    source=self.source_name,
+                    cpv_codes=[str(code) for code in item.get("cpv_codes") or []],
+                    document_urls=[str(url) for url in item.get("document_urls") or []],
                 )
             )
         return tenders
 
 
+def parse_page(payload: bytes, source_name: str = "placsp", feed_format: str = "auto") -> Iterator[TenderRaw]:
+    """Parse one feed page held in memory, e.g. a member of a monthly archive."""
+    return FeedParser(source_name, feed_format).parse_page(payload)
+
+
 def _text(node: Optional[ET.Element]) -> str:
     if node is None or node.text is None:
         return ""
@@ -175,33 +364,101 @@ def _find_first_text_by_localname(node: ET.Element, local_names: Iterable[str])
     return ""
 
 
-def _parse_datetime(value: str) -> Optional[datetime]:
-    if not value:
-        return None
-    try:
-        if value.endswith("Z"):
-            return datetime.fromisoformat(value.replace("Z", "+00:00"))
-        return datetime.fromisoformat(value)
-    except ValueError:
-        pass
-
-    try:
-        return parsedate_to_datetime(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _parse_float(value: object) -> Optional[float]:
-    if value in (None, ""):
+class _EntryFieldExtractor:
+    """Resolve every CODICE business field of an entry in a single walk of its subtree.
+
+    Each field keeps the first non-empty element (in document order) whose local
+    name is one of its candidates, matching ``_find_first_text_by_localname``.
+    ``repeated`` fields also collect every distinct value (an entry may carry a
+    CPV per lot). A field listed in ``nested`` matches a container element and
+    takes its values from ``parent/child`` pairs below it instead of its own text.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, Sequence[str]],
+        repeated: Sequence[str] = (),
+        nested: Optional[Dict[str, Tuple[str, str]]] = None,
+    ) -> None:
+        self._dispatch = {
+            sys.intern(name.lower()): field for field, names in fields.items() for name in names
+        }
+        self._repeated = frozenset(repeated)
+        self._nested = {
+            field: (sys.intern(parent.lower()), sys.intern(child.lower()))
+            for field, (parent, child) in (nested or {}).items()
+        }
+        self._tag_keys: Dict[str, str] = {}
+
+    def extract(self, entry: ET.Element) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        """Return the first value of each field and, for ``repeated`` fields, every distinct value."""
+        found: Dict[str, str] = {}
+        lists: Dict[str, List[str]] = {}
+        dispatch = self._dispatch
+        repeated = self._repeated
+        nested = self._nested
+        for element in entry.iter():
+            field = dispatch.get(self._key(element.tag))
+            if field is None:
+                continue
+            if field in nested:
+                values = self._nested_texts(element, *nested[field])
+            elif field in repeated or field not in found:
+                values = [_text(element)]
+            else:
+                continue
+            for value in values:
+                if not value:
+                    continue
+                found.setdefault(field, value)
+                if field in repeated:
+                    collected = lists.setdefault(field, [])
+                    if value not in collected:
+                        collected.append(value)
+        return found, lists
+
+    def _key(self, tag: str) -> str:
+        key = self._tag_keys.get(tag)
+        if key is None:
+            key = self._tag_keys[tag] = sys.intern(_localname(tag).lower())
+        return key
+
+    def _nested_texts(self, container: ET.Element, parent_key: str, child_key: str) -> List[str]:
+        return [
+            _text(child)
+            for parent in container.iter()
+            if self._key(parent.tag) == parent_key
+            for child in parent
+            if self._key(child.tag) == child_key
+        ]
+
+
+_ENTRY_FIELDS = _EntryFieldExtractor(
+    {
+        "deadline": ("DeadlineDate", "EndDate", "PresentationPeriod"),
+        "buyer": ("PartyName", "BuyerProfile", "ContractingParty"),
+        "region": ("NUTSCode", "Region", "PlaceExecution"),
+        "cpv": ("ItemClassificationCode", "CPV", "CPVCode"),
+        "budget": ("TotalAmount", "BudgetAmount", "EstimatedOverallContractAmount"),
+        "documents": ("LegalDocumentReference", "TechnicalDocumentReference", "AdditionalDocumentReference"),
+    },
+    repeated=("cpv", "documents"),
+    # Only cbc:URI inside cac:ExternalReference of a document reference, not every URI of the entry.
+    nested={"documents": ("ExternalReference", "URI")},
+)
+
+
+def _checked_next_link(page_url: str, next_url: Optional[str]) -> Optional[str]:
+    """Drop a ``rel="next"`` link that would take a remote feed to a non-HTTP URL (e.g. ``file://``)."""
+    if next_url and is_http_url(page_url) and not is_http_url(next_url):
+        logger.warning("Ignoring non-HTTP next link %s on %s", next_url, page_url)
         return None
+    return next_url
 
-    raw = str(value).strip().replace("€", "").replace(" ", "")
-    if "," in raw and "." in raw:
-        raw = raw.replace(".", "").replace(",", ".")
-    elif "," in raw:
-        raw = raw.replace(",", ".")
 
-    try:
-        return float(raw)
-    except ValueError:
-        return None
+def _is_older(moment: datetime, since: datetime) -> bool:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return moment < since
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+from app.capture.database import Database
+from app.capture.normalize import to_epoch
+
+_TOKEN_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+@dataclass(slots=True)
+class SearchHit:
+    tender_id: int
+    external_id: str
+    title: str
+    link: str
+    region: str
+    cpv: str
+    deadline_at: Optional[str]
+    budget_amount: Optional[float]
+    snippet: str
+    score: float
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> None:
+    """Create the FTS5 index over ``tenders_raw`` title/summary and the triggers that keep it in sync."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tenders_fts'"
+    ).fetchone()
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tenders_fts USING fts5(
+            title,
+            summary,
+            content = 'tenders_raw',
+            content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tenders_fts_after_insert AFTER INSERT ON tenders_raw BEGIN
+            INSERT INTO tenders_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tenders_fts_after_delete AFTER DELETE ON tenders_raw BEGIN
+            INSERT INTO tenders_fts (tenders_fts, rowid, title, summary)
+            VALUES ('delete', old.id, old.title, old.summary);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tenders_fts_after_update AFTER UPDATE OF title, summary ON tenders_raw BEGIN
+            INSERT INTO tenders_fts (tenders_fts, rowid, title, summary)
+            VALUES ('delete', old.id, old.title, old.summary);
+            INSERT INTO tenders_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END
+        """
+    )
+    if not exists:
+        # Index rows captured before the search index existed.
+        conn.execute("INSERT INTO tenders_fts (tenders_fts) VALUES ('rebuild')")
+
+
+class TenderSearch:
+    """Ranked, accent-insensitive full-text search over captured tenders."""
+
+    def __init__(self, db_path: Path, database: Optional[Database] = None) -> None:
+        self.db_path = db_path
+        self.database = database or Database.shared(db_path)
+
+    def search(
+        self,
+        text: str,
+        region: Optional[str] = None,
+        cpv: Optional[str] = None,
+        deadline_from: Optional[datetime] = None,
+        deadline_to: Optional[datetime] = None,
+        limit: int = 20,
+        highlight: Tuple[str, str] = ("[", "]"),
+        snippet_tokens: int = 16,
+    ) -> List[SearchHit]:
+        """Return the best BM25 matches (title weighted over summary), best first.
+
+        ``region`` and ``cpv`` match as prefixes, so ``ES3`` covers every Madrid
+        NUTS code and ``7934`` the whole advertising family.
+        """
+        match = to_fts_query(text)
+        if not match:
+            return []
+
+        sql = [
+            """
+            SELECT
+                t.id,
+                t.external_id,
+                t.title,
+                t.link,
+                t.region,
+                t.cpv,
+                t.deadline_at,
+                t.budget_amount,
+                snippet(tenders_fts, -1, ?, ?, '…', ?),
+                bm25(tenders_fts, 2.0, 1.0) AS rank
+            FROM tenders_fts
+            JOIN tenders_raw AS t ON t.id = tenders_fts.rowid
+            WHERE tenders_fts MATCH ?
+            """
+        ]
+        params: List[object] = [highlight[0], highlight[1], snippet_tokens, match]
+        if region:
+            sql.append("AND t.region LIKE ? ESCAPE '\\'")
+            params.append(_prefix_pattern(region))
+        if cpv:
+            sql.append("AND t.cpv LIKE ? ESCAPE '\\'")
+            params.append(_prefix_pattern(cpv))
+        if deadline_from is not None:
+            sql.append("AND t.deadline_ts >= ?")
+            params.append(to_epoch(deadline_from))
+        if deadline_to is not None:
+            sql.append("AND t.deadline_ts <= ?")
+            params.append(to_epoch(deadline_to))
+        sql.append("ORDER BY rank LIMIT ?")
+        params.append(limit)
+
+        with self.database.connection() as conn:
+            rows = conn.execute("\n".join(sql), params).fetchall()
+        return [
+            SearchHit(
+                tender_id=row[0],
+                external_id=row[1],
+                title=row[2],
+                link=row[3],
+                region=row[4],
+                cpv=row[5],
+                deadline_at=row[6],
+                budget_amount=row[7],
+                snippet=row[8],
+                score=-row[9],
+            )
+            for row in rows
+        ]
+
+
+def to_fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query that ANDs every word (``word*`` keeps prefix search)."""
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        word = token.rstrip("*")
+        if not word:
+            continue
+        terms.append(f'"{word}"*' if token.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+
+def _prefix_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
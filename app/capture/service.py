@@ -1,41 +1,137 @@
 from __future__ import annotations
 
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import partial
 import logging
-from typing import Optional
+import threading
+from typing import List, Optional
+import uuid
 
-from app.capture.placsp_client import PlacspClient
+from app.capture.batching import iter_batches
+from app.capture.metrics import NULL_METRICS, CaptureRunRecord, MetricsRecorder, RunLedger
+from app.capture.models import FeedValidators, TenderRaw
+from app.capture.placsp_client import FeedNotModified, PlacspClient
 from app.capture.state_store import StateStore
-from app.capture.storage import RawTenderRepository
+from app.capture.storage import RawTenderRepository, UpsertResult
+from app.capture.writer import SerialWriter
 
 logger = logging.getLogger(__name__)
 
 
+class CaptureInterrupted(Exception):
+    """A stop was requested between batches; written batches stay, the watermark does not move."""
+
+
 @dataclass(slots=True)
 class CaptureRunResult:
     fetched: int
     inserted: int
+    updated: int
+    unchanged: int
     last_run_at: Optional[datetime]
     new_last_run_at: datetime
     effective_since: Optional[datetime]
+    not_modified: bool = False
+    run_id: str = ""
 
 
 class CaptureService:
+    """Incremental capture of the feed into ``tenders_raw``.
+
+    Pass the same ``metrics`` recorder to the client to get download, decode,
+    parse and transform timings next to the persist time measured here. With a
+    ``ledger`` every run, failed ones included, is appended to ``capture_runs``
+    under its ``run_id``.
+
+    Three stages overlap: the client downloads pages ahead on its own threads,
+    this thread parses entries into batches, and a ``SerialWriter`` thread
+    writes them to SQLite. Up to ``write_queue_depth`` parsed batches wait for
+    the writer, which bounds memory. A failure in any stage stops the run
+    before the last batch, and ``last_run_at`` is committed together with that
+    last batch.
+
+    Setting ``stop_event`` ends the run after the batch being parsed: batches
+    already handed to the writer are still written, ``last_run_at`` is left as
+    it was and ``CaptureInterrupted`` is raised.
+    """
+
     def __init__(
         self,
         client: PlacspClient,
         repository: RawTenderRepository,
         state_store: StateStore,
         overlap_minutes: int = 120,
+        batch_size: int = 500,
+        metrics: MetricsRecorder = NULL_METRICS,
+        ledger: Optional[RunLedger] = None,
+        write_queue_depth: int = 2,
+        state_key: str = "capture",
+        stop_event: Optional[threading.Event] = None,
     ) -> None:
         self.client = client
         self.repository = repository
         self.state_store = state_store
         self.overlap_minutes = overlap_minutes
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.ledger = ledger
+        self.write_queue_depth = write_queue_depth
+        # Prefix of this feed's keys in pipeline_state; each source needs its own.
+        self.state_key = state_key
+        self.stop_event = stop_event
 
     def run(self) -> CaptureRunResult:
-        previous_run = self.state_store.get_last_run_at()
+        run = CaptureRunRecord(
+            run_id=uuid.uuid4().hex,
+            source=self.client.config.source_name,
+            status="failed",
+            started_at=datetime.now(timezone.utc),
+            finished_at=datetime.now(timezone.utc),
+        )
+        self.metrics.reset()
+        try:
+            result = self._run(run.run_id)
+        except BaseException as exc:
+            run.status = "interrupted" if isinstance(exc, CaptureInterrupted) else "failed"
+            run.error = repr(exc)
+            self._record(run)
+            raise
+        run.status = "not_modified" if result.not_modified else "ok"
+        run.fetched = result.fetched
+        run.inserted = result.inserted
+        run.updated = result.updated
+        run.unchanged = result.unchanged
+        self._record(run)
+        return result
+
+    def _record(self, run: CaptureRunRecord) -> None:
+        run.finished_at = datetime.now(timezone.utc)
+        snapshot = self.metrics.snapshot()
+        run.timings = snapshot["timings"]
+        run.counters = snapshot["counters"]
+        if self.metrics.enabled:
+            logger.info(
+                "Capture run %s %s in %.2fs. stages=%s counters=%s",
+                run.run_id,
+                run.status,
+                run.duration_seconds,
+                {stage: round(seconds, 3) for stage, seconds in run.timings.items()},
+                run.counters,
+            )
+        if self.ledger is None:
+            return
+        try:
+            self.ledger.record(run)
+        except Exception:
+            # The ledger is diagnostics: never let it fail or mask the capture itself.
+            logger.exception("Could not record capture run %s", run.run_id)
+
+    def _run(self, run_id: str) -> CaptureRunResult:
+        last_run_key = f"{self.state_key}.last_successful_run_at"
+        validators_key = f"{self.state_key}.feed_validators"
+        previous_run = self.state_store.get_last_run_at(last_run_key)
         effective_since = self._effective_since(previous_run)
         logger.info(
             "Starting capture. last_run_at=%s effective_since=%s overlap_minutes=%s",
@@ -44,26 +140,83 @@ class CaptureService:
             self.overlap_minutes,
         )
 
-        tenders = self.client.fetch_since(effective_since)
-        captured_at = datetime.now(timezone.utc)
-        inserted = self.repository.upsert_many(tenders, captured_at)
-
+        # Every batch is stamped with ``captured_at`` but commits on its own, so keyset readers
+        # must stay below it until the run ends. Taking the stamp under the write lock keeps it
+        # later than anything already committed.
+        with self.repository.database.transaction():
+            captured_at = datetime.now(timezone.utc)
+            self.state_store.mark_capture_running(self.state_key, captured_at.isoformat())
+        # Without a watermark a 304 would hide the initial load, so only replay validators afterwards.
+        stored_validators = self.state_store.get_feed_validators(validators_key) if previous_run else None
+        validators = stored_validators or FeedValidators()
+        fetched = 0
+        upserted = UpsertResult()
+        last_batch: List[TenderRaw] = []
         new_last_run = captured_at
-        self.state_store.set_last_run_at(new_last_run)
+        interrupted = False
+
+        # Runs on the writer thread only, one job at a time, so ``upserted`` needs no lock.
+        def persist(batch: List[TenderRaw], commit_state: bool = False) -> None:
+            nonlocal upserted
+            with self.metrics.timer("persist"), self.repository.database.transaction():
+                upserted = upserted + self.repository.upsert_many(batch, captured_at)
+                if commit_state:
+                    self.state_store.set_last_run_at(new_last_run, last_run_key)
+                    self.state_store.set_feed_validators(validators, validators_key)
+
+        try:
+            with SerialWriter(self.write_queue_depth) as writer, closing(
+                self.client.iter_since(effective_since, validators)
+            ) as tenders:
+                for batch in iter_batches(tenders, self.batch_size):
+                    fetched += len(batch)
+                    # Hold back one batch so the final write and the new state commit together.
+                    if last_batch:
+                        with self.metrics.timer("persist_wait"):
+                            writer.submit(partial(persist, last_batch))
+                    last_batch = batch
+                    if self.stop_event is not None and self.stop_event.is_set():
+                        interrupted = True
+                        break
+                # An interrupted run still writes what it parsed, but leaves the state for the next run.
+                writer.submit(partial(persist, last_batch, commit_state=not interrupted))
+        except FeedNotModified:
+            logger.info("Feed not modified since last run; nothing to capture")
+            return CaptureRunResult(
+                fetched=0,
+                inserted=0,
+                updated=0,
+                unchanged=0,
+                last_run_at=previous_run,
+                new_last_run_at=previous_run or captured_at,
+                effective_since=effective_since,
+                not_modified=True,
+                run_id=run_id,
+            )
+        finally:
+            self.state_store.clear_capture_running(self.state_key)
+
+        if interrupted:
+            raise CaptureInterrupted(f"Stopped after {fetched} tenders; last_run_at left at {previous_run}")
 
         logger.info(
-            "Capture finished. fetched=%s inserted=%s new_last_run_at=%s",
-            len(tenders),
-            inserted,
+            "Capture finished. fetched=%s inserted=%s updated=%s unchanged=%s new_last_run_at=%s",
+            fetched,
+            upserted.inserted,
+            upserted.updated,
+            upserted.unchanged,
             new_last_run,
         )
 
         return CaptureRunResult(
-            fetched=len(tenders),
-            inserted=inserted,
+            fetched=fetched,
+            inserted=upserted.inserted,
+            updated=upserted.updated,
+            unchanged=upserted.unchanged,
             last_run_at=previous_run,
             new_last_run_at=new_last_run,
             effective_since=effective_since,
+            run_id=run_id,
         )
 
     def _effective_since(self, previous_run: Optional[datetime]) -> Optional[datetime]:
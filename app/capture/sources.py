@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import logging
+from pathlib import Path
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from app.capture.database import Database
+from app.capture.metrics import NULL_METRICS, MetricsRecorder, RunLedger
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.service import CaptureInterrupted, CaptureRunResult, CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+from app.capture.transport import HttpTransport, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCES_FILE = Path("config/sources.json")
+FEED_FORMATS = ("auto", "atom", "json")
+
+
+@dataclass(slots=True)
+class SourceConfig:
+    """One feed to capture: its client settings, ``pipeline_state`` key prefix and politeness limits."""
+
+    name: str
+    client: PlacspClientConfig
+    state_key: str
+    concurrency: int = 2
+    requests_per_second: float = 1.0
+    enabled: bool = True
+
+
+@dataclass(slots=True)
+class SourcesConfig:
+    sources: List[SourceConfig] = field(default_factory=list)
+    max_connections: int = 6
+
+
+class SourcesFailed(Exception):
+    """Every enabled source failed in the same scheduler run."""
+
+
+@dataclass(slots=True)
+class SourceRunResult:
+    name: str
+    result: Optional[CaptureRunResult] = None
+    error: Optional[str] = None
+    # Stopped through ``stop_event`` rather than failed.
+    interrupted: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_sources(path: Path = DEFAULT_SOURCES_FILE) -> SourcesConfig:
+    """Read the sources file (JSON); raise ``ValueError`` on unknown formats or repeated names/state keys."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    sources: List[SourceConfig] = []
+    for item in data.get("sources", []):
+        name = str(item["name"])
+        feed_format = str(item.get("format", "auto"))
+        if feed_format not in FEED_FORMATS:
+            raise ValueError(f"Source {name!r}: unknown format {feed_format!r} (expected one of {FEED_FORMATS})")
+        concurrency = int(item.get("concurrency", 2))
+        sources.append(
+            SourceConfig(
+                name=name,
+                client=PlacspClientConfig(
+                    source_url=str(item["url"]),
+                    timeout_seconds=int(item.get("timeout_seconds", 30)),
+                    source_name=str(item.get("source_name", name)),
+                    retry_attempts=int(item.get("retry_attempts", 3)),
+                    retry_backoff_seconds=float(item.get("retry_backoff_seconds", 1.0)),
+                    max_pages=item.get("max_pages"),
+                    prefetch_pages=concurrency,
+                    feed_format=feed_format,
+                ),
+                state_key=str(item.get("state_key", f"capture.{name}")),
+                concurrency=concurrency,
+                requests_per_second=float(item.get("requests_per_second", 1.0)),
+                enabled=bool(item.get("enabled", True)),
+            )
+        )
+    for attribute in ("name", "state_key"):
+        values = [getattr(source, attribute) for source in sources]
+        repeated = sorted({value for value in values if values.count(value) > 1})
+        if repeated:
+            raise ValueError(f"Repeated source {attribute} in {path}: {', '.join(repeated)}")
+    return SourcesConfig(sources=sources, max_connections=int(data.get("max_connections", 6)))
+
+
+class CaptureScheduler:
+    """Capture several feeds in parallel into the same database.
+
+    Each source runs its own ``CaptureService`` on a thread of its own. It has
+    its own ``pipeline_state`` keys, request rate limit and page prefetch
+    depth (``concurrency``). All sources share one cap on open HTTP
+    connections (``max_connections``). A source that fails is logged and
+    reported; it does not stop the others, and its watermark stays where it
+    was. Setting ``stop_event`` stops every source after its current batch.
+
+    Clients, transports and services are built once, so repeated ``run`` or
+    ``poll`` calls (the daemon) reuse each source's keep-alive connections.
+    Call ``close`` when done.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        config: SourcesConfig,
+        overlap_minutes: int = 120,
+        batch_size: int = 500,
+        ledger: Optional[RunLedger] = None,
+        metrics_factory: Callable[[], MetricsRecorder] = lambda: NULL_METRICS,
+        database: Optional[Database] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.config = config
+        self.overlap_minutes = overlap_minutes
+        self.batch_size = batch_size
+        self.ledger = ledger
+        self.metrics_factory = metrics_factory
+        self.database = database or Database.shared(db_path)
+        self.stop_event = stop_event
+        # Built once so schema checks and migrations do not race between source threads.
+        self.repository = RawTenderRepository(db_path, database=self.database)
+        self.state_store = StateStore(db_path, database=self.database)
+        self._connection_slots = threading.BoundedSemaphore(max(config.max_connections, 1))
+        self._services: List[Tuple[SourceConfig, CaptureService]] = [
+            (source, self._service_for(source)) for source in config.sources if source.enabled
+        ]
+
+    def close(self) -> None:
+        for _, service in self._services:
+            service.client.close()
+
+    def run(self) -> List[SourceRunResult]:
+        if not self._services:
+            return []
+        with ThreadPoolExecutor(max_workers=len(self._services), thread_name_prefix="capture-source") as pool:
+            results = list(pool.map(lambda item: self._run_source(*item), self._services))
+        failed = [result.name for result in results if not result.ok]
+        logger.info("Captured %s sources; failed: %s", len(results), failed or "none")
+        return results
+
+    def poll(self) -> int:
+        """Run every source once for the daemon and return how many tenders were new or changed.
+
+        Raises ``CaptureInterrupted`` when stopped and ``SourcesFailed`` when no
+        source succeeded, so the daemon counts the poll as failed and backs off.
+        """
+        results = self.run()
+        if any(item.interrupted for item in results):
+            raise CaptureInterrupted("Capture stopped on request")
+        if results and not any(item.ok for item in results):
+            raise SourcesFailed("; ".join(f"{item.name}: {item.error}" for item in results))
+        return sum(item.result.inserted + item.result.updated for item in results if item.result is not None)
+
+    def _service_for(self, source: SourceConfig) -> CaptureService:
+        metrics = self.metrics_factory()
+        transport = HttpTransport(
+            timeout_seconds=source.client.timeout_seconds,
+            retry_attempts=source.client.retry_attempts,
+            retry_backoff_seconds=source.client.retry_backoff_seconds,
+            metrics=metrics,
+            rate_limiter=RateLimiter(source.requests_per_second, burst=source.concurrency),
+            connection_slots=self._connection_slots,
+        )
+        client = PlacspClient(source.client, transport=transport, metrics=metrics)
+        return CaptureService(
+            client=client,
+            repository=self.repository,
+            state_store=self.state_store,
+            overlap_minutes=self.overlap_minutes,
+            batch_size=self.batch_size,
+            metrics=metrics,
+            ledger=self._ledger_for(source),
+            state_key=source.state_key,
+            stop_event=self.stop_event,
+        )
+
+    def _run_source(self, source: SourceConfig, service: CaptureService) -> SourceRunResult:
+        try:
+            return SourceRunResult(name=source.name, result=service.run())
+        except CaptureInterrupted as exc:
+            logger.info("Capture of source %s stopped on request", source.name)
+            return SourceRunResult(name=source.name, error=repr(exc), interrupted=True)
+        except Exception as exc:
+            logger.exception("Capture of source %s failed", source.name)
+            return SourceRunResult(name=source.name, error=repr(exc))
+
+    def _ledger_for(self, source: SourceConfig) -> Optional[RunLedger]:
+        if self.ledger is None or self.ledger.textfile_path is None:
+            return self.ledger
+        # One textfile per source, so sources do not overwrite each other's metrics.
+        textfile = self.ledger.textfile_path
+        return RunLedger(
+            self.db_path,
+            database=self.ledger.database,
+            textfile_path=textfile.with_name(f"{textfile.stem}_{source.name}{textfile.suffix}"),
+        )
+
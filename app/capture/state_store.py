@@ -1,24 +1,24 @@
 from __future__ import annotations
 
-import sqlite3
+import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.capture.database import Database
+from app.capture.models import FeedValidators
 
 
 class StateStore:
     """Persist lightweight pipeline state, such as last successful capture timestamp."""
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, database: Optional[Database] = None) -> None:
         self.db_path = db_path
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.database = database or Database.shared(db_path)
         self._ensure_table()
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
-
     def _ensure_table(self) -> None:
-        with self._connect() as conn:
+        with self.database.transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS pipeline_state (
@@ -30,14 +30,10 @@ class StateStore:
             )
 
     def get_last_run_at(self, key: str = "capture.last_successful_run_at") -> Optional[datetime]:
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT value FROM pipeline_state WHERE key = ?",
-                (key,),
-            ).fetchone()
-        if not row:
+        value = self._get_value(key)
+        if value is None:
             return None
-        return datetime.fromisoformat(row[0])
+        return datetime.fromisoformat(value)
 
     def set_last_run_at(
         self,
@@ -46,8 +42,93 @@ class StateStore:
     ) -> None:
         if run_at.tzinfo is None:
             run_at = run_at.replace(tzinfo=timezone.utc)
+        self._set_value(key, run_at.isoformat())
+
+    def get_feed_validators(self, key: str = "capture.feed_validators") -> Optional[FeedValidators]:
+        value = self._get_value(key)
+        if value is None:
+            return None
+        data = json.loads(value)
+        return FeedValidators(etag=data.get("etag"), last_modified=data.get("last_modified"))
+
+    def set_feed_validators(
+        self,
+        validators: FeedValidators,
+        key: str = "capture.feed_validators",
+    ) -> None:
+        self._set_value(key, json.dumps({"etag": validators.etag, "last_modified": validators.last_modified}))
+
+    def get_watermark(self, key: str) -> Optional[Tuple[str, int]]:
+        """Return the ``(updated_at, id)`` of the last ``tenders_raw`` row a stage has processed."""
+        value = self._get_value(key)
+        if value is None:
+            return None
+        data = json.loads(value)
+        return data["updated_at"], int(data["id"])
+
+    def set_watermark(self, key: str, watermark: Tuple[str, int]) -> None:
+        updated_at, row_id = watermark
+        self._set_value(key, json.dumps({"updated_at": updated_at, "id": row_id}))
+
+    def get_export_manifest(self, key: str) -> Dict[str, Any]:
+        """Return the format and per-partition fingerprints of a dataset's last columnar export."""
+        value = self._get_value(key)
+        if value is None:
+            return {}
+        return json.loads(value)
+
+    def set_export_manifest(self, key: str, manifest: Dict[str, Any]) -> None:
+        self._set_value(key, json.dumps(manifest, sort_keys=True))
+
+    def get_backfill_completed_members(self, archive_name: str) -> Set[str]:
+        prefix = f"backfill.member.{archive_name}/"
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                "SELECT key FROM pipeline_state WHERE key >= ? AND key < ?",
+                (prefix, prefix[:-1] + "0"),
+            ).fetchall()
+        return {row[0][len(prefix) :] for row in rows}
+
+    def mark_backfill_member_completed(self, archive_name: str, member: str) -> None:
+        self._set_value(f"backfill.member.{archive_name}/{member}", datetime.now(timezone.utc).isoformat())
+
+    def is_backfill_archive_completed(self, archive_name: str) -> bool:
+        return self._get_value(f"backfill.archive.{archive_name}") is not None
+
+    def mark_backfill_archive_completed(self, archive_name: str) -> None:
+        self._set_value(f"backfill.archive.{archive_name}", datetime.now(timezone.utc).isoformat())
+
+    def mark_capture_running(self, state_key: str, captured_at: str) -> None:
+        """Record that a capture stamping rows with ``captured_at`` is committing batches."""
+        self._set_value(f"capture.running.{state_key}", captured_at)
+
+    def clear_capture_running(self, state_key: str) -> None:
+        with self.database.transaction() as conn:
+            conn.execute("DELETE FROM pipeline_state WHERE key = ?", (f"capture.running.{state_key}",))
+
+    def oldest_running_capture(self) -> Optional[str]:
+        """Return the earliest ``updated_at`` a still-running capture may keep writing."""
+        prefix = "capture.running."
+        with self.database.connection() as conn:
+            row = conn.execute(
+                "SELECT MIN(value) FROM pipeline_state WHERE key >= ? AND key < ?",
+                (prefix, prefix[:-1] + "/"),
+            ).fetchone()
+        return row[0]
+
+    def _get_value(self, key: str) -> Optional[str]:
+        with self.database.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM pipeline_state WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        return row[0]
+
+    def _set_value(self, key: str, value: str) -> None:
         now = datetime.now(timezone.utc).isoformat()
-        with self._connect() as conn:
+        with self.database.transaction() as conn:
             conn.execute(
                 """
                 INSERT INTO pipeline_state(key, value, updated_at)
@@ -56,5 +137,5 @@ class StateStore:
                 SET value = excluded.value,
                     updated_at = excluded.updated_at
                 """,
-                (key, run_at.isoformat(), now),
+                (key, value, now),
             )
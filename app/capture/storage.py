@@ -1,26 +1,138 @@
 from __future__ import annotations
 
-import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
+import hashlib
+from itertools import repeat
+import json
+import sqlite3
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
+from app.capture.batching import iter_batches
+from app.capture.database import Database
+from app.capture.migrations import apply_migrations
 from app.capture.models import TenderRaw
+from app.capture.normalize import join_cpv_codes, normalize_cpv_prefix, normalize_region_code, to_epoch
+from app.capture.search import ensure_search_index
+from app.capture.tender_batch import TenderBatch
+
+TENDER_COLUMNS = (
+    "external_id",
+    "title",
+    "summary",
+    "link",
+    "published_at",
+    "deadline_at",
+    "buyer_name",
+    "region",
+    "cpv",
+    "budget_amount",
+    "source",
+    "content_hash",
+    "created_at",
+    "updated_at",
+    "published_ts",
+    "deadline_ts",
+    "created_ts",
+    "cpv_prefix",
+    "region_code",
+    "cpv_codes",
+    "document_urls",
+)
+_COLUMN_LIST = ", ".join(TENDER_COLUMNS)
+_T = TypeVar("_T")
+# Columns refreshed when a republished tender changed; created_at keeps the first capture time.
+_MUTABLE_COLUMNS = (
+    "title",
+    "summary",
+    "link",
+    "published_at",
+    "deadline_at",
+    "buyer_name",
+    "region",
+    "cpv",
+    "budget_amount",
+    "content_hash",
+    "updated_at",
+    "published_ts",
+    "deadline_ts",
+    "cpv_prefix",
+    "region_code",
+    "cpv_codes",
+    "document_urls",
+)
+
+STAGE_INCOMING_SQL = f"""
+    INSERT OR REPLACE INTO temp.tenders_incoming ({_COLUMN_LIST})
+    VALUES ({", ".join("?" for _ in TENDER_COLUMNS)})
+"""
+
+ARCHIVE_CHANGED_SQL = """
+    INSERT INTO tenders_raw_history (
+        tender_id, external_id, title, summary, link, published_at, deadline_at,
+        buyer_name, region, cpv, budget_amount, source, content_hash, created_at, superseded_at
+    )
+    SELECT
+        t.id, t.external_id, t.title, t.summary, t.link, t.published_at, t.deadline_at,
+        t.buyer_name, t.region, t.cpv, t.budget_amount, t.source, t.content_hash, t.created_at, i.updated_at
+    FROM tenders_raw AS t
+    JOIN temp.tenders_incoming AS i
+        ON i.external_id = t.external_id AND i.source = t.source
+    WHERE t.content_hash IS NOT i.content_hash
+"""
+
+UPDATE_CHANGED_SQL = f"""
+    UPDATE tenders_raw
+    SET {", ".join(f"{column} = i.{column}" for column in _MUTABLE_COLUMNS)}
+    FROM temp.tenders_incoming AS i
+    WHERE i.external_id = tenders_raw.external_id
+        AND i.source = tenders_raw.source
+        AND tenders_raw.content_hash IS NOT i.content_hash
+"""
+
+INSERT_NEW_SQL = f"""
+    INSERT OR IGNORE INTO tenders_raw ({_COLUMN_LIST})
+    SELECT {_COLUMN_LIST} FROM temp.tenders_incoming
+"""
+
+
+@dataclass(slots=True)
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
 
 
 class RawTenderRepository:
-    """Store raw capture output in SQLite and protect against duplicates."""
+    """Store raw capture output in SQLite and protect against duplicates.
+
+    Rows carry a content hash of their business fields. Re-captured tenders are
+    compared by hash in bulk: unchanged ones are left alone, changed ones are
+    updated in place and their previous version is appended to
+    ``tenders_raw_history``.
+
+    ``upsert_many`` commits every ``batch_size`` rows; inside an enclosing
+    ``database.transaction()`` it joins that transaction instead. It takes
+    ``TenderRaw`` records or a columnar ``TenderBatch``, whose columns are
+    written without rebuilding the records.
+    """
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, batch_size: int = 1000, database: Optional[Database] = None) -> None:
         self.db_path = db_path
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.database = database or Database.shared(db_path)
         self._ensure_table()
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
-
     def _ensure_table(self) -> None:
-        with self._connect() as conn:
+        with self.database.transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tenders_raw (
@@ -37,52 +149,174 @@ class RawTenderRepository:
                     budget_amount REAL,
                     source TEXT NOT NULL,
                     created_at TEXT NOT NULL,
+                    content_hash TEXT,
+                    updated_at TEXT,
                     UNIQUE (external_id, source)
                 )
                 """
             )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tenders_raw)")}
+            if "content_hash" not in columns:
+                conn.execute("ALTER TABLE tenders_raw ADD COLUMN content_hash TEXT")
+                self._hash_existing_rows(conn)
+            if "updated_at" not in columns:
+                conn.execute("ALTER TABLE tenders_raw ADD COLUMN updated_at TEXT")
+                conn.execute("UPDATE tenders_raw SET updated_at = created_at")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tenders_raw_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tender_id INTEGER NOT NULL,
+                    external_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    deadline_at TEXT,
+                    buyer_name TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    cpv TEXT NOT NULL,
+                    budget_amount REAL,
+                    source TEXT NOT NULL,
+                    content_hash TEXT,
+                    created_at TEXT NOT NULL,
+                    superseded_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tenders_raw_history_tender ON tenders_raw_history (tender_id)"
+            )
+            ensure_search_index(conn)
+            apply_migrations(conn)
 
-    def upsert_many(self, tenders: Iterable[TenderRaw], captured_at: datetime) -> int:
-        rows = [
-            (
-                item.external_id,
-                item.title,
-                item.summary,
-                item.link,
-                item.published_at.isoformat(),
-                item.deadline_at.isoformat() if item.deadline_at else None,
-                item.buyer_name,
-                item.region,
-                item.cpv,
-                item.budget_amount,
-                item.source,
-                captured_at.isoformat(),
+    def upsert_many(self, tenders: Union[Iterable[TenderRaw], TenderBatch], captured_at: datetime) -> UpsertResult:
+        captured = captured_at.isoformat()
+        captured_ts = to_epoch(captured_at)
+        if isinstance(tenders, TenderBatch):
+            slices: Iterable[Tuple[TenderBatch, int, int]] = (
+                (tenders, start, start + self.batch_size) for start in range(0, len(tenders), max(self.batch_size, 1))
             )
-            for item in tenders
-        ]
-        if not rows:
-            return 0
-
-        with self._connect() as conn:
-            before = conn.total_changes
-            conn.executemany(
-                """
-                INSERT OR IGNORE INTO tenders_raw (
-                    external_id,
-                    title,
-                    summary,
-                    link,
-                    published_at,
-                    deadline_at,
-                    buyer_name,
-                    region,
-                    cpv,
-                    budget_amount,
-                    source,
-                    created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                rows,
+        else:
+            # Records are packed into a columnar batch per transaction, so rows have a single assembler.
+            slices = (
+                (batch, 0, len(batch))
+                for batch in map(TenderBatch.from_tenders, iter_batches(tenders, self.batch_size))
             )
-            inserted = conn.total_changes - before
-        return inserted
+        result = UpsertResult()
+        for batch, start, stop in slices:
+            with self.database.transaction() as conn:
+                result = result + self._merge_rows(conn, _batch_rows(batch, start, stop, captured, captured_ts))
+        return result
+
+    def _merge_rows(self, conn: sqlite3.Connection, rows: Iterable[tuple]) -> UpsertResult:
+        conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS tenders_incoming AS SELECT {_COLUMN_LIST} FROM tenders_raw WHERE 0"
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS temp.idx_tenders_incoming_key ON tenders_incoming (external_id, source)"
+        )
+        conn.execute("DELETE FROM temp.tenders_incoming")
+        conn.executemany(STAGE_INCOMING_SQL, rows)
+        staged = conn.execute("SELECT COUNT(*) FROM temp.tenders_incoming").fetchone()[0]
+
+        conn.execute(ARCHIVE_CHANGED_SQL)
+        # rowcount, unlike total_changes, leaves out rows written by the search index triggers.
+        updated = conn.execute(UPDATE_CHANGED_SQL).rowcount
+        inserted = conn.execute(INSERT_NEW_SQL).rowcount
+        conn.execute("DELETE FROM temp.tenders_incoming")
+        return UpsertResult(inserted=inserted, updated=updated, unchanged=staged - inserted - updated)
+
+    def _hash_existing_rows(self, conn: sqlite3.Connection) -> None:
+        rows = conn.execute(
+            "SELECT id, title, summary, link, deadline_at, buyer_name, region, cpv, budget_amount FROM tenders_raw"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE tenders_raw SET content_hash = ? WHERE id = ?",
+            [(content_hash(row[1:]), row[0]) for row in rows],
+        )
+
+
+def _batch_rows(
+    batch: TenderBatch,
+    start: int,
+    stop: int,
+    captured: str,
+    captured_ts: Optional[int],
+) -> Iterator[tuple]:
+    """Rows of ``TENDER_COLUMNS`` for a ``TenderBatch`` slice, assembled column by column.
+
+    Lot CPVs beyond the main ``cpv`` and document URIs enter the content hash
+    only when present, so rows without them keep their digest. When ``cpv``
+    holds no code, every entry of ``cpv_codes`` is such a lot CPV.
+
+    Derived values of dictionary-coded fields (CPV prefix, region code) are
+    computed once per distinct value. Rows are zipped lazily, as ``executemany``
+    consumes them.
+    """
+    values = batch.strings.values
+    cpv_prefixes = _per_code(normalize_cpv_prefix, values, batch.cpv[start:stop])
+    region_codes = _per_code(normalize_region_code, values, batch.region[start:stop])
+    titles = batch.title[start:stop]
+    summaries = batch.summary[start:stop]
+    links = batch.link[start:stop]
+    deadlines = batch.deadline_at_iso(start, stop)
+    buyers = batch.texts(batch.buyer_name, start, stop)
+    regions = batch.texts(batch.region, start, stop)
+    cpvs = batch.texts(batch.cpv, start, stop)
+    budgets = batch.budget_amounts(start, stop)
+    cpv_codes = [join_cpv_codes(cpv, codes) for cpv, codes in zip(cpvs, batch.cpv_codes[start:stop])]
+    # 1 when cpv_codes starts with the main cpv's own code, which the hash already holds as ``cpv``.
+    main_codes = _per_code(_main_code_count, values, batch.cpv[start:stop])
+    documents = batch.document_urls[start:stop]
+    hashes = [
+        content_hash((title, summary, link, deadline, buyer, region, cpv, budget, *codes.split()[main:], *urls))
+        for title, summary, link, deadline, buyer, region, cpv, budget, codes, main, urls in zip(
+            titles, summaries, links, deadlines, buyers, regions, cpvs, budgets, cpv_codes, main_codes, documents
+        )
+    ]
+    count = len(titles)
+    return zip(
+        batch.external_id[start:stop],
+        titles,
+        summaries,
+        links,
+        batch.published_at_iso(start, stop),
+        deadlines,
+        buyers,
+        regions,
+        cpvs,
+        budgets,
+        batch.texts(batch.source, start, stop),
+        hashes,
+        repeat(captured, count),
+        repeat(captured, count),
+        batch.published_ts(start, stop),
+        batch.deadline_ts(start, stop),
+        repeat(captured_ts, count),
+        cpv_prefixes,
+        region_codes,
+        cpv_codes,
+        [json.dumps(list(urls), ensure_ascii=False) for urls in documents],
+    )
+
+
+def _main_code_count(cpv: str) -> int:
+    return 1 if join_cpv_codes(cpv) else 0
+
+
+def _per_code(derive: Callable[[str], _T], values: List[str], codes: Sequence[int]) -> List[_T]:
+    derived: Dict[int, _T] = {}
+    column = []
+    for code in codes:
+        value = derived.get(code)
+        if value is None:
+            value = derived[code] = derive(values[code])
+        column.append(value)
+    return column
+
+
+def content_hash(business_fields: Sequence[object]) -> str:
+    """Stable digest of a tender's stored business fields (publication timestamp excluded)."""
+    encoded = json.dumps(list(business_fields), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.capture.models import TenderRaw
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# Offset recorded for datetimes without tzinfo; they are stored as UTC and given back naive.
+NAIVE_OFFSET = -(2**31)
+
+
+class StringPool:
+    """Dictionary encoding of low-cardinality text: each distinct value is stored once and addressed by a code."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def intern(self, value: str) -> str:
+        """The pooled object equal to ``value``, so repeated values share one string."""
+        return self.values[self.code(value)]
+
+
+@dataclass(slots=True)
+class TenderBatch:
+    """Columnar container for many ``TenderRaw`` records.
+
+    Backfills hold hundreds of thousands of tenders between parsing and the
+    upsert. A list of dataclasses keeps two ``datetime`` objects, one ``float`` and
+    separate copies of the repeated buyer, region, CPV and source strings per
+    tender. Here those fields are columns instead:
+
+    - buyer, region, CPV and source are ``uint32`` codes into a shared ``StringPool``;
+    - timestamps are ``int64`` microseconds since the epoch, plus an ``int32`` UTC
+      offset in seconds, so the original ISO text (and the content hash) is
+      reproduced exactly;
+    - the budget is a ``float64`` array with a null mask, as is the deadline.
+
+    Title, summary, link and external id stay as plain string lists. Records are
+    rebuilt only when indexed or iterated. ``RawTenderRepository.upsert_many``
+    reads the columns directly.
+    """
+
+    strings: StringPool = field(default_factory=StringPool)
+    external_id: List[str] = field(default_factory=list)
+    title: List[str] = field(default_factory=list)
+    summary: List[str] = field(default_factory=list)
+    link: List[str] = field(default_factory=list)
+    published_us: array = field(default_factory=lambda: array("q"))
+    published_offset: array = field(default_factory=lambda: array("i"))
+    deadline_us: array = field(default_factory=lambda: array("q"))
+    deadline_offset: array = field(default_factory=lambda: array("i"))
+    # 1 where the column has a value; the value arrays hold 0 elsewhere.
+    deadline_mask: bytearray = field(default_factory=bytearray)
+    buyer_name: array = field(default_factory=lambda: array("I"))
+    region: array = field(default_factory=lambda: array("I"))
+    cpv: array = field(default_factory=lambda: array("I"))
+    source: array = field(default_factory=lambda: array("I"))
+    budget_amount: array = field(default_factory=lambda: array("d"))
+    budget_mask: bytearray = field(default_factory=bytearray)
+    # Tuples of pooled strings; tenders without extra codes or documents share the empty tuple.
+    cpv_codes: List[Tuple[str, ...]] = field(default_factory=list)
+    document_urls: List[Tuple[str, ...]] = field(default_factory=list)
+
+    @classmethod
+    def from_tenders(cls, tenders: Iterable[TenderRaw]) -> "TenderBatch":
+        """Consume ``tenders`` (typically a parser's generator) one record at a time."""
+        batch = cls()
+        batch.extend(tenders)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.external_id)
+
+    def __iter__(self) -> Iterator[TenderRaw]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> TenderRaw:
+        if index < 0:
+            index += len(self)
+        values = self.strings.values
+        return TenderRaw(
+            external_id=self.external_id[index],
+            title=self.title[index],
+            summary=self.summary[index],
+            link=self.link[index],
+            published_at=_to_datetime(self.published_us[index], self.published_offset[index]),
+            deadline_at=(
+                _to_datetime(self.deadline_us[index], self.deadline_offset[index])
+                if self.deadline_mask[index]
+                else None
+            ),
+            buyer_name=values[self.buyer_name[index]],
+            region=values[self.region[index]],
+            cpv=values[self.cpv[index]],
+            budget_amount=self.budget_amount[index] if self.budget_mask[index] else None,
+            source=values[self.source[index]],
+            cpv_codes=list(self.cpv_codes[index]),
+            document_urls=list(self.document_urls[index]),
+        )
+
+    def append(self, tender: TenderRaw) -> None:
+        strings = self.strings
+        self.external_id.append(tender.external_id)
+        self.title.append(tender.title)
+        self.summary.append(tender.summary)
+        self.link.append(tender.link)
+        micros, offset = _from_datetime(tender.published_at)
+        self.published_us.append(micros)
+        self.published_offset.append(offset)
+        micros, offset = (0, 0) if tender.deadline_at is None else _from_datetime(tender.deadline_at)
+        self.deadline_us.append(micros)
+        self.deadline_offset.append(offset)
+        self.deadline_mask.append(tender.deadline_at is not None)
+        self.buyer_name.append(strings.code(tender.buyer_name))
+        self.region.append(strings.code(tender.region))
+        self.cpv.append(strings.code(tender.cpv))
+        self.source.append(strings.code(tender.source))
+        self.budget_amount.append(0.0 if tender.budget_amount is None else tender.budget_amount)
+        self.budget_mask.append(tender.budget_amount is not None)
+        self.cpv_codes.append(tuple(strings.intern(code) for code in tender.cpv_codes))
+        self.document_urls.append(tuple(tender.document_urls))
+
+    def extend(self, tenders: Iterable[TenderRaw]) -> None:
+        for tender in tenders:
+            self.append(tender)
+
+    # Column readers for the storage layer; ``start``/``stop`` select a slice of rows.
+
+    def texts(self, codes: array, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Decode a dictionary-coded column (``buyer_name``, ``region``, ``cpv`` or ``source``)."""
+        values = self.strings.values
+        return [values[code] for code in codes[start:stop]]
+
+    def published_at_iso(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return _iso_column(self.published_us[start:stop], self.published_offset[start:stop], None)
+
+    def deadline_at_iso(self, start: int = 0, stop: Optional[int] = None) -> List[Optional[str]]:
+        return _iso_column(
+            self.deadline_us[start:stop],
+            self.deadline_offset[start:stop],
+            self.deadline_mask[start:stop],
+        )
+
+    def published_ts(self, start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """Whole seconds since the epoch, as ``normalize.to_epoch`` gives them."""
+        return [_to_seconds(micros) for micros in self.published_us[start:stop]]
+
+    def deadline_ts(self, start: int = 0, stop: Optional[int] = None) -> List[Optional[int]]:
+        return [
+            _to_seconds(micros) if present else None
+            for micros, present in zip(self.deadline_us[start:stop], self.deadline_mask[start:stop])
+        ]
+
+    def budget_amounts(self, start: int = 0, stop: Optional[int] = None) -> List[Optional[float]]:
+        return [
+            amount if present else None
+            for amount, present in zip(self.budget_amount[start:stop], self.budget_mask[start:stop])
+        ]
+
+
+_TIMEZONES: Dict[int, timezone] = {0: timezone.utc}
+
+
+def _from_datetime(value: datetime) -> Tuple[int, int]:
+    offset = value.utcoffset()
+    if offset is None:
+        return (value.replace(tzinfo=timezone.utc) - _EPOCH) // _MICROSECOND, NAIVE_OFFSET
+    return (value - _EPOCH) // _MICROSECOND, int(offset.total_seconds())
+
+
+def _to_datetime(micros: int, offset: int) -> datetime:
+    moment = _EPOCH + timedelta(microseconds=micros)
+    if offset == NAIVE_OFFSET:
+        return moment.replace(tzinfo=None)
+    tz = _TIMEZONES.get(offset)
+    if tz is None:
+        tz = _TIMEZONES[offset] = timezone(timedelta(seconds=offset))
+    return moment.astimezone(tz)
+
+
+def _to_seconds(micros: int) -> int:
+    # int(datetime.timestamp()) truncates towards zero.
+    seconds, remainder = divmod(micros, 1_000_000)
+    return seconds + 1 if seconds < 0 and remainder else seconds
+
+
+def _iso_column(micros: array, offsets: array, mask: Optional[bytearray]) -> List[Optional[str]]:
+    # Deadlines repeat a handful of instants; format each distinct one once.
+    memo: Dict[Tuple[int, int], str] = {}
+    column: List[Optional[str]] = []
+    for index, (value, offset) in enumerate(zip(micros, offsets)):
+        if mask is not None and not mask[index]:
+            column.append(None)
+            continue
+        text = memo.get((value, offset))
+        if text is None:
+            text = memo[(value, offset)] = _to_datetime(value, offset).isoformat()
+        column.append(text)
+    return column
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from functools import partial
+import http.client
+import logging
+import random
+import ssl
+import threading
+import time
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+import zlib
+
+from app.capture.metrics import NULL_METRICS, MetricsRecorder
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 64 * 1024
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+
+HTTP_SCHEMES = ("http", "https")
+
+_PoolKey = Tuple[str, str, int]
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    url: str
+    status: int
+    headers: Message
+    body: BinaryIO
+
+
+class HttpTransport:
+    """Keep-alive HTTP(S) client with transparent gzip/deflate decoding and jittered retries.
+
+    Connections are pooled per host and reused once a response body has been read
+    to the end, so walking a feed's pages or polling it often does not pay a TLS
+    handshake per request. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = 30,
+        retry_attempts: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+        max_idle_per_host: int = 4,
+        metrics: MetricsRecorder = NULL_METRICS,
+        rate_limiter: Optional["RateLimiter"] = None,
+        connection_slots: Optional[threading.Semaphore] = None,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.retry_attempts = retry_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_idle_per_host = max_idle_per_host
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter
+        # Shared between transports to cap concurrent requests across sources.
+        self.connection_slots = connection_slots
+        self._ssl_context = ssl.create_default_context()
+        self._idle: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, url: str, headers: Mapping[str, str]) -> Iterator[HttpResponse]:
+        """Send a GET and yield the response with a decoded body stream.
+
+        304 responses are yielded as-is; other non-2xx statuses raise ``HTTPError``
+        once retries are exhausted. With ``connection_slots`` a slot is held
+        until the body has been consumed.
+        """
+        slots = self.connection_slots
+        if slots is None:
+            with self._open(url, headers) as response:
+                yield response
+            return
+        with slots:
+            with self._open(url, headers) as response:
+                yield response
+
+    @contextmanager
+    def _open(self, url: str, headers: Mapping[str, str]) -> Iterator[HttpResponse]:
+        request_headers = {"Accept-Encoding": "gzip, deflate", **headers}
+        for _ in range(MAX_REDIRECTS + 1):
+            key, connection, response = self._request_with_retries(url, request_headers)
+            if response.status in REDIRECT_STATUSES and response.getheader("Location"):
+                response.read()
+                self._release(key, connection, response)
+                url = urljoin(url, response.getheader("Location", ""))
+                continue
+            try:
+                if response.status >= 400:
+                    raise HTTPError(url, response.status, response.reason, response.headers, None)
+                yield HttpResponse(
+                    url=url,
+                    status=response.status,
+                    headers=response.headers,
+                    body=_decoded_body(response, self.metrics),
+                )
+            finally:
+                self._release(key, connection, response)
+            return
+        raise HTTPError(url, 310, "Too many redirects", Message(), None)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [connection for connections in self._idle.values() for connection in connections]
+            self._idle.clear()
+        for connection in idle:
+            connection.close()
+
+    def _request_with_retries(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> Tuple[_PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+        attempts = max(self.retry_attempts, 1)
+        for attempt in range(1, attempts + 1):
+            key = _pool_key(url)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self.metrics.incr("http_requests")
+            try:
+                connection, response = self._send(key, url, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                if attempt == attempts:
+                    logger.error("Failed to download %s after %s attempts", url, attempts)
+                    raise
+                self.metrics.incr("http_retries")
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "Download attempt %s/%s failed for %s: %s; retrying in %.1fs",
+                    attempt,
+                    attempts,
+                    url,
+                    exc,
+                    delay,
+                )
+                time.sleep(delay)
+                continue
+
+            if response.status not in RETRYABLE_STATUSES or attempt == attempts:
+                return key, connection, response
+
+            delay = _retry_after_seconds(response.getheader("Retry-After"))
+            if delay is None:
+                delay = self._backoff(attempt)
+            delay = min(delay, self.max_backoff_seconds)
+            response.read()
+            self._release(key, connection, response)
+            self.metrics.incr("http_retries")
+            logger.warning(
+                "Download attempt %s/%s for %s returned HTTP %s; retrying in %.1fs",
+                attempt,
+                attempts,
+                url,
+                response.status,
+                delay,
+            )
+            time.sleep(delay)
+        raise RuntimeError("Unknown download error without exception")
+
+    def _send(
+        self,
+        key: _PoolKey,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        connection, reused = self._acquire(key)
+        try:
+            connection.request("GET", target, headers=dict(headers))
+            return connection, connection.getresponse()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+        # The server dropped an idle keep-alive connection; retry once on a fresh one.
+        connection = self._new_connection(key)
+        try:
+            connection.request("GET", target, headers=dict(headers))
+            return connection, connection.getresponse()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+    def _acquire(self, key: _PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _new_connection(self, key: _PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout_seconds, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout_seconds)
+
+    def _release(
+        self,
+        key: _PoolKey,
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ) -> None:
+        if not response.isclosed() and response.length == 0:
+            response.read()
+        if not response.isclosed() or response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.retry_backoff_seconds * (2 ** (attempt - 1)), self.max_backoff_seconds)
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``burst``; thread-safe."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _DecompressingReader:
+    """File-like view of a gzip/deflate response body, decompressed chunk by chunk."""
+
+    def __init__(self, raw: BinaryIO, encoding: str, metrics: MetricsRecorder = NULL_METRICS) -> None:
+        self._raw = raw
+        self._metrics = metrics
+        self._encoding = encoding
+        wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+        self._decompressor = zlib.decompressobj(wbits)
+        self._started = False
+        self._buffer = b""
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(partial(self.read, READ_CHUNK_BYTES), b""))
+        while not self._buffer and not self._eof:
+            data = self._decompressor.unconsumed_tail or self._raw.read(READ_CHUNK_BYTES)
+            if not data:
+                self._buffer = self._decompressor.flush()
+                self._eof = True
+                break
+            self._buffer = self._decompress(data, size)
+            if self._decompressor.eof:
+                self._buffer += self._decompressor.flush()
+                self._eof = True
+                # Drain the raw stream so the connection can go back to the pool.
+                self._raw.read()
+        out, self._buffer = self._buffer[:size], self._buffer[size:]
+        return out
+
+    def _decompress(self, data: bytes, size: int) -> bytes:
+        if not self._metrics.enabled:
+            return self._inflate(data, size)
+        started = time.perf_counter()
+        try:
+            return self._inflate(data, size)
+        finally:
+            self._metrics.add_time("decode", time.perf_counter() - started)
+
+    def _inflate(self, data: bytes, size: int) -> bytes:
+        try:
+            result = self._decompressor.decompress(data, size)
+        except zlib.error:
+            # Some servers send raw deflate streams without the zlib header.
+            if self._encoding != "deflate" or self._started:
+                raise
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            result = self._decompressor.decompress(data, size)
+        self._started = True
+        return result
+
+
+def _decoded_body(response: http.client.HTTPResponse, metrics: MetricsRecorder = NULL_METRICS) -> BinaryIO:
+    encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return _DecompressingReader(response, "gzip", metrics)  # type: ignore[return-value]
+    if encoding == "deflate":
+        return _DecompressingReader(response, "deflate", metrics)  # type: ignore[return-value]
+    return response
+
+
+def is_http_url(url: str) -> bool:
+    """Whether ``url`` is an http(s) URL; remote data must never lead to local files."""
+    return urlsplit(url).scheme.lower() in HTTP_SCHEMES
+
+
+def _pool_key(url: str) -> _PoolKey:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in HTTP_SCHEMES:
+        raise ValueError(f"Unsupported URL scheme for HTTP transport: {url}")
+    port = parts.port or (443 if scheme == "https" else 80)
+    return scheme, parts.hostname or "", port
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
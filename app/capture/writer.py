@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Optional
+
+_STOP = object()
+
+
+class SerialWriter:
+    """Run write jobs in submission order on one background thread.
+
+    The capture keeps parsing while the previous batch is written, and every
+    SQLite write comes from this one thread. The queue holds at most ``depth``
+    pending jobs; when it is full ``submit`` blocks, so a slow database slows
+    the producer down instead of letting parsed batches pile up.
+
+    When a job fails, the writer discards the rest of the queue. The next
+    ``submit`` or ``close`` re-raises that exception in the caller's thread.
+    Leaving the ``with`` block because of an exception drops the pending jobs
+    without running them.
+    """
+
+    def __init__(self, depth: int = 2, name: str = "capture-writer") -> None:
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(depth, 1))
+        self._error: Optional[BaseException] = None
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "SerialWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        self._raise_if_failed()
+        self._queue.put(job)
+
+    def close(self) -> None:
+        """Wait for every submitted job, then re-raise the first failure if any."""
+        self._stop()
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        self._cancelled = True
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            # Keep draining after a failure or abort so a blocked producer is released.
+            if self._error is not None or self._cancelled:
+                continue
+            try:
+                job()  # type: ignore[operator]
+            except BaseException as exc:
+                self._error = exc
@@ -0,0 +1 @@
+"""Analytical snapshots of the pipeline tables for BI consumers."""
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.capture.database import Database
+from app.capture.normalize import iso_to_epoch
+from app.capture.state_store import StateStore
+
+try:  # Parquet when pyarrow is installed; otherwise one CSV file per partition
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = Path("data/exports")
+MANIFEST_KEY = "export.{dataset}.partitions"
+FORMAT_PARQUET = "parquet"
+FORMAT_CSV = "csv"
+UNKNOWN_PARTITION = "unknown"
+PARTITION_COLUMN = "published_month"
+
+# Month of publication, the partition key of every dataset.
+_PARTITION_SQL = f"COALESCE(strftime('%Y-%m', t.published_ts, 'unixepoch'), '{UNKNOWN_PARTITION}')"
+
+# Column kinds: how a SQLite value is typed in Parquet (and rendered in CSV).
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+TEXT = "text"
+# Low-cardinality text, dictionary-encoded in Parquet.
+CATEGORY = "category"
+# Epoch seconds (or ISO text when the name ends in "_at") stored as UTC timestamps.
+TIMESTAMP = "timestamp"
+# JSON array of strings.
+TEXT_LIST = "text_list"
+
+
+@dataclass(frozen=True, slots=True)
+class ExportColumn:
+    name: str
+    expression: str
+    kind: str
+
+
+@dataclass(frozen=True, slots=True)
+class ExportDataset:
+    """One exported table.
+
+    ``source`` is the ``FROM`` clause joining the table to ``tenders_raw`` (aliased
+    ``t``), which provides the partition key. ``changed_column`` is a timestamp
+    the pipeline bumps whenever one of the table's rows changes.
+    """
+
+    name: str
+    table: str
+    source: str
+    changed_column: str
+    columns: Tuple[ExportColumn, ...]
+
+
+DATASETS: Tuple[ExportDataset, ...] = (
+    ExportDataset(
+        name="tenders",
+        table="tenders_raw",
+        source="tenders_raw AS t",
+        changed_column="t.updated_at",
+        columns=(
+            ExportColumn("tender_id", "t.id", INT),
+            ExportColumn("external_id", "t.external_id", TEXT),
+            ExportColumn("source", "t.source", CATEGORY),
+            ExportColumn("title", "t.title", TEXT),
+            ExportColumn("summary", "t.summary", TEXT),
+            ExportColumn("link", "t.link", TEXT),
+            ExportColumn("buyer_name", "t.buyer_name", CATEGORY),
+            ExportColumn("region", "t.region", CATEGORY),
+            ExportColumn("region_code", "t.region_code", CATEGORY),
+            ExportColumn("cpv", "t.cpv", CATEGORY),
+            ExportColumn("cpv_codes", "t.cpv_codes", TEXT),
+            ExportColumn("budget_amount", "t.budget_amount", FLOAT),
+            ExportColumn("published_at", "t.published_ts", TIMESTAMP),
+            ExportColumn("deadline_at", "t.deadline_ts", TIMESTAMP),
+            ExportColumn("created_at", "t.created_ts", TIMESTAMP),
+            ExportColumn("updated_at", "t.updated_at", TIMESTAMP),
+            ExportColumn("document_urls", "t.document_urls", TEXT_LIST),
+            ExportColumn("content_hash", "t.content_hash", TEXT),
+        ),
+    ),
+    ExportDataset(
+        name="tenders_filtered",
+        table="tenders_filtered",
+        source="tenders_raw AS t JOIN tenders_filtered AS f ON f.tender_id = t.id",
+        changed_column="f.filtered_at",
+        columns=(
+            ExportColumn("tender_id", "t.id", INT),
+            ExportColumn("passed_filter", "f.passed_filter", BOOL),
+            ExportColumn("discard_reason", "f.discard_reason", CATEGORY),
+            ExportColumn("filtered_at", "f.filtered_at", TIMESTAMP),
+        ),
+    ),
+    ExportDataset(
+        name="tenders_scored",
+        table="tenders_scored",
+        source="tenders_raw AS t JOIN tenders_scored AS s ON s.tender_id = t.id",
+        changed_column="s.scored_at",
+        columns=(
+            ExportColumn("tender_id", "t.id", INT),
+            ExportColumn("score", "s.score", FLOAT),
+            ExportColumn("score_level", "s.score_level", INT),
+            ExportColumn("model_hash", "s.model_hash", CATEGORY),
+            ExportColumn("scored_at", "s.scored_at", TIMESTAMP),
+        ),
+    ),
+)
+
+
+@dataclass(slots=True)
+class ExportRunResult:
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    rows: int = 0
+
+
+class ColumnarExporter:
+    """Write the pipeline tables as month-partitioned, typed columnar datasets for BI.
+
+    Each dataset lands in ``<out_dir>/<dataset>/published_month=YYYY-MM/``, the
+    Hive layout that pyarrow, DuckDB and Spark prune on. With pyarrow installed
+    a partition is one Parquet file with typed columns (UTC timestamps, floats,
+    list of document URIs) and dictionary-encoded categories (buyer, region,
+    CPV...). Readers can memory-map it and push filters down to row groups.
+    Without pyarrow the same layout is written as UTF-8 CSV.
+
+    Rows are streamed from SQLite in keyset-ordered chunks of ``batch_size``;
+    each chunk becomes a Parquet row group. Only partitions whose fingerprint
+    (row count, latest change, sum of ids) differs from the manifest kept in
+    ``pipeline_state`` are rewritten. Files are replaced atomically and the
+    manifest is updated after each partition, so an interrupted export
+    resumes where it stopped. Partitions left without rows are removed.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        out_dir: Path = DEFAULT_EXPORT_DIR,
+        file_format: Optional[str] = None,
+        batch_size: int = 50_000,
+        state_store: Optional[StateStore] = None,
+        database: Optional[Database] = None,
+    ) -> None:
+        if file_format is None:
+            file_format = FORMAT_PARQUET if HAS_PYARROW else FORMAT_CSV
+        if file_format == FORMAT_PARQUET and not HAS_PYARROW:
+            raise ValueError("Parquet export needs pyarrow")
+        if file_format not in (FORMAT_PARQUET, FORMAT_CSV):
+            raise ValueError(f"Unknown export format: {file_format}")
+        self.db_path = db_path
+        self.out_dir = out_dir
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.database = database or Database.shared(db_path)
+        self.state_store = state_store or StateStore(db_path, database=self.database)
+
+    def run(self, datasets: Sequence[ExportDataset] = DATASETS) -> Dict[str, ExportRunResult]:
+        results: Dict[str, ExportRunResult] = {}
+        for dataset in datasets:
+            with self.database.connection() as conn:
+                present = _table_exists(conn, dataset.table)
+            if present:
+                results[dataset.name] = self.export(dataset)
+        return results
+
+    def export(self, dataset: ExportDataset) -> ExportRunResult:
+        result = ExportRunResult()
+        key = MANIFEST_KEY.format(dataset=dataset.name)
+        manifest = self.state_store.get_export_manifest(key)
+        # A format change rewrites every partition.
+        exported: Dict[str, List[object]] = {}
+        if manifest.get("format") == self.file_format:
+            exported = manifest.get("partitions", {})
+        current = self._fingerprints(dataset)
+
+        for partition, fingerprint in sorted(current.items()):
+            if exported.get(partition) == fingerprint:
+                result.unchanged += 1
+                continue
+            result.rows += self._write_partition(dataset, partition)
+            result.written += 1
+            exported[partition] = fingerprint
+            self.state_store.set_export_manifest(key, {"format": self.file_format, "partitions": exported})
+
+        for partition in sorted(set(exported) - set(current)):
+            shutil.rmtree(self._partition_dir(dataset, partition), ignore_errors=True)
+            del exported[partition]
+            result.removed += 1
+        if result.removed:
+            self.state_store.set_export_manifest(key, {"format": self.file_format, "partitions": exported})
+
+        logger.info(
+            "Exported %s. written=%s unchanged=%s removed=%s rows=%s",
+            dataset.name,
+            result.written,
+            result.unchanged,
+            result.removed,
+            result.rows,
+        )
+        return result
+
+    def _fingerprints(self, dataset: ExportDataset) -> Dict[str, List[object]]:
+        sql = f"""
+            SELECT {_PARTITION_SQL}, COUNT(*), MAX({dataset.changed_column}), TOTAL(t.id)
+            FROM {dataset.source}
+            GROUP BY 1
+        """
+        with self.database.connection() as conn:
+            return {row[0]: list(row[1:]) for row in conn.execute(sql)}
+
+    def _partition_dir(self, dataset: ExportDataset, partition: str) -> Path:
+        return self.out_dir / dataset.name / f"{PARTITION_COLUMN}={partition}"
+
+    def _write_partition(self, dataset: ExportDataset, partition: str) -> int:
+        directory = self._partition_dir(dataset, partition)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"part-0.{self.file_format}"
+        tmp = directory / f".part-0.{self.file_format}.tmp"
+        chunks = self._chunks(dataset, partition)
+        if self.file_format == FORMAT_PARQUET:
+            rows = _write_parquet(tmp, dataset.columns, chunks)
+        else:
+            rows = _write_csv(tmp, dataset.columns, chunks)
+        os.replace(tmp, target)
+        # A partition written in another format earlier is superseded.
+        for stale in directory.glob("part-*"):
+            if stale != target:
+                stale.unlink()
+        return rows
+
+    def _chunks(self, dataset: ExportDataset, partition: str) -> Iterator[List[Tuple[object, ...]]]:
+        """Rows of one partition, ``batch_size`` at a time, keyset-ordered by ``(published_ts, id)``."""
+        expressions = ", ".join(column.expression for column in dataset.columns)
+        if partition == UNKNOWN_PARTITION:
+            where = "t.published_ts IS NULL AND t.id > ?"
+            bounds: Tuple[object, ...] = ()
+            last: Tuple[object, ...] = (0,)
+        else:
+            start = datetime.strptime(partition, "%Y-%m").replace(tzinfo=timezone.utc)
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+            where = "t.published_ts >= ? AND t.published_ts < ? AND (t.published_ts, t.id) > (?, ?)"
+            bounds = (int(start.timestamp()), int(end.timestamp()))
+            last = (bounds[0], 0)
+        sql = f"""
+            SELECT {expressions}, t.published_ts, t.id
+            FROM {dataset.source}
+            WHERE {where}
+            ORDER BY t.published_ts, t.id
+            LIMIT ?
+        """
+        while True:
+            with self.database.connection() as conn:
+                rows = conn.execute(sql, (*bounds, *last, self.batch_size)).fetchall()
+            if not rows:
+                return
+            published_ts, row_id = rows[-1][-2:]
+            last = (row_id,) if partition == UNKNOWN_PARTITION else (published_ts, row_id)
+            yield [row[:-2] for row in rows]
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+
+def _epoch_column(name: str, values: Sequence[object]) -> List[Optional[int]]:
+    if name.endswith("_at"):
+        return [value if value is None or isinstance(value, int) else iso_to_epoch(value) for value in values]
+    return list(values)  # type: ignore[arg-type]
+
+
+def _text_list(value: object) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return json.loads(value)  # type: ignore[arg-type]
+
+
+def _arrow_schema(columns: Sequence[ExportColumn]) -> "pa.Schema":
+    types = {
+        INT: pa.int64(),
+        FLOAT: pa.float64(),
+        BOOL: pa.bool_(),
+        TEXT: pa.string(),
+        CATEGORY: pa.dictionary(pa.int32(), pa.string()),
+        TIMESTAMP: pa.timestamp("s", tz="UTC"),
+        TEXT_LIST: pa.list_(pa.string()),
+    }
+    return pa.schema([pa.field(column.name, types[column.kind]) for column in columns])
+
+
+def _arrow_array(column: ExportColumn, values: Sequence[object], arrow_type: "pa.DataType") -> "pa.Array":
+    if column.kind == TIMESTAMP:
+        return pa.array(_epoch_column(column.name, values), type=pa.int64()).cast(arrow_type)
+    if column.kind == CATEGORY:
+        return pa.array(values, type=pa.string()).dictionary_encode().cast(arrow_type)
+    if column.kind == BOOL:
+        return pa.array([None if value is None else bool(value) for value in values], type=arrow_type)
+    if column.kind == TEXT_LIST:
+        return pa.array([_text_list(value) for value in values], type=arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def _write_parquet(path: Path, columns: Sequence[ExportColumn], chunks: Iterator[List[Tuple[object, ...]]]) -> int:
+    schema = _arrow_schema(columns)
+    rows = 0
+    with pq.ParquetWriter(
+        path,
+        schema,
+        compression="zstd",
+        use_dictionary=[column.name for column in columns if column.kind == CATEGORY],
+        write_statistics=True,
+    ) as writer:
+        for chunk in chunks:
+            values = list(zip(*chunk))
+            arrays = [
+                _arrow_array(column, values[index], schema.field(index).type) for index, column in enumerate(columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def _csv_value(column: ExportColumn, value: object) -> object:
+    if value is None:
+        return ""
+    if column.kind == TIMESTAMP and isinstance(value, int):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+    if column.kind == BOOL:
+        return int(bool(value))
+    return value
+
+
+def _write_csv(path: Path, columns: Sequence[ExportColumn], chunks: Iterator[List[Tuple[object, ...]]]) -> int:
+    rows = 0
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow([column.name for column in columns])
+        for chunk in chunks:
+            writer.writerows([_csv_value(column, value) for column, value in zip(columns, row)] for row in chunk)
+            rows += len(chunk)
+    return rows
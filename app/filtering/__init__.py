@@ -0,0 +1 @@
+"""Hard filtering of captured tenders before scoring."""
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.capture.normalize import normalize_cpv_prefix
+
+DEFAULT_CPV_FILE = Path("config/codigos_cpv.txt")
+
+_CPV_CODE_RE = re.compile(r"\d{8}")
+# Marker key of a trie node that ends an include (True) or exclude (False) prefix.
+_RULE = "$"
+
+
+class CpvMatcher:
+    """Match CPV codes against include/exclude families with a digit trie.
+
+    Families are stored by their significant prefix (``79340000`` -> ``7934``),
+    so a code belongs to every family whose prefix it starts with. Walking a
+    code's digits visits each candidate family once: the deepest family found
+    decides, which lets an exclusion carve a sub-family out of an included one.
+    Lookups cost O(code length) whatever the size of the lists.
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()) -> None:
+        self._root: Dict[str, object] = {}
+        self.include = self._insert_all(include, True)
+        self.exclude = self._insert_all(exclude, False)
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_CPV_FILE, exclude: Iterable[str] = ()) -> "CpvMatcher":
+        """Build from a ``79416000 – Descripción`` list; lines starting with ``-`` are exclusions."""
+        include, excluded = read_cpv_file(path)
+        return cls(include, (*excluded, *exclude))
+
+    def __bool__(self) -> bool:
+        return bool(self.include)
+
+    def match(self, code: str) -> bool:
+        """Whether ``code`` (any CPV spelling, e.g. ``79341000-7``) falls in an included family."""
+        node = self._root
+        decision = False
+        for digit in normalize_cpv_prefix(code):
+            child = node.get(digit)
+            if child is None:
+                break
+            node = child  # type: ignore[assignment]
+            rule = node.get(_RULE)
+            if rule is not None:
+                decision = rule  # type: ignore[assignment]
+        return decision
+
+    def match_any(self, codes: Iterable[str]) -> bool:
+        return any(self.match(code) for code in codes)
+
+    def match_column(self, column: Sequence[str]) -> List[bool]:
+        """Batch API for the filter stage: one space-separated CPV list per row."""
+        cache: Dict[str, bool] = {}
+        mask = []
+        for codes in column:
+            passed = cache.get(codes)
+            if passed is None:
+                passed = cache[codes] = self.match_any((codes or "").split())
+            mask.append(passed)
+        return mask
+
+    def _insert_all(self, codes: Iterable[str], rule: bool) -> Tuple[str, ...]:
+        prefixes = []
+        for code in codes:
+            prefix = normalize_cpv_prefix(code)
+            if not prefix:
+                continue
+            node = self._root
+            for digit in prefix:
+                node = node.setdefault(digit, {})  # type: ignore[assignment]
+            node[_RULE] = rule
+            prefixes.append(prefix)
+        return tuple(sorted(set(prefixes)))
+
+
+def read_cpv_file(path: Path) -> Tuple[List[str], List[str]]:
+    """Return the ``(include, exclude)`` eight-digit codes listed in ``path``."""
+    include: List[str] = []
+    exclude: List[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match: Optional[re.Match[str]] = _CPV_CODE_RE.search(line)
+        if match is None:
+            continue
+        (exclude if line.lstrip().startswith("-") else include).append(match.group(0))
+    return include, exclude
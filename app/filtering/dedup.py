@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+import hashlib
+import logging
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.capture.database import Database
+from app.capture.state_store import StateStore
+from app.scoring.features import extract_words
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "dedup.watermark"
+
+SELECT_BATCH_SQL = """
+    SELECT id, updated_at, title, buyer_name, budget_amount
+    FROM tenders_raw
+    WHERE (updated_at, id) > (?, ?)
+    ORDER BY updated_at, id
+    LIMIT ?
+"""
+
+# Rows in the same LSH bucket of any band as a tender of the current batch.
+CANDIDATE_PAIRS_SQL = """
+    SELECT DISTINCT q.tender_id, l.tender_id
+    FROM temp.dedup_query AS q
+    JOIN tender_lsh AS l ON l.band = q.band AND l.bucket = q.bucket
+    WHERE l.tender_id != q.tender_id
+"""
+
+# Predicate for downstream stages: keep rows that are not a duplicate of another canonical tender.
+CANONICAL_ONLY_SQL = """
+    NOT EXISTS (
+        SELECT 1 FROM tender_clusters AS c
+        WHERE c.tender_id = {alias}.id AND c.cluster_id != c.tender_id
+    )
+"""
+
+_EMPTY = (1 << 64) - 1
+
+
+@dataclass(slots=True)
+class DedupRunResult:
+    processed: int = 0
+    duplicates: int = 0
+    merged_clusters: int = 0
+
+
+def ensure_cluster_tables(conn: sqlite3.Connection) -> None:
+    """Create the MinHash/LSH tables; stages that read ``tender_clusters`` call this first."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tender_clusters (
+            tender_id INTEGER PRIMARY KEY REFERENCES tenders_raw (id),
+            cluster_id INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tender_clusters_cluster ON tender_clusters (cluster_id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tender_minhash (
+            tender_id INTEGER PRIMARY KEY REFERENCES tenders_raw (id),
+            signature BLOB NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tender_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            tender_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, tender_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tender_lsh_tender ON tender_lsh (tender_id)")
+
+
+def canonical_only(alias: str = "tenders_raw") -> str:
+    return CANONICAL_ONLY_SQL.format(alias=alias)
+
+
+class MinHasher:
+    """One-permutation MinHash with rotation densification.
+
+    Each shingle is hashed once; the low bits pick one of ``num_perm`` bins and
+    the rest compete for that bin's minimum. Empty bins borrow the next filled
+    bin's value (offset by the distance), so the signature stays comparable
+    position by position at the cost of one hash per shingle instead of
+    ``num_perm``.
+    """
+
+    def __init__(self, num_perm: int = 64) -> None:
+        if num_perm & (num_perm - 1) or not 2 <= num_perm <= 64:
+            raise ValueError("num_perm must be a power of two between 2 and 64")
+        self.num_perm = num_perm
+        self._bits = num_perm.bit_length() - 1
+        self._offset = 1 << (64 - self._bits)
+
+    def signature(self, shingles: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        bins = [_EMPTY] * self.num_perm
+        mask = self.num_perm - 1
+        bits = self._bits
+        for shingle in shingles:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            index = value & mask
+            value >>= bits
+            if value < bins[index]:
+                bins[index] = value
+        if all(value == _EMPTY for value in bins):
+            return None
+        size = self.num_perm
+        signature = list(bins)
+        for index in range(size):
+            if bins[index] != _EMPTY:
+                continue
+            distance = 1
+            while bins[(index + distance) % size] == _EMPTY:
+                distance += 1
+            signature[index] = bins[(index + distance) % size] + distance * self._offset
+        return tuple(signature)
+
+
+def tender_shingles(title: str, buyer_name: str, budget_amount: Optional[float]) -> Set[str]:
+    """Accent-folded title words and word pairs, buyer words and a coarse budget token."""
+    words = extract_words(title)
+    shingles = {f"t:{word}" for word in words}
+    shingles.update(f"t:{first} {second}" for first, second in zip(words, words[1:]))
+    shingles.update(f"b:{word}" for word in extract_words(buyer_name))
+    if budget_amount:
+        # Two significant digits: mirrors round or add VAT differently.
+        shingles.add(f"e:{float(f'{budget_amount:.2g}'):g}")
+    return shingles
+
+
+def estimated_jaccard(first: Sequence[int], second: Sequence[int]) -> float:
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+class TenderDeduplicator:
+    """Group republished and mirrored tenders into clusters with MinHash/LSH.
+
+    Signatures of title, buyer and budget are split into ``bands`` bands whose
+    hashes are stored in ``tender_lsh``; tenders sharing a bucket in any band are
+    candidates and are confirmed when their estimated Jaccard similarity reaches
+    ``threshold``. Only rows new or changed since the ``(updated_at, id)``
+    watermark are processed, and candidates are looked up through the index,
+    so a run never compares all pairs.
+
+    ``tender_clusters`` maps every processed tender to its cluster, identified by
+    the lowest (first captured) tender id, which is the canonical representative.
+    Clusters only ever merge.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        state_store: Optional[StateStore] = None,
+        database: Optional[Database] = None,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.7,
+        batch_size: int = 2000,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.db_path = db_path
+        self.database = database or Database.shared(db_path)
+        self.state_store = state_store or StateStore(db_path, database=self.database)
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.batch_size = batch_size
+        with self.database.transaction() as conn:
+            ensure_cluster_tables(conn)
+
+    def run(self) -> DedupRunResult:
+        result = DedupRunResult()
+        watermark = self.state_store.get_watermark(WATERMARK_KEY) or ("", 0)
+        while True:
+            with self.database.connection() as conn:
+                rows = conn.execute(SELECT_BATCH_SQL, (*watermark, self.batch_size)).fetchall()
+            if not rows:
+                break
+            signatures: Dict[int, Tuple[int, ...]] = {}
+            for row_id, _, title, buyer_name, budget_amount in rows:
+                signature = self.hasher.signature(tender_shingles(title, buyer_name, budget_amount))
+                if signature is not None:
+                    signatures[row_id] = signature
+            watermark = (rows[-1][1], rows[-1][0])
+            with self.database.transaction() as conn:
+                duplicates, merged = self._process_batch(conn, [row[0] for row in rows], signatures)
+                self.state_store.set_watermark(WATERMARK_KEY, watermark)
+            result.processed += len(rows)
+            result.duplicates += duplicates
+            result.merged_clusters += merged
+
+        logger.info(
+            "Dedup finished. processed=%s duplicates=%s merged_clusters=%s",
+            result.processed,
+            result.duplicates,
+            result.merged_clusters,
+        )
+        return result
+
+    def bucket_keys(self, signature: Sequence[int]) -> List[Tuple[int, int]]:
+        keys = []
+        width = self.rows_per_band
+        for band in range(self.bands):
+            values = array("Q", signature[band * width : (band + 1) * width]).tobytes()
+            digest = hashlib.blake2b(values, digest_size=8, person=band.to_bytes(2, "big")).digest()
+            keys.append((band, int.from_bytes(digest, "big", signed=True)))
+        return keys
+
+    def _process_batch(
+        self,
+        conn: sqlite3.Connection,
+        batch_ids: List[int],
+        signatures: Dict[int, Tuple[int, ...]],
+    ) -> Tuple[int, int]:
+        conn.executemany("DELETE FROM tender_lsh WHERE tender_id = ?", [(row_id,) for row_id in batch_ids])
+        conn.executemany(
+            "INSERT OR REPLACE INTO tender_minhash (tender_id, signature) VALUES (?, ?)",
+            [(row_id, array("Q", signature).tobytes()) for row_id, signature in signatures.items()],
+        )
+        bucket_rows = [
+            (band, bucket, row_id)
+            for row_id, signature in signatures.items()
+            for band, bucket in self.bucket_keys(signature)
+        ]
+        conn.executemany("INSERT INTO tender_lsh (band, bucket, tender_id) VALUES (?, ?, ?)", bucket_rows)
+
+        conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS dedup_query (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                tender_id INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("DELETE FROM temp.dedup_query")
+        conn.executemany("INSERT INTO temp.dedup_query (band, bucket, tender_id) VALUES (?, ?, ?)", bucket_rows)
+        candidates = conn.execute(CANDIDATE_PAIRS_SQL).fetchall()
+        conn.execute("DELETE FROM temp.dedup_query")
+
+        known = dict(signatures)
+        missing = {other for _, other in candidates if other not in known}
+        for row_id, blob in _select_chunked(
+            conn, "SELECT tender_id, signature FROM tender_minhash WHERE tender_id IN ({})", missing
+        ):
+            known[row_id] = tuple(array("Q", blob))
+        pairs = {
+            (min(first, second), max(first, second))
+            for first, second in candidates
+            if estimated_jaccard(known[first], known[second]) >= self.threshold
+        }
+        return self._assign_clusters(conn, batch_ids, pairs)
+
+    def _assign_clusters(
+        self,
+        conn: sqlite3.Connection,
+        batch_ids: List[int],
+        pairs: Set[Tuple[int, int]],
+    ) -> Tuple[int, int]:
+        nodes = set(batch_ids) | {node for pair in pairs for node in pair}
+        existing: Dict[int, int] = dict(
+            _select_chunked(conn, "SELECT tender_id, cluster_id FROM tender_clusters WHERE tender_id IN ({})", nodes)
+        )
+        parent: Dict[int, int] = {}
+
+        def find(node: int) -> int:
+            parent.setdefault(node, node)
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node] != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        def union(first: int, second: int) -> None:
+            first_root, second_root = find(first), find(second)
+            if first_root != second_root:
+                parent[max(first_root, second_root)] = min(first_root, second_root)
+
+        for node in nodes:
+            find(node)
+        for tender_id, cluster_id in existing.items():
+            union(tender_id, cluster_id)
+        for first, second in pairs:
+            union(first, second)
+
+        merged = 0
+        for old_cluster in {cluster_id for cluster_id in existing.values() if find(cluster_id) != cluster_id}:
+            conn.execute(
+                "UPDATE tender_clusters SET cluster_id = ? WHERE cluster_id = ?",
+                (find(old_cluster), old_cluster),
+            )
+            merged += 1
+        assignments = [(node, find(node)) for node in nodes if node not in existing or existing[node] != find(node)]
+        conn.executemany(
+            """
+            INSERT INTO tender_clusters (tender_id, cluster_id) VALUES (?, ?)
+            ON CONFLICT(tender_id) DO UPDATE SET cluster_id = excluded.cluster_id
+            """,
+            assignments,
+        )
+        duplicates = sum(1 for node in batch_ids if find(node) != node)
+        return duplicates, merged
+
+
+def _select_chunked(
+    conn: sqlite3.Connection,
+    sql: str,
+    ids: Iterable[int],
+    chunk_size: int = 500,
+) -> List[tuple]:
+    ids = list(ids)
+    rows: List[tuple] = []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        rows.extend(conn.execute(sql.format(", ".join("?" for _ in chunk)), chunk).fetchall())
+    return rows
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.capture.database import Database
+from app.capture.normalize import to_epoch
+from app.capture.state_store import StateStore
+from app.filtering.cpv_matcher import CpvMatcher
+from app.filtering.dedup import canonical_only, ensure_cluster_tables
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "filter.hard.watermark"
+
+# Compact discard reason codes stored in tenders_filtered.discard_reason.
+REASON_DEADLINE = "deadline"
+REASON_REGION = "region"
+REASON_BUDGET = "budget"
+REASON_CPV = "cpv"
+
+# Duplicates clustered under another canonical tender are skipped.
+SELECT_BATCH_SQL = f"""
+    SELECT id, updated_at, content_hash, deadline_ts, region_code, region, budget_amount, cpv_codes
+    FROM tenders_raw
+    WHERE (updated_at, id) > (?, ?)
+        AND {canonical_only("tenders_raw")}
+    ORDER BY updated_at, id
+    LIMIT ?
+"""
+
+UPSERT_FILTERED_SQL = """
+    INSERT INTO tenders_filtered (tender_id, passed_filter, discard_reason, content_hash, filtered_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(tender_id) DO UPDATE
+    SET passed_filter = excluded.passed_filter,
+        discard_reason = excluded.discard_reason,
+        content_hash = excluded.content_hash,
+        filtered_at = excluded.filtered_at
+"""
+
+# Column positions in SELECT_BATCH_SQL rows.
+_ID, _UPDATED_AT, _HASH, _DEADLINE_TS, _REGION_CODE, _REGION, _BUDGET, _CPV_CODES = range(8)
+
+Columns = Sequence[Sequence[object]]
+Mask = List[bool]
+
+
+@dataclass(slots=True)
+class HardFilterConfig:
+    region_prefixes: Tuple[str, ...] = ("ES30",)
+    # Free-text regions (no NUTS code) pass when they mention one of these words.
+    region_keywords: Tuple[str, ...] = ("madrid",)
+    min_budget: float = 40000.0
+    # Built once per process; an empty matcher disables the CPV rule.
+    cpv_matcher: CpvMatcher = field(default_factory=CpvMatcher)
+    batch_size: int = 5000
+
+
+@dataclass(slots=True)
+class FilterRunResult:
+    processed: int = 0
+    passed: int = 0
+    discarded: Dict[str, int] = field(default_factory=dict)
+    watermark: Optional[Tuple[str, int]] = None
+
+
+@dataclass(slots=True)
+class FilterRule:
+    code: str
+    evaluate: Callable[[Columns, int], Mask]
+
+
+class HardFilter:
+    """Apply the non-negotiable business rules to captured tenders.
+
+    Rows are read from ``tenders_raw`` in keyset-ordered batches and transposed
+    into columns; each rule turns its columns into a pass mask for the whole
+    batch and a row keeps the code of the first rule it fails. Results land in
+    ``tenders_filtered`` together with the ``(updated_at, id)`` watermark, one
+    transaction per batch, so only rows new or changed since the last run are
+    evaluated and an interrupted run resumes where it stopped. A capture commits
+    its batches separately under one ``updated_at``, so while one is running the
+    stored watermark stops just below its stamp and the next run re-evaluates
+    anything from there on.
+
+    The deadline rule is evaluated against ``now`` at filter time.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        config: HardFilterConfig,
+        state_store: Optional[StateStore] = None,
+        database: Optional[Database] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.config = config
+        self.database = database or Database.shared(db_path)
+        self.state_store = state_store or StateStore(db_path, database=self.database)
+        self.rules: Tuple[FilterRule, ...] = (
+            FilterRule(REASON_DEADLINE, _deadline_mask),
+            FilterRule(REASON_REGION, self._region_mask),
+            FilterRule(REASON_BUDGET, self._budget_mask),
+            FilterRule(REASON_CPV, self._cpv_mask),
+        )
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            ensure_cluster_tables(conn)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tenders_filtered (
+                    tender_id INTEGER PRIMARY KEY REFERENCES tenders_raw (id),
+                    passed_filter INTEGER NOT NULL,
+                    discard_reason TEXT,
+                    content_hash TEXT,
+                    filtered_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tenders_filtered_passed ON tenders_filtered (passed_filter)"
+            )
+
+    def run(self, now: Optional[datetime] = None) -> FilterRunResult:
+        now = now or datetime.now(timezone.utc)
+        now_ts = to_epoch(now)
+        filtered_at = now.isoformat()
+        result = FilterRunResult(watermark=self.state_store.get_watermark(WATERMARK_KEY))
+        cursor = result.watermark or ("", 0)
+
+        while True:
+            # One snapshot for the rows and the running captures, so no batch can commit in between.
+            with self.database.transaction() as conn:
+                rows = conn.execute(SELECT_BATCH_SQL, (*cursor, self.config.batch_size)).fetchall()
+                running_since = self.state_store.oldest_running_capture()
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            reasons = self.evaluate(columns, now_ts)
+            cursor = (rows[-1][_UPDATED_AT], rows[-1][_ID])
+            watermark = cursor if running_since is None else min(cursor, (running_since, 0))
+            with self.database.transaction() as conn:
+                conn.executemany(
+                    UPSERT_FILTERED_SQL,
+                    [
+                        (row_id, reason is None, reason, row_hash, filtered_at)
+                        for row_id, row_hash, reason in zip(columns[_ID], columns[_HASH], reasons)
+                    ],
+                )
+                self.state_store.set_watermark(WATERMARK_KEY, watermark)
+
+            result.processed += len(rows)
+            for reason in reasons:
+                if reason is None:
+                    result.passed += 1
+                else:
+                    result.discarded[reason] = result.discarded.get(reason, 0) + 1
+            result.watermark = watermark
+
+        logger.info(
+            "Hard filter finished. processed=%s passed=%s discarded=%s",
+            result.processed,
+            result.passed,
+            result.discarded,
+        )
+        return result
+
+    def evaluate(self, columns: Columns, now_ts: int) -> List[Optional[str]]:
+        """Return the first failing rule code per row (``None`` when every rule passes)."""
+        reasons: List[Optional[str]] = [None] * len(columns[_ID])
+        for rule in self.rules:
+            mask = rule.evaluate(columns, now_ts)
+            reasons = [
+                reason if reason is not None or passed else rule.code
+                for reason, passed in zip(reasons, mask)
+            ]
+        return reasons
+
+    def _region_mask(self, columns: Columns, now_ts: int) -> Mask:
+        prefixes = self.config.region_prefixes
+        keywords = tuple(keyword.casefold() for keyword in self.config.region_keywords)
+        return [
+            code.startswith(prefixes) if code else any(word in (region or "").casefold() for word in keywords)
+            for code, region in zip(columns[_REGION_CODE], columns[_REGION])
+        ]
+
+    def _budget_mask(self, columns: Columns, now_ts: int) -> Mask:
+        floor = self.config.min_budget
+        return [budget is not None and budget > floor for budget in columns[_BUDGET]]
+
+    def _cpv_mask(self, columns: Columns, now_ts: int) -> Mask:
+        # A tender passes when any of its CPV codes falls in an included family.
+        if not self.config.cpv_matcher:
+            return [True] * len(columns[_CPV_CODES])
+        return self.config.cpv_matcher.match_column(columns[_CPV_CODES])
+
+
+def _deadline_mask(columns: Columns, now_ts: int) -> Mask:
+    return [deadline is not None and deadline > now_ts for deadline in columns[_DEADLINE_TS]]
+
@@ -1,13 +1,38 @@
 from __future__ import annotations
 
 import argparse
+from datetime import datetime, timezone
 from pathlib import Path
 import logging
+import threading
+from typing import Optional
 
+from app.audit.documents import DEFAULT_CACHE_DIR, DocumentFetchConfig, DocumentFetcher
+from app.audit.extraction import CLAUSE_KINDS
+from app.audit.pliego_index import ClauseHit, PliegoIndex
+from app.capture.backfill import DEFAULT_ARCHIVE_PREFIX, DEFAULT_ARCHIVE_SOURCE, ArchiveBackfill, BackfillConfig
+from app.capture.daemon import CaptureDaemon, PollSchedule
+from app.capture.metrics import NULL_METRICS, MetricsRecorder, RunLedger
 from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.search import TenderSearch
 from app.capture.service import CaptureService
+from app.capture.sources import CaptureScheduler, SourceRunResult, load_sources
 from app.capture.state_store import StateStore
 from app.capture.storage import RawTenderRepository
+from app.export.columnar import DEFAULT_EXPORT_DIR, FORMAT_CSV, FORMAT_PARQUET, ColumnarExporter
+from app.filtering.cpv_matcher import DEFAULT_CPV_FILE, CpvMatcher
+from app.filtering.dedup import TenderDeduplicator
+from app.filtering.hard_filter import HardFilter, HardFilterConfig
+from app.scoring.model import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_TRAINING_CSV,
+    evaluate_holdout,
+    load_training_csv,
+    save_model,
+    train_model,
+)
+from app.scoring.scorer import TenderScorer, tender_text
+from app.scoring.similarity import SimilarityIndex, load_historic_tenders
 
 
 def parse_args() -> argparse.Namespace:
@@ -30,6 +55,209 @@ def parse_args() -> argparse.Namespace:
         default=120,
         help="Lookback overlap (minutes) to avoid missing delayed publications",
     )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Maximum Atom pages to follow via rel=next (default: until older than the watermark; 1 on first run)",
+    )
+    parser.add_argument(
+        "--prefetch-pages",
+        type=int,
+        default=4,
+        help="Atom pages downloaded ahead while the current page is parsed",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Tenders parsed from the feed per SQLite write batch",
+    )
+    parser.add_argument(
+        "--sources-file",
+        default=None,
+        help="JSON list of feeds to capture in parallel (e.g. config/sources.json); overrides --source-url",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        help="Also export each capture run's metrics to this Prometheus textfile (node_exporter collector dir)",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Skip stage timers and counters (runs are still recorded in capture_runs)",
+    )
+    parser.add_argument(
+        "--model-path",
+        default=str(DEFAULT_MODEL_PATH),
+        help="Scoring model artifact; when present, new tenders are scored after each capture",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    backfill = subparsers.add_parser("backfill", help="Load history from PLACSP monthly ZIP archives")
+    backfill.add_argument("--from", dest="first_month", required=True, help="First month to load (YYYY-MM)")
+    backfill.add_argument("--to", dest="last_month", required=True, help="Last month to load, inclusive (YYYY-MM)")
+    backfill.add_argument(
+        "--archive-source",
+        default=DEFAULT_ARCHIVE_SOURCE,
+        help="Directory or base URL holding <prefix>_YYYYMM.zip archives",
+    )
+    backfill.add_argument("--archive-prefix", default=DEFAULT_ARCHIVE_PREFIX, help="Archive file name prefix")
+    backfill.add_argument(
+        "--cache-dir",
+        default="data/runtime/archives",
+        help="Where downloaded archives are kept between runs",
+    )
+    backfill.add_argument("--workers", type=int, default=4, help="Parser processes")
+    backfill.add_argument(
+        "--batch-size",
+        dest="backfill_batch_size",
+        type=int,
+        default=5000,
+        help="Rows per executemany call when writing a member",
+    )
+
+    daemon = subparsers.add_parser(
+        "daemon",
+        help="Keep capturing: poll the feed on an adaptive interval until SIGTERM (replaces the cron job)",
+    )
+    schedule = PollSchedule()
+    daemon.add_argument(
+        "--active-seconds",
+        type=float,
+        default=schedule.active_seconds,
+        help="Wait after a poll that found new or changed tenders",
+    )
+    daemon.add_argument(
+        "--business-seconds",
+        type=float,
+        default=schedule.business_seconds,
+        help="Wait after an idle poll on weekdays 8-20h Madrid time; grows with each idle poll",
+    )
+    daemon.add_argument(
+        "--off-hours-seconds",
+        type=float,
+        default=schedule.off_hours_seconds,
+        help="Wait after an idle poll at night and on weekends; grows with each idle poll",
+    )
+    daemon.add_argument("--max-polls", type=int, default=None, help="Exit after this many polls (default: run until stopped)")
+
+    search = subparsers.add_parser("search", help="Full-text search over captured tenders")
+    search.add_argument("query", help="Words to look for in title and summary (accents ignored; word* for prefixes)")
+    search.add_argument("--region", help="Region/NUTS code prefix, e.g. ES3")
+    search.add_argument("--cpv", help="CPV code prefix, e.g. 7934")
+    search.add_argument("--deadline-from", type=datetime.fromisoformat, help="Earliest deadline (ISO date)")
+    search.add_argument("--deadline-to", type=datetime.fromisoformat, help="Latest deadline (ISO date)")
+    search.add_argument("--limit", type=int, default=20, help="Maximum results")
+
+    hard_filter = subparsers.add_parser("filter", help="Apply hard business rules to new or changed tenders")
+    hard_filter.add_argument(
+        "--region-prefix",
+        action="append",
+        dest="region_prefixes",
+        help="NUTS code prefix a tender must match (repeatable, default ES30)",
+    )
+    hard_filter.add_argument("--min-budget", type=float, default=40000.0, help="Budget must exceed this amount")
+    hard_filter.add_argument(
+        "--cpv-file",
+        default=str(DEFAULT_CPV_FILE),
+        help="Accepted CPV codes, one per line (lines starting with '-' exclude a family)",
+    )
+    hard_filter.add_argument(
+        "--cpv-exclude",
+        action="append",
+        default=[],
+        help="Eight-digit CPV family to reject even inside an accepted one (repeatable)",
+    )
+    hard_filter.add_argument(
+        "--batch-size",
+        dest="filter_batch_size",
+        type=int,
+        default=5000,
+        help="Rows evaluated per column batch",
+    )
+
+    train = subparsers.add_parser("train-scorer", help="Fit the TF-IDF affinity model from hand-scored tenders")
+    train.add_argument("--csv", default=str(DEFAULT_TRAINING_CSV), help="CSV with Objeto and Score (0-5) columns")
+    train.add_argument("--alpha", type=float, default=1.0, help="Ridge regularisation strength")
+
+    subparsers.add_parser("score", help="Score tenders that are new, changed or scored by an older model")
+
+    dedup = subparsers.add_parser("dedup", help="Cluster republished and mirrored tenders (MinHash/LSH)")
+    dedup.add_argument(
+        "--threshold",
+        type=float,
+        default=0.7,
+        help="Estimated Jaccard similarity of title+buyer+budget to treat two tenders as one",
+    )
+
+    similar_index = subparsers.add_parser(
+        "similar-index",
+        help="Add hand-scored historic tenders to the similarity index (only rows not indexed yet)",
+    )
+    similar_index.add_argument("--csv", default=str(DEFAULT_TRAINING_CSV), help="Historic CSV with Objeto and Score")
+
+    pliegos = subparsers.add_parser(
+        "pliegos",
+        help="Download the pliegos of tenders that passed the hard filter into the document cache",
+    )
+    pliegos.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Content-addressed document cache")
+    pliegos.add_argument(
+        "--max-cache-mb",
+        type=int,
+        default=2048,
+        help="Cache size cap; least recently used documents are evicted beyond it",
+    )
+    pliegos.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+    pliegos.add_argument("--requests-per-second", type=float, default=2.0, help="Request rate limit towards PLACSP")
+    pliegos.add_argument("--limit", type=int, default=None, help="Download at most this many documents")
+
+    pliegos_index = subparsers.add_parser(
+        "pliegos-index",
+        help="Extract the text of cached pliegos not extracted yet and index their clauses",
+    )
+    pliegos_index.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Content-addressed document cache")
+    pliegos_index.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    pliegos_index.add_argument("--limit", type=int, default=None, help="Extract at most this many documents")
+    pliegos_index.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Retry documents that could not be extracted before (e.g. after installing pypdf)",
+    )
+
+    pliegos_search = subparsers.add_parser("pliegos-search", help="Search clauses in the extracted pliegos")
+    pliegos_search.add_argument("query", nargs="?", default="", help="Words to look for (accents ignored)")
+    pliegos_search.add_argument("--external-id", help="Only the pliegos of this tender")
+    pliegos_search.add_argument(
+        "--kind",
+        choices=[kind for kind, _ in CLAUSE_KINDS],
+        help="List every clause of this kind in the tender's pliegos (requires --external-id)",
+    )
+    pliegos_search.add_argument("--limit", type=int, default=10, help="Maximum results")
+
+    export = subparsers.add_parser(
+        "export",
+        help="Write tenders and their filter/score results as month-partitioned columnar files for BI",
+    )
+    export.add_argument("--out-dir", default=str(DEFAULT_EXPORT_DIR), help="Root of the partitioned datasets")
+    export.add_argument(
+        "--format",
+        dest="export_format",
+        choices=[FORMAT_PARQUET, FORMAT_CSV],
+        default=None,
+        help="File format (default: parquet when pyarrow is installed, otherwise csv)",
+    )
+    export.add_argument("--batch-size", dest="export_batch_size", type=int, default=50_000, help="Rows per chunk")
+
+    similar = subparsers.add_parser("similar", help="Show the most similar scored historic tenders for captured ones")
+    similar.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        required=True,
+        help="Tenders first captured at or after this moment (ISO date)",
+    )
+    similar.add_argument("-k", type=int, default=5, help="Historic tenders shown per tender")
     return parser.parse_args()
 
 
@@ -40,22 +268,268 @@ def main() -> None:
         format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     )
 
+    if args.command == "backfill":
+        run_backfill(args)
+    elif args.command == "daemon":
+        run_daemon(args)
+    elif args.command == "search":
+        run_search(args)
+    elif args.command == "filter":
+        run_filter(args)
+    elif args.command == "train-scorer":
+        run_train_scorer(args)
+    elif args.command == "score":
+        run_score(args)
+    elif args.command == "dedup":
+        run_dedup(args)
+    elif args.command == "similar-index":
+        run_similar_index(args)
+    elif args.command == "similar":
+        run_similar(args)
+    elif args.command == "pliegos":
+        run_pliegos(args)
+    elif args.command == "export":
+        run_export(args)
+    elif args.command == "pliegos-index":
+        run_pliegos_index(args)
+    elif args.command == "pliegos-search":
+        run_pliegos_search(args)
+    else:
+        run_capture(args)
+
+
+def run_backfill(args: argparse.Namespace) -> None:
     db_path = Path(args.db_path)
-    client = PlacspClient(PlacspClientConfig(source_url=args.source_url, timeout_seconds=args.timeout))
-    repository = RawTenderRepository(db_path=db_path)
-    state_store = StateStore(db_path=db_path)
+    backfill = ArchiveBackfill(
+        BackfillConfig(
+            archive_source=args.archive_source,
+            archive_prefix=args.archive_prefix,
+            cache_dir=Path(args.cache_dir),
+            workers=args.workers,
+            timeout_seconds=max(args.timeout, 120),
+        ),
+        repository=RawTenderRepository(db_path=db_path, batch_size=args.backfill_batch_size),
+        state_store=StateStore(db_path=db_path),
+    )
+    try:
+        result = backfill.run(args.first_month, args.last_month)
+    finally:
+        backfill.transport.close()
+    print(
+        "backfill_result",
+        {
+            "archives": result.archives,
+            "members": result.members,
+            "skipped_members": result.skipped_members,
+            "fetched": result.fetched,
+            "inserted": result.inserted,
+            "updated": result.updated,
+        },
+    )
 
-    result = CaptureService(
-        client=client,
-        repository=repository,
-        state_store=state_store,
-        overlap_minutes=args.overlap_minutes,
+
+def run_search(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    RawTenderRepository(db_path=db_path)
+    hits = TenderSearch(db_path=db_path).search(
+        args.query,
+        region=args.region,
+        cpv=args.cpv,
+        deadline_from=_as_utc(args.deadline_from),
+        deadline_to=_as_utc(args.deadline_to),
+        limit=args.limit,
+    )
+    for hit in hits:
+        print(f"{hit.score:8.3f} | {hit.external_id} | {hit.region} | {hit.cpv} | {hit.deadline_at or '-'}")
+        print(f"         {hit.title}")
+        print(f"         {hit.snippet}")
+    print("search_result", {"hits": len(hits)})
+
+
+def run_filter(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    RawTenderRepository(db_path=db_path)
+    result = HardFilter(
+        db_path,
+        HardFilterConfig(
+            region_prefixes=tuple(args.region_prefixes or ("ES30",)),
+            min_budget=args.min_budget,
+            cpv_matcher=CpvMatcher.from_file(Path(args.cpv_file), exclude=args.cpv_exclude),
+            batch_size=args.filter_batch_size,
+        ),
     ).run()
+    print(
+        "filter_result",
+        {
+            "processed": result.processed,
+            "passed": result.passed,
+            "discarded": result.discarded,
+            "watermark": list(result.watermark) if result.watermark else None,
+        },
+    )
+
+
+def run_train_scorer(args: argparse.Namespace) -> None:
+    texts, scores = load_training_csv(Path(args.csv))
+    metrics = evaluate_holdout(texts, scores, alpha=args.alpha)
+    model = train_model(texts, scores, alpha=args.alpha)
+    model.metadata.update(metrics)
+    digest = save_model(model, Path(args.model_path))
+    print("train_result", {"rows": len(texts), "features": len(model.weights), "sha256": digest, **metrics})
+
+
+def run_score(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    RawTenderRepository(db_path=db_path)
+    result = TenderScorer(db_path, model_path=Path(args.model_path)).run()
+    print("score_result", {"scored": result.scored, "model_hash": result.model_hash})
+
+
+def run_dedup(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    RawTenderRepository(db_path=db_path)
+    result = TenderDeduplicator(db_path, threshold=args.threshold).run()
+    print(
+        "dedup_result",
+        {"processed": result.processed, "duplicates": result.duplicates, "merged_clusters": result.merged_clusters},
+    )
+
+
+def run_similar_index(args: argparse.Namespace) -> None:
+    index = SimilarityIndex(Path(args.db_path))
+    added = index.add(load_historic_tenders(Path(args.csv)))
+    print("similar_index_result", {"added": added, "documents": len(index)})
+
+
+def run_similar(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    repository = RawTenderRepository(db_path=db_path)
+    with repository.database.connection() as conn:
+        tenders = conn.execute(
+            "SELECT external_id, title, summary FROM tenders_raw WHERE created_ts >= ? ORDER BY id",
+            (int(_as_utc(args.since).timestamp()),),
+        ).fetchall()
+    matches = SimilarityIndex(db_path).similar([tender_text(title, summary) for _, title, summary in tenders], k=args.k)
+    for (external_id, title, _), hits in zip(tenders, matches):
+        print(f"{external_id} | {title}")
+        for hit in hits:
+            score = "-" if hit.score is None else f"{hit.score:g}"
+            print(f"    {hit.similarity:5.2f} | score {score} | {hit.organismo} | {hit.objeto[:100]}")
+    print("similar_result", {"tenders": len(tenders)})
+
+
+def run_pliegos(args: argparse.Namespace) -> None:
+    fetcher = DocumentFetcher(
+        Path(args.db_path),
+        DocumentFetchConfig(
+            cache_dir=Path(args.cache_dir),
+            max_cache_bytes=args.max_cache_mb * 1024**2,
+            workers=args.workers,
+            requests_per_second=args.requests_per_second,
+            timeout_seconds=args.timeout,
+        ),
+    )
+    try:
+        result = fetcher.run(limit=args.limit)
+    finally:
+        fetcher.close()
+    print(
+        "pliegos_result",
+        {
+            "linked": result.linked,
+            "downloaded": result.downloaded,
+            "reused": result.reused,
+            "failed": result.failed,
+            "evicted": result.evicted,
+        },
+    )
+
+
+def run_export(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    RawTenderRepository(db_path=db_path)
+    try:
+        exporter = ColumnarExporter(
+            db_path,
+            out_dir=Path(args.out_dir),
+            file_format=args.export_format,
+            batch_size=args.export_batch_size,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    results = exporter.run()
+    print(
+        "export_result",
+        {
+            "format": exporter.file_format,
+            **{
+                name: {"written": item.written, "unchanged": item.unchanged, "removed": item.removed, "rows": item.rows}
+                for name, item in results.items()
+            },
+        },
+    )
+
+
+def run_pliegos_index(args: argparse.Namespace) -> None:
+    index = PliegoIndex(Path(args.db_path), cache_dir=Path(args.cache_dir))
+    result = index.run(workers=args.workers, limit=args.limit, retry_failed=args.retry_failed)
+    print("pliegos_index_result", {"extracted": result.extracted, "chunks": result.chunks, "failed": result.failed})
+
+
+def run_pliegos_search(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    repository = RawTenderRepository(db_path=db_path)
+    tender_id = None
+    if args.external_id:
+        with repository.database.connection() as conn:
+            row = conn.execute("SELECT id FROM tenders_raw WHERE external_id = ?", (args.external_id,)).fetchone()
+        if row is None:
+            raise SystemExit(f"Unknown tender: {args.external_id}")
+        tender_id = row[0]
+    index = PliegoIndex(db_path)
+    if args.kind:
+        if tender_id is None:
+            raise SystemExit("--kind requires --external-id")
+        hits = index.clauses(tender_id, args.kind)
+    else:
+        hits = index.search(args.query, tender_id=tender_id, limit=args.limit)
+    for hit in hits:
+        _print_clause(hit)
+    print("pliegos_search_result", {"hits": len(hits)})
+
+
+def _print_clause(hit: ClauseHit) -> None:
+    print(f"{hit.score:8.3f} | {hit.sha256[:12]} #{hit.ordinal} | {hit.kind or '-'} | {hit.heading}")
+    print(f"         {hit.snippet or hit.text[:300]}")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def run_capture(args: argparse.Namespace) -> None:
+    if args.sources_file:
+        run_capture_sources(args)
+        return
+
+    service = _capture_service(args)
+    try:
+        result = service.run()
+    finally:
+        service.client.close()
+    scored = _after_capture(args)
     print(
         "capture_result",
         {
+            "run_id": result.run_id,
             "fetched": result.fetched,
             "inserted": result.inserted,
+            "updated": result.updated,
+            "unchanged": result.unchanged,
+            "scored": scored,
+            "not_modified": result.not_modified,
             "previous_last_run_at": result.last_run_at.isoformat() if result.last_run_at else None,
             "effective_since": result.effective_since.isoformat() if result.effective_since else None,
             "new_last_run_at": result.new_last_run_at.isoformat(),
@@ -63,5 +537,130 @@ def main() -> None:
     )
 
 
+def run_daemon(args: argparse.Namespace) -> None:
+    db_path = Path(args.db_path)
+    stop_event = threading.Event()
+    # Clients and their keep-alive connections (one per source with --sources-file), the SQLite
+    # connection and the scoring model are built once and reused by every poll.
+    if args.sources_file:
+        scheduler = _capture_scheduler(args, stop_event)
+        capture = scheduler.poll
+        close = scheduler.close
+    else:
+        service = _capture_service(args, stop_event)
+
+        def capture() -> int:
+            result = service.run()
+            return result.inserted + result.updated
+
+        close = service.client.close
+
+    deduplicator = TenderDeduplicator(db_path)
+    model_path = Path(args.model_path)
+    scorer = TenderScorer(db_path, model_path=model_path)
+
+    def poll() -> int:
+        changed = capture()
+        if changed:
+            deduplicator.run()
+            if model_path.exists():
+                scorer.run()
+        return changed
+
+    daemon = CaptureDaemon(
+        poll,
+        PollSchedule(
+            active_seconds=args.active_seconds,
+            business_seconds=args.business_seconds,
+            off_hours_seconds=args.off_hours_seconds,
+        ),
+        stop_event=stop_event,
+        max_polls=args.max_polls,
+    )
+    daemon.install_signal_handlers()
+    try:
+        result = daemon.run()
+    finally:
+        close()
+    print("daemon_result", {"polls": result.polls, "failed_polls": result.failed_polls, "changed": result.changed})
+
+
+def run_capture_sources(args: argparse.Namespace) -> None:
+    scheduler = _capture_scheduler(args)
+    try:
+        results = scheduler.run()
+    finally:
+        scheduler.close()
+    scored = _after_capture(args)
+    print(
+        "capture_sources_result",
+        {"sources": {item.name: _source_summary(item) for item in results}, "scored": scored},
+    )
+    if not all(item.ok for item in results):
+        raise SystemExit(1)
+
+
+def _capture_service(args: argparse.Namespace, stop_event: Optional[threading.Event] = None) -> CaptureService:
+    db_path = Path(args.db_path)
+    metrics = NULL_METRICS if args.no_metrics else MetricsRecorder()
+    client = PlacspClient(
+        PlacspClientConfig(
+            source_url=args.source_url,
+            timeout_seconds=args.timeout,
+            max_pages=args.max_pages,
+            prefetch_pages=args.prefetch_pages,
+        ),
+        metrics=metrics,
+    )
+    return CaptureService(
+        client=client,
+        repository=RawTenderRepository(db_path=db_path),
+        state_store=StateStore(db_path=db_path),
+        overlap_minutes=args.overlap_minutes,
+        batch_size=args.batch_size,
+        metrics=metrics,
+        ledger=_run_ledger(args),
+        stop_event=stop_event,
+    )
+
+
+def _capture_scheduler(args: argparse.Namespace, stop_event: Optional[threading.Event] = None) -> CaptureScheduler:
+    return CaptureScheduler(
+        Path(args.db_path),
+        load_sources(Path(args.sources_file)),
+        overlap_minutes=args.overlap_minutes,
+        batch_size=args.batch_size,
+        ledger=_run_ledger(args),
+        metrics_factory=(lambda: NULL_METRICS) if args.no_metrics else MetricsRecorder,
+        stop_event=stop_event,
+    )
+
+
+def _run_ledger(args: argparse.Namespace) -> RunLedger:
+    textfile = Path(args.metrics_textfile) if args.metrics_textfile else None
+    return RunLedger(Path(args.db_path), textfile_path=textfile)
+
+
+def _after_capture(args: argparse.Namespace) -> int:
+    db_path = Path(args.db_path)
+    # Cluster new duplicates first so only canonical tenders are scored.
+    TenderDeduplicator(db_path).run()
+    model_path = Path(args.model_path)
+    return TenderScorer(db_path, model_path=model_path).run().scored if model_path.exists() else 0
+
+
+def _source_summary(item: SourceRunResult) -> dict:
+    if item.result is None:
+        return {"error": item.error}
+    return {
+        "run_id": item.result.run_id,
+        "fetched": item.result.fetched,
+        "inserted": item.result.inserted,
+        "updated": item.result.updated,
+        "unchanged": item.result.unchanged,
+        "not_modified": item.result.not_modified,
+    }
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Affinity scoring of captured tenders against the agency's historical scores."""
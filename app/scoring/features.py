@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import Counter
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SparseVector = Dict[int, float]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Short Spanish function words that only add noise to word features.
+STOP_WORDS = frozenset(
+    """
+    a al con de del e el en la las lo los o para por que se su sus un una y
+    """.split()
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case and strip accents (``Comunicación`` -> ``comunicacion``).
+
+    Characters with no ASCII decomposition are dropped; tokens are ``[a-z0-9]+`` anyway.
+    """
+    return unicodedata.normalize("NFKD", text.casefold()).encode("ascii", "ignore").decode("ascii")
+
+
+def sublinear_tf(count: int) -> float:
+    return _SUBLINEAR_TF[count] if count < len(_SUBLINEAR_TF) else 1.0 + math.log(count)
+
+
+_SUBLINEAR_TF = [0.0] + [1.0 + math.log(count) for count in range(1, 64)]
+
+
+def extract_words(text: str) -> List[str]:
+    return [word for word in _WORD_RE.findall(normalize_text(text)) if word not in STOP_WORDS]
+
+
+def word_ngram_terms(words: Sequence[str], word_ngrams: Tuple[int, int]) -> List[str]:
+    low, high = word_ngrams
+    return [
+        "w:" + " ".join(words[start : start + size])
+        for size in range(low, high + 1)
+        for start in range(len(words) - size + 1)
+    ]
+
+
+def char_ngram_terms(word: str, char_ngrams: Tuple[int, int]) -> List[str]:
+    low, high = char_ngrams
+    padded = f" {word} "
+    return [
+        "c:" + padded[start : start + size]
+        for size in range(low, min(high, len(padded)) + 1)
+        for start in range(len(padded) - size + 1)
+    ]
+
+
+def extract_terms(
+    text: str,
+    word_ngrams: Tuple[int, int] = (1, 2),
+    char_ngrams: Tuple[int, int] = (3, 5),
+) -> List[str]:
+    """Word n-grams (``w:``) and in-word character n-grams (``c:``) of accent-folded text."""
+    words = extract_words(text)
+    terms = word_ngram_terms(words, word_ngrams)
+    if char_ngrams[1]:
+        for word in words:
+            terms.extend(char_ngram_terms(word, char_ngrams))
+    return terms
+
+
+class TfidfVectorizer:
+    """Sparse TF-IDF over word and character n-grams (sublinear tf, smoothed idf, L2 norm).
+
+    ``transform`` memoises the vocabulary indices of each word's character
+    n-grams: tender vocabularies are small and repetitive, so most words are
+    resolved with one dictionary lookup instead of rebuilding their n-grams.
+    """
+
+    word_cache_size = 200_000
+
+    def __init__(
+        self,
+        word_ngrams: Tuple[int, int] = (1, 2),
+        char_ngrams: Tuple[int, int] = (3, 5),
+        min_df: int = 2,
+        vocabulary: Optional[Dict[str, int]] = None,
+        idf: Optional[Sequence[float]] = None,
+    ) -> None:
+        self.word_ngrams = tuple(word_ngrams)
+        self.char_ngrams = tuple(char_ngrams)
+        self.min_df = min_df
+        self.vocabulary: Dict[str, int] = dict(vocabulary or {})
+        self.idf: List[float] = list(idf or [])
+        self._word_cache: Dict[str, Tuple[int, ...]] = {}
+
+    def fit(self, texts: Sequence[str]) -> "TfidfVectorizer":
+        document_frequency: Counter[str] = Counter()
+        for text in texts:
+            document_frequency.update(set(self._terms(text)))
+        kept = sorted(term for term, count in document_frequency.items() if count >= self.min_df)
+        self.vocabulary = {term: index for index, term in enumerate(kept)}
+        documents = len(texts)
+        self.idf = [math.log((1 + documents) / (1 + document_frequency[term])) + 1.0 for term in kept]
+        self._word_cache = {}
+        return self
+
+    def transform(self, texts: Iterable[str]) -> List[SparseVector]:
+        return [self.transform_one(text) for text in texts]
+
+    def transform_one(self, text: str) -> SparseVector:
+        idf = self.idf
+        vector = {index: sublinear_tf(count) * idf[index] for index, count in self.term_counts(text).items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if norm:
+            for index in vector:
+                vector[index] /= norm
+        return vector
+
+    def term_counts(self, text: str) -> Counter[int]:
+        """Raw counts of the vocabulary terms found in ``text``, by term index."""
+        vocabulary = self.vocabulary
+        words = extract_words(text)
+        indices = [
+            index
+            for index in map(vocabulary.get, word_ngram_terms(words, self.word_ngrams))
+            if index is not None
+        ]
+        if self.char_ngrams[1]:
+            cache = self._word_cache
+            for word in words:
+                word_indices = cache.get(word)
+                if word_indices is None:
+                    if len(cache) >= self.word_cache_size:
+                        cache.clear()
+                    word_indices = cache[word] = tuple(
+                        index
+                        for index in map(vocabulary.get, char_ngram_terms(word, self.char_ngrams))
+                        if index is not None
+                    )
+                indices.extend(word_indices)
+        return Counter(indices)
+
+    def to_dict(self) -> dict:
+        return {
+            "word_ngrams": list(self.word_ngrams),
+            "char_ngrams": list(self.char_ngrams),
+            "min_df": self.min_df,
+            "terms": sorted(self.vocabulary, key=self.vocabulary.__getitem__),
+            "idf": self.idf,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TfidfVectorizer":
+        return cls(
+            word_ngrams=tuple(data["word_ngrams"]),
+            char_ngrams=tuple(data["char_ngrams"]),
+            min_df=data["min_df"],
+            vocabulary={term: index for index, term in enumerate(data["terms"])},
+            idf=data["idf"],
+        )
+
+    def _terms(self, text: str) -> List[str]:
+        return extract_terms(text, self.word_ngrams, self.char_ngrams)
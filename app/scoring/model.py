@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from app.scoring.features import SparseVector, TfidfVectorizer, sublinear_tf
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRAINING_CSV = Path("data/historico_licitaciones.csv")
+DEFAULT_MODEL_PATH = Path("models/scoring_model.json")
+MODEL_FORMAT = 1
+MIN_SCORE = 1.0
+MAX_SCORE = 5.0
+# Score reserved for texts the model knows nothing about (see config/scoring.txt).
+REVIEW_SCORE = 0.0
+
+
+@dataclass(slots=True)
+class AffinityModel:
+    """TF-IDF features with ridge-regression weights predicting the 1–5 affinity score."""
+
+    vectorizer: TfidfVectorizer
+    weights: List[float]
+    intercept: float
+    metadata: Dict[str, object] = field(default_factory=dict)
+    content_hash: str = ""
+
+    def predict(self, vectors: Sequence[SparseVector]) -> List[float]:
+        """Score a batch of vectors; empty ones (no known term) get ``REVIEW_SCORE``."""
+        weights = self.weights
+        intercept = self.intercept
+        scores = []
+        for vector in vectors:
+            if not vector:
+                scores.append(REVIEW_SCORE)
+                continue
+            value = intercept + sum(weights[index] * weight for index, weight in vector.items())
+            scores.append(min(MAX_SCORE, max(MIN_SCORE, value)))
+        return scores
+
+    def score_texts(self, texts: Sequence[str]) -> List[float]:
+        """Score raw texts without materialising their TF-IDF vectors.
+
+        With ``v = tf·idf / ‖tf·idf‖`` the prediction ``b + w·v`` only needs
+        ``Σ tf·(w·idf)`` and ``Σ (tf·idf)²``, so the per-term products are
+        folded into two arrays once and each text costs one pass over its terms.
+        """
+        weighted_idf, idf = self._folded_weights()
+        term_counts = self.vectorizer.term_counts
+        intercept = self.intercept
+        scores = []
+        for text in texts:
+            dot = 0.0
+            norm = 0.0
+            for index, count in term_counts(text).items():
+                tf = sublinear_tf(count)
+                dot += tf * weighted_idf[index]
+                value = tf * idf[index]
+                norm += value * value
+            if not norm:
+                scores.append(REVIEW_SCORE)
+                continue
+            scores.append(min(MAX_SCORE, max(MIN_SCORE, intercept + dot / math.sqrt(norm))))
+        return scores
+
+    def _folded_weights(self) -> Tuple[List[float], List[float]]:
+        idf = self.vectorizer.idf
+        return [weight * value for weight, value in zip(self.weights, idf)], idf
+
+    def to_dict(self) -> dict:
+        return {
+            "format": MODEL_FORMAT,
+            "vectorizer": self.vectorizer.to_dict(),
+            "weights": self.weights,
+            "intercept": self.intercept,
+            "metadata": self.metadata,
+        }
+
+
+def train_model(
+    texts: Sequence[str],
+    scores: Sequence[float],
+    alpha: float = 1.0,
+    max_iter: int = 200,
+    vectorizer: TfidfVectorizer | None = None,
+) -> AffinityModel:
+    vectorizer = (vectorizer or TfidfVectorizer()).fit(texts)
+    vectors = vectorizer.transform(texts)
+    intercept = sum(scores) / len(scores)
+    weights = _fit_ridge(vectors, [score - intercept for score in scores], len(vectorizer.idf), alpha, max_iter)
+    return AffinityModel(
+        vectorizer=vectorizer,
+        weights=weights,
+        intercept=intercept,
+        metadata={"training_rows": len(texts), "features": len(weights), "alpha": alpha},
+    )
+
+
+def evaluate_holdout(
+    texts: Sequence[str],
+    scores: Sequence[float],
+    holdout: float = 0.2,
+    alpha: float = 1.0,
+) -> Dict[str, float]:
+    """Train on the oldest rows and report MAE on the newest against predicting the mean."""
+    split = max(1, int(len(texts) * (1 - holdout)))
+    model = train_model(texts[:split], scores[:split], alpha=alpha)
+    expected = scores[split:]
+    if not expected:
+        return {}
+    predicted = model.score_texts(texts[split:])
+    baseline = model.intercept
+    return {
+        "holdout_rows": len(expected),
+        "mae": sum(abs(p - y) for p, y in zip(predicted, expected)) / len(expected),
+        "baseline_mae": sum(abs(baseline - y) for y in expected) / len(expected),
+    }
+
+
+def load_training_csv(path: Path = DEFAULT_TRAINING_CSV) -> Tuple[List[str], List[float]]:
+    """Read ``Objeto``/``Score`` pairs in file order (oldest first).
+
+    Unscored rows and score 0 ("needs manual review", not an affinity level) are skipped.
+    """
+    texts: List[str] = []
+    scores: List[float] = []
+    with path.open(encoding="utf-8-sig", newline="") as handle:
+        rows = sorted(csv.DictReader(handle), key=lambda row: row.get("SourceFile") or "")
+    for row in rows:
+        text = (row.get("Objeto") or "").strip()
+        try:
+            score = float((row.get("Score") or "").strip())
+        except ValueError:
+            continue
+        if text and MIN_SCORE <= score <= MAX_SCORE:
+            texts.append(text)
+            scores.append(score)
+    return texts, scores
+
+
+def save_model(model: AffinityModel, path: Path = DEFAULT_MODEL_PATH) -> str:
+    """Write the model as JSON next to the SHA-256 of its body and return that hash."""
+    model.metadata.setdefault("trained_at", datetime.now(timezone.utc).isoformat())
+    body = json.dumps(model.to_dict(), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(path.suffix + ".part")
+    partial.write_text(f'{{"sha256":"{digest}","model":{body}}}', encoding="utf-8")
+    os.replace(partial, path)
+    model.content_hash = digest
+    return digest
+
+
+def load_model(path: Path = DEFAULT_MODEL_PATH) -> AffinityModel:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    payload = data["model"]
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    if digest != data.get("sha256"):
+        raise ValueError(f"Scoring model {path} is corrupt: content hash mismatch")
+    if payload.get("format") != MODEL_FORMAT:
+        raise ValueError(f"Unsupported scoring model format {payload.get('format')!r} in {path}")
+    return AffinityModel(
+        vectorizer=TfidfVectorizer.from_dict(payload["vectorizer"]),
+        weights=payload["weights"],
+        intercept=payload["intercept"],
+        metadata=payload.get("metadata", {}),
+        content_hash=digest,
+    )
+
+
+def _fit_ridge(
+    vectors: Sequence[SparseVector],
+    targets: Sequence[float],
+    features: int,
+    alpha: float,
+    max_iter: int,
+    tolerance: float = 1e-8,
+) -> List[float]:
+    """Solve ``(XᵀX + αI) w = Xᵀy`` with conjugate gradients on the sparse rows."""
+
+    def normal_matvec(vector: List[float]) -> List[float]:
+        product = [alpha * value for value in vector]
+        for row in vectors:
+            projection = sum(vector[index] * value for index, value in row.items())
+            if projection:
+                for index, value in row.items():
+                    product[index] += projection * value
+        return product
+
+    rhs = [0.0] * features
+    for row, target in zip(vectors, targets):
+        for index, value in row.items():
+            rhs[index] += target * value
+
+    weights = [0.0] * features
+    residual = rhs[:]
+    direction = residual[:]
+    residual_norm = sum(value * value for value in residual)
+    threshold = tolerance * max(residual_norm, 1e-300)
+    iteration = 0
+    for iteration in range(max_iter):
+        if residual_norm <= threshold:
+            break
+        step_direction = normal_matvec(direction)
+        step = residual_norm / sum(d * s for d, s in zip(direction, step_direction))
+        for index in range(features):
+            weights[index] += step * direction[index]
+            residual[index] -= step * step_direction[index]
+        new_norm = sum(value * value for value in residual)
+        beta = new_norm / residual_norm
+        direction = [r + beta * d for r, d in zip(residual, direction)]
+        residual_norm = new_norm
+    logger.debug("Ridge converged after %s iterations (residual %.3g)", iteration + 1, math.sqrt(residual_norm))
+    return weights
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+from pathlib import Path
+from typing import Optional
+
+from app.capture.database import Database
+from app.filtering.dedup import canonical_only, ensure_cluster_tables
+from app.scoring.model import DEFAULT_MODEL_PATH, AffinityModel, load_model
+
+logger = logging.getLogger(__name__)
+
+# Canonical rows never scored, changed since they were scored, or scored by another model.
+SELECT_PENDING_SQL = f"""
+    SELECT t.id, t.title, t.summary, t.content_hash
+    FROM tenders_raw AS t
+    LEFT JOIN tenders_scored AS s ON s.tender_id = t.id
+    WHERE t.id > ?
+        AND (s.tender_id IS NULL OR s.model_hash != ? OR s.content_hash IS NOT t.content_hash)
+        AND {canonical_only("t")}
+    ORDER BY t.id
+    LIMIT ?
+"""
+
+UPSERT_SCORED_SQL = """
+    INSERT INTO tenders_scored (tender_id, score, score_level, model_hash, content_hash, scored_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tender_id) DO UPDATE
+    SET score = excluded.score,
+        score_level = excluded.score_level,
+        model_hash = excluded.model_hash,
+        content_hash = excluded.content_hash,
+        scored_at = excluded.scored_at
+"""
+
+
+@dataclass(slots=True)
+class ScoringRunResult:
+    scored: int
+    model_hash: Optional[str]
+
+
+class TenderScorer:
+    """Score captured tenders with the persisted affinity model.
+
+    The model file is read on first use, not when the scorer is built. Rows are
+    scored in batches and each batch is written in one transaction; a row is
+    rescored only when it is new, its content hash changed or the model did.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        model_path: Path = DEFAULT_MODEL_PATH,
+        database: Optional[Database] = None,
+        batch_size: int = 5000,
+    ) -> None:
+        self.db_path = db_path
+        self.model_path = model_path
+        self.database = database or Database.shared(db_path)
+        self.batch_size = batch_size
+        self._model: Optional[AffinityModel] = None
+        self._ensure_table()
+
+    @property
+    def model(self) -> AffinityModel:
+        if self._model is None:
+            self._model = load_model(self.model_path)
+            logger.info("Loaded scoring model %s (%s)", self.model_path, self._model.content_hash[:12])
+        return self._model
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            ensure_cluster_tables(conn)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tenders_scored (
+                    tender_id INTEGER PRIMARY KEY REFERENCES tenders_raw (id),
+                    score REAL NOT NULL,
+                    score_level INTEGER NOT NULL,
+                    model_hash TEXT NOT NULL,
+                    content_hash TEXT,
+                    scored_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tenders_scored_level ON tenders_scored (score_level)")
+
+    def run(self, now: Optional[datetime] = None) -> ScoringRunResult:
+        if not self.model_path.exists() and self._model is None:
+            logger.warning("No scoring model at %s; skipping scoring", self.model_path)
+            return ScoringRunResult(scored=0, model_hash=None)
+
+        scored_at = (now or datetime.now(timezone.utc)).isoformat()
+        model_hash = self.model.content_hash
+        scored = 0
+        last_id = 0
+        while True:
+            with self.database.connection() as conn:
+                rows = conn.execute(SELECT_PENDING_SQL, (last_id, model_hash, self.batch_size)).fetchall()
+            if not rows:
+                break
+            scores = self.model.score_texts([tender_text(title, summary) for _, title, summary, _ in rows])
+            with self.database.transaction() as conn:
+                conn.executemany(
+                    UPSERT_SCORED_SQL,
+                    [
+                        (row[0], score, round(score), model_hash, row[3], scored_at)
+                        for row, score in zip(rows, scores)
+                    ],
+                )
+            scored += len(rows)
+            last_id = rows[-1][0]
+
+        logger.info("Scoring finished. scored=%s model=%s", scored, model_hash[:12])
+        return ScoringRunResult(scored=scored, model_hash=model_hash)
+
+
+def tender_text(title: str, summary: str) -> str:
+    # Historical scores were given to the "Objeto" text, which PLACSP splits into title and summary.
+    if not summary or summary == title:
+        return title
+    return f"{title}. {summary}"
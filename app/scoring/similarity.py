@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+import hashlib
+import logging
+import math
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.capture.database import Database
+from app.scoring.features import extract_terms, sublinear_tf
+from app.scoring.model import DEFAULT_TRAINING_CSV
+
+logger = logging.getLogger(__name__)
+
+# Word unigrams and bigrams only: character n-grams would make every posting list huge.
+WORD_NGRAMS = (1, 2)
+NO_CHAR_NGRAMS = (0, 0)
+
+UPSERT_DOC_SQL = """
+    INSERT INTO similar_docs (doc_key, objeto, organismo, score, source_file, link)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(doc_key) DO UPDATE
+    SET score = excluded.score,
+        organismo = excluded.organismo
+    RETURNING doc_id, (SELECT COUNT(*) FROM similar_postings WHERE doc_id = similar_docs.doc_id)
+"""
+
+# Top-k per query in one pass: a sparse (queries × terms) · (terms × docs) product grouped in SQL.
+TOP_K_SQL = """
+    SELECT ranked.query_id, d.doc_id, d.objeto, d.organismo, d.score, d.source_file, d.link, ranked.similarity
+    FROM (
+        SELECT
+            q.query_id,
+            p.doc_id,
+            SUM(q.weight * p.weight) AS similarity,
+            ROW_NUMBER() OVER (PARTITION BY q.query_id ORDER BY SUM(q.weight * p.weight) DESC, p.doc_id) AS rank
+        FROM temp.similar_query AS q
+        JOIN similar_postings AS p ON p.term_id = q.term_id
+        GROUP BY q.query_id, p.doc_id
+    ) AS ranked
+    JOIN similar_docs AS d ON d.doc_id = ranked.doc_id
+    WHERE ranked.rank <= ? AND ranked.similarity >= ?
+    ORDER BY ranked.query_id, ranked.rank
+"""
+
+
+@dataclass(slots=True)
+class HistoricTender:
+    objeto: str
+    organismo: str
+    score: Optional[float]
+    source_file: str = ""
+    link: str = ""
+
+
+@dataclass(slots=True)
+class SimilarTender:
+    doc_id: int
+    objeto: str
+    organismo: str
+    score: Optional[float]
+    source_file: str
+    link: str
+    similarity: float
+
+
+class SimilarityIndex:
+    """Cosine-similarity index of hand-scored historic tenders, stored in SQLite.
+
+    Documents are TF-IDF vectors over accent-folded word n-grams kept as an
+    inverted index (``similar_postings``), read through the database's memory
+    map. ``add`` appends documents without touching existing postings: terms
+    already known keep their idf and new terms get one computed from the
+    current document count. ``similar`` answers a whole batch of queries with a
+    single grouped join instead of scanning the history once per tender.
+    """
+
+    def __init__(self, db_path: Path, database: Optional[Database] = None) -> None:
+        self.db_path = db_path
+        self.database = database or Database.shared(db_path)
+        self._vocabulary: Optional[Dict[str, Tuple[int, float]]] = None
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.database.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS similar_docs (
+                    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    doc_key TEXT NOT NULL UNIQUE,
+                    objeto TEXT NOT NULL,
+                    organismo TEXT NOT NULL,
+                    score REAL,
+                    source_file TEXT NOT NULL,
+                    link TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS similar_terms (
+                    term_id INTEGER PRIMARY KEY,
+                    term TEXT NOT NULL UNIQUE,
+                    df INTEGER NOT NULL,
+                    idf REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS similar_postings (
+                    term_id INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    weight REAL NOT NULL,
+                    PRIMARY KEY (term_id, doc_id)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def __len__(self) -> int:
+        with self.database.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM similar_docs").fetchone()[0]
+
+    def add(self, documents: Iterable[HistoricTender]) -> int:
+        """Index documents not seen before (by source file and text); known ones only refresh their score."""
+        documents = list(documents)
+        try:
+            fresh, new_terms = self._add(documents)
+        except BaseException:
+            # The transaction rolled back: forget terms cached from it.
+            self._vocabulary = None
+            raise
+        logger.info("Similarity index: %s new documents, %s new terms", fresh, new_terms)
+        return fresh
+
+    def _add(self, documents: Sequence[HistoricTender]) -> Tuple[int, int]:
+        with self.database.transaction() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM similar_docs").fetchone()[0]
+            vocabulary = self._load_vocabulary(conn)
+            fresh: List[Tuple[int, List[str]]] = []
+            seen = set()
+            for document in documents:
+                doc_id, postings = conn.execute(
+                    UPSERT_DOC_SQL,
+                    (
+                        _doc_key(document),
+                        document.objeto,
+                        document.organismo,
+                        document.score,
+                        document.source_file,
+                        document.link,
+                    ),
+                ).fetchone()
+                if not postings and doc_id not in seen:
+                    seen.add(doc_id)
+                    fresh.append((doc_id, _terms(document.objeto)))
+
+            # New terms get an idf from the corpus size after this batch; known terms keep theirs.
+            total += len(fresh)
+            new_df: Dict[str, int] = {}
+            for _, terms in fresh:
+                for term in set(terms):
+                    if term not in vocabulary:
+                        new_df[term] = new_df.get(term, 0) + 1
+            next_id = conn.execute("SELECT COALESCE(MAX(term_id), 0) + 1 FROM similar_terms").fetchone()[0]
+            new_terms = []
+            for offset, (term, df) in enumerate(sorted(new_df.items())):
+                idf = math.log((1 + total) / (1 + df)) + 1.0
+                vocabulary[term] = (next_id + offset, idf)
+                new_terms.append((next_id + offset, term, df, idf))
+            conn.executemany("INSERT INTO similar_terms (term_id, term, df, idf) VALUES (?, ?, ?, ?)", new_terms)
+
+            postings = []
+            for doc_id, terms in fresh:
+                vector = _vector(terms, vocabulary)
+                postings.extend((term_id, doc_id, weight) for term_id, weight in vector.items())
+            conn.executemany(
+                "INSERT OR REPLACE INTO similar_postings (term_id, doc_id, weight) VALUES (?, ?, ?)", postings
+            )
+        return len(fresh), len(new_terms)
+
+    def similar(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        min_similarity: float = 0.05,
+    ) -> List[List[SimilarTender]]:
+        """Return the ``k`` most similar historic tenders for each text, best first."""
+        if not texts:
+            return []
+        with self.database.transaction() as conn:
+            vocabulary = self._load_vocabulary(conn)
+            conn.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS similar_query (
+                    query_id INTEGER NOT NULL,
+                    term_id INTEGER NOT NULL,
+                    weight REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("DELETE FROM temp.similar_query")
+            conn.executemany(
+                "INSERT INTO temp.similar_query (query_id, term_id, weight) VALUES (?, ?, ?)",
+                [
+                    (query_id, term_id, weight)
+                    for query_id, text in enumerate(texts)
+                    for term_id, weight in _vector(_terms(text), vocabulary).items()
+                ],
+            )
+            rows = conn.execute(TOP_K_SQL, (k, min_similarity)).fetchall()
+            conn.execute("DELETE FROM temp.similar_query")
+
+        results: List[List[SimilarTender]] = [[] for _ in texts]
+        for query_id, *fields in rows:
+            results[query_id].append(SimilarTender(*fields))
+        return results
+
+    def _load_vocabulary(self, conn: sqlite3.Connection) -> Dict[str, Tuple[int, float]]:
+        if self._vocabulary is None:
+            self._vocabulary = {
+                term: (term_id, idf) for term_id, term, idf in conn.execute("SELECT term_id, term, idf FROM similar_terms")
+            }
+        return self._vocabulary
+
+
+def load_historic_tenders(path: Path = DEFAULT_TRAINING_CSV) -> List[HistoricTender]:
+    """Every row of the historic CSV with an ``Objeto``; unscored rows keep ``score=None``."""
+    documents = []
+    with path.open(encoding="utf-8-sig", newline="") as handle:
+        for row in csv.DictReader(handle):
+            objeto = (row.get("Objeto") or "").strip()
+            if not objeto:
+                continue
+            try:
+                score: Optional[float] = float((row.get("Score") or "").strip())
+            except ValueError:
+                score = None
+            documents.append(
+                HistoricTender(
+                    objeto=objeto,
+                    organismo=(row.get("OrganismoConvocante") or "").strip(),
+                    score=score,
+                    source_file=(row.get("SourceFile") or "").strip(),
+                    link=(row.get("InformacionWeb") or "").strip(),
+                )
+            )
+    return documents
+
+
+def _terms(text: str) -> List[str]:
+    return extract_terms(text, WORD_NGRAMS, NO_CHAR_NGRAMS)
+
+
+def _vector(terms: Sequence[str], vocabulary: Dict[str, Tuple[int, float]]) -> Dict[int, float]:
+    counts: Dict[int, int] = {}
+    idfs: Dict[int, float] = {}
+    for term in terms:
+        known = vocabulary.get(term)
+        if known is not None:
+            term_id, idf = known
+            counts[term_id] = counts.get(term_id, 0) + 1
+            idfs[term_id] = idf
+    vector = {term_id: sublinear_tf(count) * idfs[term_id] for term_id, count in counts.items()}
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {term_id: value / norm for term_id, value in vector.items()} if norm else {}
+
+
+def _doc_key(document: HistoricTender) -> str:
+    raw = f"{document.source_file}\x1f{document.link}\x1f{document.objeto}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1 @@
+"""Tools for the historical archive of daily tender workbooks."""
@@ -1,27 +1,44 @@
 from __future__ import annotations
 
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
 from pathlib import Path
-from datetime import datetime
+import shutil
 import pandas as pd
 
+# El parseo de fechas es el mismo que usa la captura (app/capture/normalize.py).
+# Se ejecuta como módulo desde la raíz del repositorio: python -m archivo.merge_licitaciones
+from app.capture.normalize import iso_date_column
+
+try:  # Feather (Arrow) si está disponible; si no, la caché usa pickle
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 
 # ==========================
 # CONFIGURACIÓN
 # ==========================
 
-BASE_FOLDER = Path(
-    r"C:\Users\Miguel.Rubio Espinos\OneDrive\Route Miguel INC\García&Smith\Projects\TRESCOM\Licitaciones\SistemaLicitaciones"
-)
-
-SOURCE_FOLDER = BASE_FOLDER / "Archivo Historico de Licitaciones"
+# Carpeta con los .xlsx diarios: --source-folder, o la variable de entorno
+# LICITACIONES_SOURCE_FOLDER, o la carpeta junto a este script
+SOURCE_FOLDER_ENV = "LICITACIONES_SOURCE_FOLDER"
+DEFAULT_SOURCE_FOLDER = Path(__file__).resolve().parent / "Archivo Historico de Licitaciones"
 
-SHEET_NAME = "Licitaciones"
-NAME_CONTAINS = "Licitaciones"
+# Dentro de la carpeta origen: caché columnar por fichero (clave: ruta + mtime + tamaño)
+# y manifiesto de ficheros ya fusionados
+CACHE_DIRNAME = ".cache_merge"
+MANIFEST_NAME = "merge_manifest.json"
 
-today_str = datetime.today().strftime("%Y%m%d")
-OUTPUT_CSV = SOURCE_FOLDER / f"licitaciones_fusionadas_{today_str}.csv"
+# Procesos para leer los .xlsx nuevos (None => nº de CPUs)
+MAX_WORKERS: int | None = None
 
-# Columnas de fecha a normalizar (dd/mm/aaaa -> yyyy-mm-dd)
+# Columnas de fecha a normalizar (dd/mm/aaaa -> yyyy-mm-dd) en Licitaciones
 DATE_COLUMNS = [
     "PlazoPresentacionFecha",
     # añade aquí otras columnas fecha si existen, por ejemplo:
@@ -38,6 +55,31 @@ KEEP_COLS = [
     "Objeto",
 ]
 
+# Un conjunto por tipo de fichero diario: hoja, filtro de nombre, columnas y CSV de salida
+DATASETS = {
+    "Licitaciones": {
+        "sheet_name": "Licitaciones",
+        "name_contains": "Licitaciones",
+        "date_columns": DATE_COLUMNS,
+        "keep_cols": KEEP_COLS,
+        "output_csv": "licitaciones_fusionadas.csv",
+    },
+    "Adjudicaciones": {
+        "sheet_name": "Adjudicaciones",
+        "name_contains": "Adjudicaciones",
+        "date_columns": ["Fecha"],
+        "keep_cols": [],
+        "output_csv": "adjudicaciones_fusionadas.csv",
+    },
+    "Modificaciones": {
+        "sheet_name": "Modificaciones",
+        "name_contains": "Modificaciones",
+        "date_columns": [],
+        "keep_cols": [],
+        "output_csv": "modificaciones_fusionadas.csv",
+    },
+}
+
 
 # ==========================
 # HELPERS
@@ -48,14 +90,14 @@ def normalize_cols(cols: list[str]) -> list[str]:
     return [c.strip() for c in cols]
 
 
-def apply_keep_cols(df: pd.DataFrame) -> pd.DataFrame:
-    if not KEEP_COLS:
-        return df
-
-    wanted = normalize_cols(KEEP_COLS)
+def apply_keep_cols(df: pd.DataFrame, keep_cols: list[str] | None = None) -> pd.DataFrame:
+    keep_cols = KEEP_COLS if keep_cols is None else keep_cols
     df = df.copy()
-    df.columns = normalize_cols(list(df.columns))
+    df.columns = normalize_cols([str(c) for c in df.columns])
+    if not keep_cols:
+        return df
 
+    wanted = normalize_cols(keep_cols)
     missing = [c for c in wanted if c not in df.columns]
     if missing:
         print(f"AVISO: faltan columnas en este archivo: {missing}")
@@ -64,88 +106,254 @@ def apply_keep_cols(df: pd.DataFrame) -> pd.DataFrame:
     return df.loc[:, present]
 
 
-def fix_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+def fix_date_columns(df: pd.DataFrame, date_columns: list[str] | None = None) -> pd.DataFrame:
     """
-    Convierte columnas fecha suponiendo entrada dd/mm/aaaa (dayfirst=True)
+    Convierte columnas fecha suponiendo entrada dd/mm/aaaa (dayfirst)
     y las deja como texto ISO yyyy-mm-dd para que Excel no las interprete al revés.
     """
     df = df.copy()
-    for col in DATE_COLUMNS:
+    for col in DATE_COLUMNS if date_columns is None else date_columns:
         if col in df.columns:
-            # to_datetime soporta valores ya-datetime, números, strings, etc.
-            s = pd.to_datetime(df[col], dayfirst=True, errors="coerce")
-
-            # Convertimos a string ISO; NaT queda como <NA>
-            df[col] = s.dt.strftime("%Y-%m-%d")
+            # Acepta texto dd/mm/aaaa o ISO y celdas ya-datetime; cada valor distinto se parsea una vez.
+            # Lo que no se reconoce queda como <NA>
+            df[col] = pd.array(iso_date_column(df[col].tolist()), dtype="string")
 
     return df
 
 
+def file_signature(p: Path) -> dict:
+    st = p.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ==========================
+# CACHÉ COLUMNAR
+# ==========================
+
+def cache_path(p: Path, sheet_name: str, signature: dict) -> Path:
+    # Cambia si cambia la ruta, la hoja, el tamaño o la fecha de modificación
+    key = f"{p.resolve()}|{sheet_name}|{signature['size']}|{signature['mtime_ns']}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return p.parent / CACHE_DIRNAME / f"{p.stem}_{digest}"
+
+
+def read_cache(base: Path) -> pd.DataFrame | None:
+    feather = base.with_suffix(".feather")
+    if HAS_PYARROW and feather.exists():
+        return pd.read_feather(feather)
+    pickle = base.with_suffix(".pkl")
+    if pickle.exists():
+        return pd.read_pickle(pickle)
+    return None
+
+
+def write_cache(df: pd.DataFrame, base: Path) -> None:
+    base.parent.mkdir(parents=True, exist_ok=True)
+    df = df.reset_index(drop=True)
+    if not HAS_PYARROW:
+        # Sin pyarrow: caché en pickle (mucho más rápido de releer que el .xlsx)
+        df.to_pickle(base.with_suffix(".pkl"))
+        return
+    # Arrow necesita un tipo por columna: las columnas mixtas (número/texto) van como texto
+    mixed = {c: "string" for c in df.columns if df[c].dtype == object}
+    df.astype(mixed).to_feather(base.with_suffix(".feather"))
+
+
+def load_workbook(p: Path, sheet_name: str, signature: dict) -> pd.DataFrame:
+    """Lee una hoja (desde la caché si el fichero no ha cambiado). Se ejecuta en el pool de procesos."""
+    base = cache_path(p, sheet_name, signature)
+    cached = read_cache(base)
+    if cached is not None:
+        return cached
+
+    df = pd.read_excel(p, sheet_name=sheet_name, engine="openpyxl")
+    df = df.dropna(how="all")
+    write_cache(df, base)
+    return df.reset_index(drop=True)
+
+
+def prepare_frame(df: pd.DataFrame, source_name: str, config: dict) -> pd.DataFrame:
+    df = df.copy()
+    # Añadir trazabilidad
+    df.insert(0, "SourceFile", source_name)
+    # Selección/orden de columnas (si aplica)
+    df = apply_keep_cols(df, config["keep_cols"])
+    # Arreglar fechas (dd/mm -> ISO)
+    return fix_date_columns(df, config["date_columns"])
+
+
+# ==========================
+# MANIFIESTO
+# ==========================
+
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_manifest(manifest: dict, path: Path) -> None:
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_csv(new_rows: pd.DataFrame, output_csv: Path, append: bool) -> None:
+    """Escribe (o añade) en una copia temporal y la sustituye de una vez con ``os.replace``.
+
+    Un fallo a mitad deja el CSV anterior intacto. Si el proceso muere entre este
+    reemplazo y el del manifiesto, la firma del CSV guardada en el manifiesto ya no
+    coincide y la siguiente ejecución reconstruye desde la caché en vez de duplicar filas.
+    """
+    tmp = output_csv.with_name(output_csv.name + ".tmp")
+    try:
+        if append:
+            shutil.copyfile(output_csv, tmp)
+            # Añadir al CSV existente (sin cabecera ni BOM)
+            new_rows.to_csv(tmp, mode="a", header=False, index=False, encoding="utf-8")
+        else:
+            # Exportar como UTF-8 con BOM (Excel-friendly)
+            new_rows.to_csv(tmp, index=False, encoding="utf-8-sig")
+        os.replace(tmp, output_csv)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 # ==========================
 # PROCESO
 # ==========================
 
-def main() -> int:
-    if not SOURCE_FOLDER.exists():
-        print(f"ERROR: La carpeta origen no existe:\n{SOURCE_FOLDER}")
-        return 1
+def merge_dataset(
+    name: str,
+    config: dict,
+    manifest: dict,
+    pool: ProcessPoolExecutor,
+    source_folder: Path,
+    full_rebuild: bool = False,
+) -> int:
+    name_contains = config["name_contains"]
+    output_csv = source_folder / config["output_csv"]
 
     files = sorted(
-        [p for p in SOURCE_FOLDER.glob("*.xlsx")
-         if NAME_CONTAINS.lower() in p.name.lower()]
+        [p for p in source_folder.glob("*.xlsx")
+         if name_contains.lower() in p.name.lower()]
     )
-
     if not files:
-        print(f"ERROR: No se encontraron archivos .xlsx que contengan '{NAME_CONTAINS}'")
-        return 1
+        print(f"AVISO: No se encontraron archivos .xlsx que contengan '{name_contains}'")
+        return 0
+
+    signatures = {p.name: file_signature(p) for p in files}
+    state = manifest.get(name, {})
+    merged_files: dict = state.get("files", {})
+
+    # Incremental solo si el CSV es el que registró el manifiesto y ningún fichero
+    # ya fusionado ha cambiado o desaparecido
+    unchanged = all(signatures.get(f) == sig for f, sig in merged_files.items())
+    incremental = (
+        not full_rebuild
+        and output_csv.exists()
+        and file_signature(output_csv) == state.get("output_signature")
+        and bool(merged_files)
+        and unchanged
+    )
+    to_read = [p for p in files if p.name not in merged_files] if incremental else files
+
+    if incremental and not to_read:
+        print(f"{name}: sin ficheros nuevos ({len(files)} ya fusionados)")
+        return 0
+
+    futures = {
+        p: pool.submit(load_workbook, p, config["sheet_name"], signatures[p.name])
+        for p in to_read
+    }
 
     dfs: list[pd.DataFrame] = []
     errors: list[str] = []
-
-    for p in files:
+    read_ok: dict = {}
+    for p, future in futures.items():
         try:
-            df = pd.read_excel(p, sheet_name=SHEET_NAME, engine="openpyxl")
-            df = df.dropna(how="all")
-
-            # Añadir trazabilidad
-            df.insert(0, "SourceFile", p.name)
-
-            # Selección/orden de columnas (si aplica)
-            df = apply_keep_cols(df)
-
+            df = prepare_frame(future.result(), p.name, config)
             dfs.append(df)
+            read_ok[p.name] = {**signatures[p.name], "rows": len(df)}
             print(f"OK  - {p.name}: {len(df):,} filas")
-
         except Exception as e:
             errors.append(f"{p.name} -> {e}")
             print(f"ERR - {p.name}: {e}")
 
+    if errors:
+        print(f"\n{name}: archivos con error:")
+        print("\n".join(errors))
+
     if not dfs:
-        print("ERROR: No se pudo leer ningún archivo correctamente.")
-        if errors:
-            print("\nDetalles:")
-            print("\n".join(errors))
+        print(f"ERROR: {name}: no se pudo leer ningún archivo correctamente.")
         return 1
 
-    merged = pd.concat(dfs, ignore_index=True, sort=False)
-
-    # Arreglar fechas (dd/mm -> ISO)
-    merged = fix_date_columns(merged)
-
-    # Exportar como UTF-8 con BOM (Excel-friendly)
-    merged.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
+    new_rows = pd.concat(dfs, ignore_index=True, sort=False)
+
+    if incremental and new_rows.columns.tolist() == state.get("columns"):
+        write_csv(new_rows, output_csv, append=True)
+        merged_files.update(read_ok)
+        total_rows = state.get("rows", 0) + len(new_rows)
+        mode = "añadidas"
+    else:
+        if incremental:
+            # Las columnas han cambiado: reconstrucción completa desde la caché
+            print(f"AVISO: {name}: columnas distintas, se reconstruye el CSV completo")
+            return merge_dataset(name, config, manifest, pool, source_folder, full_rebuild=True)
+        write_csv(new_rows, output_csv, append=False)
+        merged_files = read_ok
+        total_rows = len(new_rows)
+        mode = "escritas"
+
+    manifest[name] = {
+        "output": str(output_csv),
+        "output_signature": file_signature(output_csv),
+        "columns": new_rows.columns.tolist(),
+        "rows": total_rows,
+        "files": merged_files,
+    }
+    save_manifest(manifest, source_folder / MANIFEST_NAME)
 
     print("\n==============================")
-    print(f"Archivos procesados: {len(dfs)} / {len(files)}")
-    print(f"Filas totales:       {len(merged):,}")
-    print(f"CSV generado en:     {OUTPUT_CSV}")
-    print("==============================")
+    print(f"{name}")
+    print(f"Archivos leídos:     {len(dfs)} / {len(to_read)}")
+    print(f"Filas {mode}:    {len(new_rows):,}")
+    print(f"Filas totales:       {total_rows:,}")
+    print(f"CSV:                 {output_csv}")
+    print("==============================\n")
+    return 1 if errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fusiona los .xlsx diarios de licitaciones en CSV")
+    parser.add_argument(
+        "--source-folder",
+        type=Path,
+        default=Path(os.environ.get(SOURCE_FOLDER_ENV, DEFAULT_SOURCE_FOLDER)),
+        help=f"Carpeta con los .xlsx diarios (por defecto ${SOURCE_FOLDER_ENV} o {DEFAULT_SOURCE_FOLDER})",
+    )
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Procesos para leer los .xlsx (por defecto nº de CPUs)")
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Reconstruir los CSV completos (desde la caché) aunque no haya cambios",
+    )
+    return parser
 
-    if errors:
-        print("\nArchivos con error:")
-        print("\n".join(errors))
 
-    return 0
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    source_folder: Path = args.source_folder
+    if not source_folder.exists():
+        print(f"ERROR: La carpeta origen no existe:\n{source_folder}")
+        return 1
+
+    manifest = load_manifest(source_folder / MANIFEST_NAME)
+    status = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for name, config in DATASETS.items():
+            status |= merge_dataset(name, config, manifest, pool, source_folder, args.full_rebuild)
+    return status
 
 
 if __name__ == "__main__":
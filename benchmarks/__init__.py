@@ -0,0 +1 @@
+"""Micro-benchmarks for the capture pipeline (run with ``python -m benchmarks.<module>``)."""
@@ -0,0 +1,71 @@
+"""Compare per-field subtree scans against the single-pass entry field extractor."""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict
+from xml.etree import ElementTree as ET
+
+from app.capture.placsp_client import _ENTRY_FIELDS, _find_first_text_by_localname
+
+CBC = "urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2"
+CAC = "urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2"
+
+
+def build_entry(lots: int) -> ET.Element:
+    """Build an Atom entry shaped like a PLACSP ContractFolderStatus with ``lots`` procurement lots."""
+    entry = ET.Element("{http://www.w3.org/2005/Atom}entry")
+    folder = ET.SubElement(entry, f"{{{CAC}}}ContractFolderStatus")
+    ET.SubElement(folder, f"{{{CBC}}}ContractFolderID").text = "EXP-2026-0001"
+    party = ET.SubElement(ET.SubElement(folder, f"{{{CAC}}}LocatedContractingParty"), f"{{{CAC}}}Party")
+    for index in range(lots):
+        lot = ET.SubElement(folder, f"{{{CAC}}}ProcurementProjectLot")
+        ET.SubElement(lot, f"{{{CBC}}}ID").text = str(index)
+        project = ET.SubElement(lot, f"{{{CAC}}}ProcurementProject")
+        ET.SubElement(project, f"{{{CBC}}}Name").text = f"Lote {index}"
+        ET.SubElement(project, f"{{{CBC}}}TypeCode").text = "2"
+        ET.SubElement(ET.SubElement(project, f"{{{CAC}}}BudgetAmount"), f"{{{CBC}}}TaxExclusiveAmount").text = "1000"
+    # Business fields sit at the end of the subtree, the worst case for repeated scans.
+    ET.SubElement(ET.SubElement(party, f"{{{CAC}}}PartyName"), f"{{{CBC}}}Name").text = "Ayuntamiento"
+    project = ET.SubElement(folder, f"{{{CAC}}}ProcurementProject")
+    ET.SubElement(project, f"{{{CBC}}}TotalAmount").text = "125.000,50"
+    ET.SubElement(project, f"{{{CBC}}}ItemClassificationCode").text = "79341000"
+    ET.SubElement(project, f"{{{CBC}}}NUTSCode").text = "ES300"
+    tender_process = ET.SubElement(folder, f"{{{CAC}}}TenderingProcess")
+    ET.SubElement(tender_process, f"{{{CBC}}}EndDate").text = "2026-02-10"
+    return entry
+
+
+def _per_field_scans(entry: ET.Element) -> Dict[str, str]:
+    return {
+        "deadline": _find_first_text_by_localname(entry, ["DeadlineDate", "EndDate", "PresentationPeriod"]),
+        "buyer": _find_first_text_by_localname(entry, ["PartyName", "BuyerProfile", "ContractingParty"]),
+        "region": _find_first_text_by_localname(entry, ["NUTSCode", "Region", "PlaceExecution"]),
+        "cpv": _find_first_text_by_localname(entry, ["ItemClassificationCode", "CPV", "CPVCode"]),
+        "budget": _find_first_text_by_localname(entry, ["TotalAmount", "BudgetAmount", "EstimatedOverallContractAmount"]),
+    }
+
+
+def _entries_per_second(extract: Callable[[ET.Element], object], entry: ET.Element, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        extract(entry)
+    return repeat / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lots", type=int, default=200, help="Procurement lots in the synthetic entry")
+    parser.add_argument("--repeat", type=int, default=200, help="Extractions per measurement")
+    args = parser.parse_args()
+
+    entry = build_entry(args.lots)
+    before = _entries_per_second(_per_field_scans, entry, args.repeat)
+    after = _entries_per_second(_ENTRY_FIELDS.extract, entry, args.repeat)
+    print(f"elements per entry: {sum(1 for _ in entry.iter()):,}")
+    print(f"per-field scans:    {before:,.0f} entries/s")
+    print(f"single pass:        {after:,.0f} entries/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare the previous per-call date/amount parsing against the cached parsers in ``app.capture.normalize``."""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.capture.normalize import (
+    _parse_datetime_text,
+    iso_date_column,
+    parse_amount,
+    parse_amount_column,
+    parse_datetime,
+    parse_datetime_column,
+)
+from benchmarks.feed_generator import iter_items, spanish_amount
+
+
+def _legacy_datetime(value: str) -> Optional[datetime]:
+    # The parser used by the capture before the cached one: ISO first, then RFC 2822.
+    if not value:
+        return None
+    try:
+        if value.endswith("Z"):
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _legacy_amount(value: object) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    raw = str(value).strip().replace("€", "").replace(" ", "")
+    if "," in raw and "." in raw:
+        raw = raw.replace(".", "").replace(",", ".")
+    elif "," in raw:
+        raw = raw.replace(",", ".")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _legacy_iso_date(value: str) -> Optional[str]:
+    for fmt in ("%d/%m/%Y", "%d/%m/%Y %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def build_columns(entries: int, seed: int = 0) -> Dict[str, List[str]]:
+    """Text columns as they reach the parsers: feed timestamps, deadlines, amounts and archive dates."""
+    columns: Dict[str, List[str]] = {"published": [], "deadline": [], "amount": [], "archive_date": []}
+    for item in iter_items(entries, seed=seed):
+        columns["published"].append(item["published_at"].isoformat(timespec="milliseconds").replace("+00:00", "Z"))
+        columns["deadline"].append(item["deadline_at"].isoformat())
+        columns["amount"].append(spanish_amount(item["budget_amount"]))
+        columns["archive_date"].append(item["deadline_at"].strftime("%d/%m/%Y"))
+    return columns
+
+
+def _values_per_second(parse: Callable[[List[str]], object], values: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        _parse_datetime_text.cache_clear()
+        started = time.perf_counter()
+        parse(values)
+        best = min(best, time.perf_counter() - started)
+    return len(values) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000, help="Synthetic entries (values per column)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per case; the best one is kept")
+    args = parser.parse_args()
+
+    columns = build_columns(args.entries, args.seed)
+    cases = [
+        ("published (ISO, Z)", "published", lambda v: [_legacy_datetime(x) for x in v], lambda v: [parse_datetime(x) for x in v]),
+        ("deadline (ISO date)", "deadline", lambda v: [_legacy_datetime(x) for x in v], lambda v: [parse_datetime(x) for x in v]),
+        ("amount (1.234,56)", "amount", lambda v: [_legacy_amount(x) for x in v], lambda v: [parse_amount(x) for x in v]),
+        ("amount column", "amount", lambda v: [_legacy_amount(x) for x in v], parse_amount_column),
+        ("deadline column", "deadline", lambda v: [_legacy_datetime(x) for x in v], parse_datetime_column),
+        ("archive dd/mm/yyyy", "archive_date", lambda v: [_legacy_iso_date(x) for x in v], iso_date_column),
+    ]
+    for label, column, before_parse, after_parse in cases:
+        values = columns[column]
+        before = _values_per_second(before_parse, values, args.repeat)
+        after = _values_per_second(after_parse, values, args.repeat)
+        print(f"{label:<22} {before:>12,.0f} -> {after:>12,.0f} values/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""End-to-end capture benchmarks on a synthetic feed, stored as JSON baselines.
+
+    python -m benchmarks.bench_pipeline run --entries 100000 --save benchmarks/baselines/pipeline_100k.json
+    python -m benchmarks.bench_pipeline compare benchmarks/baselines/pipeline_100k.json --threshold 0.15
+
+``compare`` reruns the baseline's configuration (or reads a second result file)
+and exits with status 1 when any metric is worse than the baseline by more than
+the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import multiprocessing
+import platform
+from pathlib import Path
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.service import CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+from benchmarks.feed_generator import json_feed, write_atom_feed
+
+FORMAT = 1
+DEFAULT_THRESHOLD = 0.15
+
+# Metric name -> True when higher is better.
+METRICS: Dict[str, bool] = {
+    "parse_atom_entries_per_s": True,
+    "parse_json_entries_per_s": True,
+    "upsert_entries_per_s": True,
+    "capture_wall_s": False,
+    "capture_peak_rss_mb": False,
+}
+
+
+def _best_of(repeat: int, action: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset by exec; ru_maxrss can carry the forking parent's peak over.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _capture_in_child(feed_path: str, db_path: str, queue: "multiprocessing.Queue[Tuple[float, float]]") -> None:
+    client = PlacspClient(PlacspClientConfig(source_url=f"file://{feed_path}"))
+    repository = RawTenderRepository(Path(db_path))
+    service = CaptureService(client, repository, StateStore(Path(db_path)))
+    started = time.perf_counter()
+    service.run()
+    queue.put((time.perf_counter() - started, _peak_rss_mb()))
+
+
+def measure_capture(feed_path: Path, db_path: Path) -> Tuple[float, float]:
+    """Wall time and peak RSS (MB) of one ``CaptureService.run`` in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_capture_in_child, args=(str(feed_path), str(db_path), queue))
+    process.start()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f"capture benchmark process failed with exit code {process.exitcode}")
+    return queue.get()
+
+
+def run_benchmarks(entries: int, seed: int = 0, repeat: int = 3) -> Dict[str, object]:
+    metrics: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        feed_path = Path(tmpdir) / "feed.xml"
+        with feed_path.open("wb") as handle:
+            write_atom_feed(handle, entries, seed)
+        db_path = Path(tmpdir) / "capture.db"
+        metrics["capture_wall_s"], metrics["capture_peak_rss_mb"] = measure_capture(feed_path, db_path)
+        with sqlite3.connect(db_path) as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+        if stored != entries:
+            raise RuntimeError(f"capture stored {stored} of {entries} entries")
+
+        client = PlacspClient(PlacspClientConfig(source_url=feed_path.as_uri()))
+        atom_text = feed_path.read_text(encoding="utf-8")
+        json_text = json_feed(entries, seed).decode("utf-8")
+        tenders = client._parse_atom(atom_text)
+        metrics["parse_atom_entries_per_s"] = entries / _best_of(repeat, lambda: client._parse_atom(atom_text))
+        metrics["parse_json_entries_per_s"] = entries / _best_of(repeat, lambda: client._parse_json(json_text))
+        del atom_text, json_text
+
+        captured_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        timings: List[float] = []
+        for attempt in range(repeat):
+            repository = RawTenderRepository(Path(tmpdir) / f"upsert_{attempt}.db")
+            started = time.perf_counter()
+            repository.upsert_many(tenders, captured_at)
+            timings.append(time.perf_counter() - started)
+            repository.database.close()
+        metrics["upsert_entries_per_s"] = entries / min(timings)
+
+    return {
+        "format": FORMAT,
+        "entries": entries,
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "metrics": {name: round(metrics[name], 3) for name in METRICS},
+    }
+
+
+def compare_results(
+    baseline: Dict[str, object],
+    current: Dict[str, object],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Tuple[str, float, float, float, bool]]:
+    """Per metric: ``(name, baseline, current, relative change, regressed)``.
+
+    The relative change is signed so that positive always means better.
+    """
+    rows = []
+    for name, higher_is_better in METRICS.items():
+        before = baseline["metrics"].get(name)
+        after = current["metrics"].get(name)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        if not higher_is_better:
+            change = -change
+        rows.append((name, before, after, change, change < -threshold))
+    return rows
+
+
+def _load(path: Path) -> Dict[str, object]:
+    result = json.loads(path.read_text(encoding="utf-8"))
+    if result.get("format") != FORMAT:
+        raise ValueError(f"Unsupported benchmark result format in {path}: {result.get('format')!r}")
+    return result
+
+
+def _print_result(result: Dict[str, object]) -> None:
+    print(f"entries: {result['entries']:,} (python {result['python']}, sqlite {result['sqlite']})")
+    for name, value in result["metrics"].items():
+        print(f"  {name:<26} {value:>14,.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Capture pipeline benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Measure and optionally save a baseline")
+    run_parser.add_argument("--entries", type=int, default=10_000, help="Synthetic feed size (1k-1M)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3, help="Repetitions; the best one is kept")
+    run_parser.add_argument("--save", type=Path, default=None, help="Write the result as JSON to this path")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions against a baseline")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path, nargs="?", default=None, help="Result file (default: run now)")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Tolerated relative loss")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        result = run_benchmarks(args.entries, args.seed, args.repeat)
+        _print_result(result)
+        if args.save:
+            args.save.parent.mkdir(parents=True, exist_ok=True)
+            args.save.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        return 0
+
+    baseline = _load(args.baseline)
+    if args.current:
+        current = _load(args.current)
+    else:
+        current = run_benchmarks(baseline["entries"], baseline["seed"], baseline["repeat"])
+    regressions = 0
+    for name, before, after, change, regressed in compare_results(baseline, current, args.threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else "ok"
+        print(f"{name:<26} {before:>14,.2f} -> {after:>14,.2f} {change:+7.1%}  {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
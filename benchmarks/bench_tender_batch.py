@@ -0,0 +1,92 @@
+"""Memory held by parsed tenders: a list of ``TenderRaw`` against a columnar ``TenderBatch``.
+
+    python -m benchmarks.bench_tender_batch --entries 100000
+
+Each layout is built in a fresh process from synthetic feed pages. The RSS
+growth is measured after a full collection, and the upsert rate of each
+layout is reported alongside.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import gc
+import multiprocessing
+from pathlib import Path
+import tempfile
+import time
+from typing import Tuple
+
+from app.capture.models import TenderRaw
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.storage import RawTenderRepository
+from app.capture.tender_batch import TenderBatch
+from benchmarks.feed_generator import atom_feed
+
+PAGE_SIZE = 1000
+LAYOUTS = ("records", "batch")
+
+
+def _rss_mb() -> float:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    raise RuntimeError("VmRSS is only available on Linux")
+
+
+def _build_in_child(
+    layout: str,
+    entries: int,
+    db_path: str,
+    queue: "multiprocessing.Queue[Tuple[float, float]]",
+) -> None:
+    client = PlacspClient(PlacspClientConfig(source_url="file:///dev/null"))
+    gc.collect()
+    before = _rss_mb()
+    held: object
+    if layout == "batch":
+        held = batch = TenderBatch()
+        for page in range(0, entries, PAGE_SIZE):
+            batch.extend(client._parse_page(atom_feed(min(PAGE_SIZE, entries - page), seed=page)))
+    else:
+        held = records = []  # type: list[TenderRaw]
+        for page in range(0, entries, PAGE_SIZE):
+            records.extend(client._parse_page(atom_feed(min(PAGE_SIZE, entries - page), seed=page)))
+    gc.collect()
+    grown = _rss_mb() - before
+
+    repository = RawTenderRepository(Path(db_path))
+    started = time.perf_counter()
+    repository.upsert_many(held, datetime(2026, 3, 1, tzinfo=timezone.utc))  # type: ignore[arg-type]
+    queue.put((grown, entries / (time.perf_counter() - started)))
+
+
+def measure(layout: str, entries: int) -> Tuple[float, float]:
+    """RSS growth (MB) of holding ``entries`` tenders and their upsert rate (entries/s)."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        process = context.Process(target=_build_in_child, args=(layout, entries, f"{tmpdir}/bench.db", queue))
+        process.start()
+        result = queue.get()
+        process.join()
+    if process.exitcode:
+        raise RuntimeError(f"{layout} benchmark process failed with exit code {process.exitcode}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000, help="Synthetic tenders held in memory")
+    args = parser.parse_args()
+
+    results = {layout: measure(layout, args.entries) for layout in LAYOUTS}
+    per_100k = 100_000 / args.entries
+    for layout, (grown, rate) in results.items():
+        print(f"{layout:<8} {grown * per_100k:>8.1f} MB per 100k tenders   upsert {rate:>10,.0f} entries/s")
+    records, batch = results["records"][0], results["batch"][0]
+    print(f"TenderBatch holds {batch / records:.0%} of the memory of the TenderRaw list")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Deterministic synthetic PLACSP feeds (CODICE Atom and the local JSON format) for benchmarks."""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import json
+from pathlib import Path
+import random
+from typing import BinaryIO, Dict, Iterator, List
+from xml.sax.saxutils import escape
+
+ATOM = "http://www.w3.org/2005/Atom"
+CBC = "urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2"
+CAC = "urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2"
+CBC_PLACE = "urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonBasicComponents-2"
+CAC_PLACE = "urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonAggregateComponents-2"
+
+FEED_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<feed xmlns="{ATOM}" xmlns:cbc="{CBC}" xmlns:cac="{CAC}" '
+    f'xmlns:cbc-place-ext="{CBC_PLACE}" xmlns:cac-place-ext="{CAC_PLACE}">\n'
+    "<id>https://contrataciondelestado.es/sindicacion/sindicacion_643/licitacionesPerfilesContratanteCompleto.xml</id>\n"
+    "<title>Licitaciones publicadas en la Plataforma de Contratación del Sector Público</title>\n"
+    "<updated>{updated}</updated>\n"
+)
+FEED_FOOTER = "</feed>\n"
+
+SUBJECTS = (
+    "Servicio de comunicación y difusión de la campaña",
+    "Diseño y producción de materiales gráficos para",
+    "Organización del evento institucional de",
+    "Obras de pavimentación y mejora de la accesibilidad en",
+    "Suministro de material de oficina para",
+    "Mantenimiento de instalaciones deportivas de",
+    "Servicio de limpieza de edificios municipales de",
+    "Plan de medios y publicidad institucional de",
+)
+PLACES = (
+    "Madrid", "Alcobendas", "Getafe", "Móstoles", "Leganés", "Alcalá de Henares",
+    "Fuenlabrada", "Sevilla", "Valencia", "Zaragoza", "Bilbao", "Valladolid",
+)
+BUYER_KINDS = ("Ayuntamiento de", "Consejería de Cultura de", "Diputación Provincial de", "Consorcio de Transportes de")
+NUTS = ("ES300", "ES300", "ES300", "ES511", "ES523", "ES618", "ES213", "ES243", "ES418")
+CPV = (
+    "79341000", "79341400", "79342000", "79416000", "79822500", "79952000",
+    "45233140", "30192000", "50700000", "90911200", "92111200", "72413000",
+)
+
+
+def iter_items(entries: int, seed: int = 0, max_lots: int = 4) -> Iterator[Dict[str, object]]:
+    """Yield ``entries`` tender dicts; the same ``seed`` always yields the same feed."""
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc)
+    # A few thousand distinct buyers, like the real feed.
+    buyers = [f"{kind} {place} {index or ''}".strip() for index in range(250) for kind in BUYER_KINDS for place in PLACES[:3]]
+    for index in range(entries):
+        published = base + timedelta(seconds=index * 37 + rng.randrange(30))
+        lots = rng.randint(1, max_lots)
+        cpv_codes = rng.sample(CPV, min(lots, len(CPV)))
+        yield {
+            "external_id": f"https://contrataciondelestado.es/sindicacion/licitacionesPerfilContratante/{10_000_000 + index}",
+            "folder_id": f"EXP/{2026}/{index:07d}",
+            "title": f"{rng.choice(SUBJECTS)} {rng.choice(PLACES)} {published.year}",
+            "summary": f"Id licitación: EXP/2026/{index:07d}; Órgano de Contratación: {rng.choice(buyers)}",
+            "link": f"https://contrataciondelestado.es/wps/poc?uri=deeplink:detalle_licitacion&idEvl={index:x}",
+            "published_at": published,
+            # Deadlines fall on a handful of dates, as in the real feed.
+            "deadline_at": (published + timedelta(days=rng.choice((10, 15, 20, 30)))).date(),
+            "buyer_name": rng.choice(buyers),
+            "region": rng.choice(NUTS),
+            "cpv_codes": cpv_codes,
+            "budget_amount": round(rng.uniform(3_000, 2_500_000), 2),
+            "lots": lots,
+        }
+
+
+def spanish_amount(value: float) -> str:
+    """``1234567.5`` → ``"1.234.567,50"``."""
+    return f"{value:,.2f}".replace(",", "\x00").replace(".", ",").replace("\x00", ".")
+
+
+def atom_entry(item: Dict[str, object], spanish_amounts: bool = True) -> str:
+    published = item["published_at"].isoformat(timespec="milliseconds")
+    amount = item["budget_amount"]
+    total = spanish_amount(amount) if spanish_amounts else f"{amount:.2f}"
+    lots: List[str] = []
+    for lot, code in enumerate(item["cpv_codes"], start=1):
+        lots.append(
+            "<cac:ProcurementProjectLot>"
+            f"<cbc:ID schemeName=\"ID_LOTE\">{lot}</cbc:ID>"
+            "<cac:ProcurementProject>"
+            f"<cbc:Name>Lote {lot}</cbc:Name>"
+            "<cac:BudgetAmount>"
+            f"<cbc:TaxExclusiveAmount currencyID=\"EUR\">{amount / len(item['cpv_codes']):.2f}</cbc:TaxExclusiveAmount>"
+            "</cac:BudgetAmount>"
+            f"<cac:RequiredCommodityClassification><cbc:ItemClassificationCode listURI=\"CPV2008\">{code}</cbc:ItemClassificationCode></cac:RequiredCommodityClassification>"
+            "</cac:ProcurementProject>"
+            "</cac:ProcurementProjectLot>"
+        )
+    return (
+        "<entry>"
+        f"<id>{escape(item['external_id'])}</id>"
+        f"<link href=\"{escape(item['link'])}\"/>"
+        f"<summary type=\"text\">{escape(item['summary'])}</summary>"
+        f"<title>{escape(item['title'])}</title>"
+        f"<updated>{published}</updated>"
+        "<cac-place-ext:ContractFolderStatus>"
+        f"<cbc:ContractFolderID>{item['folder_id']}</cbc:ContractFolderID>"
+        "<cbc-place-ext:ContractFolderStatusCode>PUB</cbc-place-ext:ContractFolderStatusCode>"
+        "<cac-place-ext:LocatedContractingParty>"
+        "<cbc:ContractingPartyTypeCode>3</cbc:ContractingPartyTypeCode>"
+        "<cac:Party>"
+        f"<cac:PartyName><cbc:Name>{escape(item['buyer_name'])}</cbc:Name></cac:PartyName>"
+        "<cac:PostalAddress><cbc:CityName>Madrid</cbc:CityName></cac:PostalAddress>"
+        "</cac:Party>"
+        "</cac-place-ext:LocatedContractingParty>"
+        "<cac:ProcurementProject>"
+        f"<cbc:Name>{escape(item['title'])}</cbc:Name>"
+        "<cbc:TypeCode>2</cbc:TypeCode>"
+        "<cac:BudgetAmount>"
+        f"<cbc:TotalAmount currencyID=\"EUR\">{total}</cbc:TotalAmount>"
+        "</cac:BudgetAmount>"
+        f"<cac:RequiredCommodityClassification><cbc:ItemClassificationCode listURI=\"CPV2008\">{item['cpv_codes'][0]}</cbc:ItemClassificationCode></cac:RequiredCommodityClassification>"
+        f"<cac:RealizedLocation><cbc:CountrySubentityCode listURI=\"NUTS\">{item['region']}</cbc:CountrySubentityCode>"
+        f"<cbc:NUTSCode>{item['region']}</cbc:NUTSCode></cac:RealizedLocation>"
+        "</cac:ProcurementProject>"
+        f"{''.join(lots)}"
+        "<cac:TenderingProcess>"
+        "<cbc:ProcedureCode>1</cbc:ProcedureCode>"
+        f"<cac:TenderSubmissionDeadlinePeriod><cbc:EndDate>{item['deadline_at'].isoformat()}</cbc:EndDate>"
+        "<cbc:EndTime>14:00:00</cbc:EndTime></cac:TenderSubmissionDeadlinePeriod>"
+        "</cac:TenderingProcess>"
+        "</cac-place-ext:ContractFolderStatus>"
+        "</entry>\n"
+    )
+
+
+def write_atom_feed(handle: BinaryIO, entries: int, seed: int = 0, max_lots: int = 4) -> int:
+    """Stream a single-page Atom feed to ``handle``; returns the bytes written."""
+    written = handle.write(FEED_HEADER.format(updated="2026-03-01T00:00:00.000+01:00").encode("utf-8"))
+    for item in iter_items(entries, seed, max_lots):
+        written += handle.write(atom_entry(item).encode("utf-8"))
+    return written + handle.write(FEED_FOOTER.encode("utf-8"))
+
+
+def atom_feed(entries: int, seed: int = 0, max_lots: int = 4) -> bytes:
+    return (
+        FEED_HEADER.format(updated="2026-03-01T00:00:00.000+01:00")
+        + "".join(atom_entry(item) for item in iter_items(entries, seed, max_lots))
+        + FEED_FOOTER
+    ).encode("utf-8")
+
+
+def json_feed(entries: int, seed: int = 0, max_lots: int = 4) -> bytes:
+    items = [
+        {
+            "external_id": item["external_id"],
+            "title": item["title"],
+            "summary": item["summary"],
+            "link": item["link"],
+            "published_at": item["published_at"].isoformat(),
+            "deadline_at": item["deadline_at"].isoformat(),
+            "buyer_name": item["buyer_name"],
+            "region": item["region"],
+            "cpv": item["cpv_codes"][0],
+            "cpv_codes": item["cpv_codes"],
+            "budget_amount": spanish_amount(item["budget_amount"]),
+        }
+        for item in iter_items(entries, seed, max_lots)
+    ]
+    return json.dumps({"items": items}, ensure_ascii=False).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", type=Path, help="File to write")
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-lots", type=int, default=4, help="Lots (and CPVs) per entry, drawn from 1..N")
+    parser.add_argument("--format", choices=("atom", "json"), default="atom")
+    args = parser.parse_args()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("wb") as handle:
+        if args.format == "atom":
+            size = write_atom_feed(handle, args.entries, args.seed, args.max_lots)
+        else:
+            size = handle.write(json_feed(args.entries, args.seed, args.max_lots))
+    print(f"{args.entries:,} entries, {size / 1e6:,.1f} MB -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import csv
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import openpyxl  # noqa: F401
+    import pandas as pd
+
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+
+def _workbook(folder: Path, day: str, rows: list) -> None:
+    frame = pd.DataFrame(
+        rows,
+        columns=["PlazoPresentacionFecha", "OrganismoConvocante", "InformacionWeb", "Presupuesto", "Objeto"],
+    )
+    frame.to_excel(folder / f"{day}_Licitaciones.xlsx", sheet_name="Licitaciones", index=False)
+
+
+def _read_csv(path: Path) -> list:
+    with path.open(encoding="utf-8-sig", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas and openpyxl are not installed")
+class MergeLicitacionesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.folder = Path(self._tmpdir.name)
+        self.output = self.folder / "licitaciones_fusionadas.csv"
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _merge(self) -> int:
+        from archivo.merge_licitaciones import main
+
+        return main(["--source-folder", str(self.folder), "--workers", "1"])
+
+    def test_new_workbooks_are_appended_and_recorded(self) -> None:
+        _workbook(self.folder, "20251103", [["05/11/2025", "Ayuntamiento", "https://a", 1000, "Limpieza"]])
+        self.assertEqual(self._merge(), 0)
+        _workbook(self.folder, "20251104", [["2025-11-20", "Diputación", "https://b", 2000, "Jardinería"]])
+        self.assertEqual(self._merge(), 0)
+
+        rows = _read_csv(self.output)
+        manifest = json.loads((self.folder / "merge_manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual([row["SourceFile"] for row in rows], ["20251103_Licitaciones.xlsx", "20251104_Licitaciones.xlsx"])
+        self.assertEqual([row["PlazoPresentacionFecha"] for row in rows], ["2025-11-05", "2025-11-20"])
+        self.assertEqual(manifest["Licitaciones"]["rows"], 2)
+        self.assertEqual(set(manifest["Licitaciones"]["files"]), {"20251103_Licitaciones.xlsx", "20251104_Licitaciones.xlsx"})
+        self.assertEqual(list(self.folder.glob("*.tmp")), [])
+
+    def test_csv_not_matching_the_manifest_is_rebuilt(self) -> None:
+        _workbook(self.folder, "20251103", [["05/11/2025", "Ayuntamiento", "https://a", 1000, "Limpieza"]])
+        self._merge()
+        # As if a run had appended to the CSV and died before saving the manifest.
+        with self.output.open("a", encoding="utf-8") as handle:
+            handle.write("20251104_Licitaciones.xlsx,2025-11-20,Diputación,https://b,2000,Jardinería\n")
+        _workbook(self.folder, "20251104", [["2025-11-20", "Diputación", "https://b", 2000, "Jardinería"]])
+
+        self._merge()
+
+        self.assertEqual(len(_read_csv(self.output)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Mapping, Tuple
+
+from app.audit.documents import DocumentFetchConfig, DocumentFetcher
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.storage import RawTenderRepository
+from app.filtering.cpv_matcher import CpvMatcher
+from app.filtering.hard_filter import HardFilter, HardFilterConfig
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+REMOTE = "https://pliegos.test/"
+
+ENTRY_WITH_DOCUMENTS = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:cac="urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2"
+      xmlns:cbc="urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2"
+      xmlns:cac-place-ext="urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonAggregateComponents-2">
+  <entry>
+    <id>exp-1</id>
+    <title>Servicio de comunicación</title>
+    <updated>2026-01-05T10:00:00Z</updated>
+    <cac-place-ext:ContractFolderStatus>
+      <cac:LegalDocumentReference>
+        <cbc:ID>PCAP.pdf</cbc:ID>
+        <cac:Attachment><cac:ExternalReference>
+          <cbc:URI>https://contrataciondelestado.es/wps/wcm/connect/pcap.pdf</cbc:URI>
+        </cac:ExternalReference></cac:Attachment>
+      </cac:LegalDocumentReference>
+      <cac:TechnicalDocumentReference>
+        <cbc:ID>PPT.pdf</cbc:ID>
+        <cac:Attachment><cac:ExternalReference>
+          <cbc:URI>https://contrataciondelestado.es/wps/wcm/connect/ppt.pdf</cbc:URI>
+        </cac:ExternalReference></cac:Attachment>
+      </cac:TechnicalDocumentReference>
+    </cac-place-ext:ContractFolderStatus>
+  </entry>
+</feed>
+"""
+
+
+def _tender(external_id: str, document_urls: List[str], region: str = "ES300") -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title="Contrato",
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 1, 20, tzinfo=timezone.utc),
+        buyer_name="",
+        region=region,
+        cpv="79341000-7",
+        budget_amount=50000.0,
+        document_urls=document_urls,
+    )
+
+
+class DocumentUriCaptureTests(unittest.TestCase):
+    def test_document_reference_uris_are_captured_and_stored(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url="file:///dev/null"))
+        tender = client._parse_atom(ENTRY_WITH_DOCUMENTS)[0]
+
+        self.assertEqual(
+            tender.document_urls,
+            [
+                "https://contrataciondelestado.es/wps/wcm/connect/pcap.pdf",
+                "https://contrataciondelestado.es/wps/wcm/connect/ppt.pdf",
+            ],
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            database = Database(db_path)
+            RawTenderRepository(db_path, database=database).upsert_many([tender], NOW)
+            with database.connection() as conn:
+                stored = conn.execute("SELECT document_urls FROM tenders_raw").fetchone()[0]
+            database.close()
+        self.assertEqual(json.loads(stored), tender.document_urls)
+
+
+class DocumentFetcherTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+        self.db_path = self.tmp / "capture.db"
+        self.database = Database(self.db_path)
+        self.repo = RawTenderRepository(self.db_path, database=self.database)
+        self.hard_filter = HardFilter(
+            self.db_path,
+            HardFilterConfig(cpv_matcher=CpvMatcher(["79340000"])),
+            database=self.database,
+        )
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _file_url(self, name: str, content: bytes) -> str:
+        path = self.tmp / "remote" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(content)
+        return REMOTE + name
+
+    @contextmanager
+    def _open_remote(self, url: str) -> Iterator[Tuple[BinaryIO, Mapping[str, str]]]:
+        with (self.tmp / "remote" / url.removeprefix(REMOTE)).open("rb") as handle:
+            yield handle, {}
+
+    def _fetcher(self, max_cache_bytes: int = 10_000) -> DocumentFetcher:
+        config = DocumentFetchConfig(cache_dir=self.tmp / "cache", max_cache_bytes=max_cache_bytes, workers=2)
+        return DocumentFetcher(self.db_path, config, database=self.database, opener=self._open_remote)
+
+    def test_only_passing_tenders_are_fetched_and_identical_pliegos_stored_once(self) -> None:
+        pliego = self._file_url("lote1_pcap.pdf", b"%PDF pliego comun" * 10)
+        mirror = self._file_url("lote2_pcap.pdf", b"%PDF pliego comun" * 10)
+        annex = self._file_url("anexo.pdf", b"%PDF anexo")
+        elsewhere = self._file_url("otra_region.pdf", b"%PDF otra region")
+        missing = REMOTE + "missing.pdf"
+        self.repo.upsert_many(
+            [
+                _tender("lote-1", [pliego, annex]),
+                _tender("lote-2", [mirror, missing]),
+                _tender("fuera", [elsewhere], region="ES511"),
+            ],
+            NOW,
+        )
+        self.hard_filter.run(now=NOW)
+        fetcher = self._fetcher()
+
+        result = fetcher.run()
+        again = fetcher.run()
+
+        self.assertEqual((result.linked, result.downloaded, result.reused, result.failed), (4, 2, 1, 1))
+        self.assertEqual((again.linked, again.downloaded, again.reused, again.failed), (0, 0, 0, 1))
+        stored = sorted(path.name for path in (self.tmp / "cache").glob("??/*"))
+        self.assertEqual(len(stored), 2)
+        self.assertEqual(fetcher.path_for(pliego), fetcher.path_for(mirror))
+        self.assertEqual(fetcher.path_for(annex).read_bytes(), b"%PDF anexo")
+        with self.database.connection() as conn:
+            fetched_urls = {row[0] for row in conn.execute("SELECT url FROM document_fetches")}
+        self.assertNotIn(elsewhere, fetched_urls)
+
+    def test_least_recently_used_pliegos_are_evicted_and_refetched_on_demand(self) -> None:
+        urls = [self._file_url(f"pliego{index}.pdf", bytes([index]) * 400) for index in range(3)]
+        self.repo.upsert_many([_tender(f"exp-{index}", [url]) for index, url in enumerate(urls)], NOW)
+        self.hard_filter.run(now=NOW)
+        fetcher = self._fetcher(max_cache_bytes=1000)
+
+        result = fetcher.run()
+
+        self.assertEqual((result.downloaded, result.evicted, result.evicted_bytes), (3, 1, 400))
+        blobs = [path.read_bytes()[:1] for path in (self.tmp / "cache").glob("??/*")]
+        self.assertEqual(len(blobs), 2)
+        evicted_url = next(url for url, index in zip(urls, range(3)) if bytes([index]) not in blobs)
+        path = fetcher.path_for(evicted_url)
+        self.assertIsNotNone(path)
+        self.assertEqual(len(path.read_bytes()), 400)
+
+
+    def test_failed_refetch_keeps_the_known_hash(self) -> None:
+        url = self._file_url("pliego.pdf", b"%PDF pliego")
+        self.repo.upsert_many([_tender("exp-1", [url])], NOW)
+        self.hard_filter.run(now=NOW)
+        fetcher = self._fetcher()
+        fetcher.run()
+        fetcher.config.max_cache_bytes = 0
+        fetcher.evict()
+        (self.tmp / "remote" / "pliego.pdf").unlink()
+
+        path = fetcher.path_for(url)
+
+        self.assertIsNone(path)
+        with self.database.connection() as conn:
+            sha256, size, attempts, error = conn.execute(
+                "SELECT sha256, size, attempts, error FROM document_fetches WHERE url = ?", (url,)
+            ).fetchone()
+        self.assertEqual((len(sha256), size, attempts), (64, 11, 2))
+        self.assertIn("FileNotFoundError", error)
+
+    def test_non_http_document_urls_are_refused(self) -> None:
+        local = self.tmp / "secret.txt"
+        local.write_bytes(b"not a pliego")
+        self.repo.upsert_many([_tender("exp-1", [f"file://{local}"])], NOW)
+        self.hard_filter.run(now=NOW)
+
+        result = self._fetcher().run()
+
+        self.assertEqual((result.downloaded, result.failed), (0, 1))
+        with self.database.connection() as conn:
+            error = conn.execute("SELECT error FROM document_fetches").fetchone()[0]
+        self.assertIn("non-HTTP", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable, ContextManager, Iterator, List, Mapping, Tuple
+
+from app.audit.documents import DocumentFetchConfig, DocumentFetcher
+from app.audit.extraction import normalize_document_text, split_sections
+from app.audit.pliego_index import PliegoIndex
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.storage import RawTenderRepository
+from app.filtering.cpv_matcher import CpvMatcher
+from app.filtering.hard_filter import HardFilter, HardFilterConfig
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+REMOTE = "https://pliegos.test/"
+
+PCAP_PARAGRAPHS = [
+    "PLIEGO DE CLÁUSULAS ADMINISTRATIVAS PARTICULARES",
+    "CLÁUSULA 1. Objeto del contrato",
+    "Servicio de comunicación institucional y publicidad.",
+    "CLÁUSULA 2. Presupuesto base de licitación",
+    "El presupuesto base de licitación asciende a 120.000 euros, IVA excluido.",
+    "CLÁUSULA 3. Solvencia económica y técnica",
+    "Volumen anual de negocios igual o superior a 180.000 euros.",
+    "CLÁUSULA 4. Criterios de adjudicación",
+    "Oferta económica: hasta 60 puntos. Calidad de la propuesta creativa: hasta 40 puntos.",
+]
+
+
+def _docx(paragraphs: List[str]) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    path = Path(tempfile.mktemp(suffix=".docx"))
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", document)
+    data = path.read_bytes()
+    path.unlink()
+    return data
+
+
+def _opener(folder: Path) -> Callable[[str], ContextManager[Tuple[BinaryIO, Mapping[str, str]]]]:
+    """Serve ``REMOTE`` URLs from ``folder`` instead of the network."""
+
+    @contextmanager
+    def open_remote(url: str) -> Iterator[Tuple[BinaryIO, Mapping[str, str]]]:
+        with (folder / url.removeprefix(REMOTE)).open("rb") as handle:
+            yield handle, {}
+
+    return open_remote
+
+
+def _tender(external_id: str, document_urls: List[str]) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title="Contrato",
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 1, 20, tzinfo=timezone.utc),
+        buyer_name="",
+        region="ES300",
+        cpv="79341000-7",
+        budget_amount=120000.0,
+        document_urls=document_urls,
+    )
+
+
+class SplitSectionsTests(unittest.TestCase):
+    def test_headings_start_sections_and_name_their_clause_kind(self) -> None:
+        text = normalize_document_text(
+            "CLÁUSULA 4. CRITERIOS DE ADJUDICACIÓN\n4.1 Criterios evaluables mediante fórmulas\n"
+            "Precio: 60 puntos, valorados\nproporcionalmente.\n3 meses de plazo no es un título.\n"
+            "2. Presupuesto base de licitación\nEl importe es 120.000 euros, IVA exclui-\ndo."
+        )
+
+        chunks = split_sections(text)
+
+        self.assertEqual(
+            [(chunk.heading, chunk.kind) for chunk in chunks],
+            [
+                ("CLÁUSULA 4. CRITERIOS DE ADJUDICACIÓN", "criterios_adjudicacion"),
+                ("4.1 Criterios evaluables mediante fórmulas", ""),
+                ("2. Presupuesto base de licitación", "presupuesto"),
+            ],
+        )
+        self.assertIn("3 meses de plazo", chunks[1].text)
+        self.assertTrue(chunks[2].text.endswith("IVA excluido."))
+
+    def test_long_sections_are_cut_into_bounded_chunks(self) -> None:
+        text = "CLÁUSULA 1. Objeto\n" + "\n".join(f"Línea {index} del objeto del contrato." for index in range(200))
+
+        chunks = split_sections(text, max_chars=500)
+
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk.text) <= 500 for chunk in chunks))
+        self.assertEqual({chunk.heading for chunk in chunks}, {"CLÁUSULA 1. Objeto"})
+
+
+class PliegoIndexTests(unittest.TestCase):
+    def test_documents_are_extracted_once_per_hash_and_clauses_are_indexed_lookups(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            remote = tmp / "remote"
+            remote.mkdir()
+            pcap = _docx(PCAP_PARAGRAPHS)
+            for name, content in (
+                ("lote1_pcap.docx", pcap),
+                ("lote2_pcap.docx", pcap),
+                ("anuncio.html", "<html><body><h1>Anuncio</h1><p>Plazo de ejecución: 12 meses.</p></body></html>".encode()),
+                ("plano.dwg", b"AC1027\x00\x00binary"),
+            ):
+                (remote / name).write_bytes(content)
+            db_path = tmp / "capture.db"
+            database = Database(db_path)
+            RawTenderRepository(db_path, database=database).upsert_many(
+                [
+                    _tender("lote-1", [REMOTE + "lote1_pcap.docx", REMOTE + "anuncio.html"]),
+                    _tender("lote-2", [REMOTE + "lote2_pcap.docx", REMOTE + "plano.dwg"]),
+                ],
+                NOW,
+            )
+            HardFilter(db_path, HardFilterConfig(cpv_matcher=CpvMatcher(["79340000"])), database=database).run(now=NOW)
+            cache_dir = tmp / "cache"
+            fetcher = DocumentFetcher(
+                db_path, DocumentFetchConfig(cache_dir=cache_dir), database=database, opener=_opener(remote)
+            )
+            fetcher.run()
+            index = PliegoIndex(db_path, cache_dir=cache_dir, database=database)
+
+            first = index.run(workers=2)
+            second = index.run(workers=2)
+            with database.connection() as conn:
+                lote2 = conn.execute("SELECT id FROM tenders_raw WHERE external_id = 'lote-2'").fetchone()[0]
+            criteria = index.clauses(lote2, "criterios_adjudicacion")
+            solvency = index.search("volumen anual de negocios", tender_id=lote2)
+            elsewhere = index.search("plazo de ejecución", tender_id=lote2)
+            everywhere = index.search("plazo de ejecución")
+            database.close()
+
+        # Two lots share one PCAP: three distinct files, one of them without an extractor.
+        self.assertEqual((first.extracted, first.failed), (2, 1))
+        self.assertEqual((second.extracted, second.failed), (0, 0))
+        self.assertEqual(len(criteria), 1)
+        self.assertIn("60 puntos", criteria[0].text)
+        self.assertEqual(solvency[0].kind, "solvencia")
+        self.assertIn("[volumen]", solvency[0].snippet.lower())
+        self.assertEqual(elsewhere, [])
+        self.assertEqual(len(everywhere), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import unittest
+
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from benchmarks.bench_pipeline import compare_results
+from benchmarks.feed_generator import atom_feed, json_feed, spanish_amount
+
+
+class FeedGeneratorTests(unittest.TestCase):
+    def test_atom_and_json_feeds_parse_to_the_same_tenders(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url="file:///dev/null"))
+
+        from_atom = client._parse_atom(atom_feed(50, seed=7).decode("utf-8"))
+        from_json = client._parse_json(json_feed(50, seed=7).decode("utf-8"))
+
+        self.assertEqual(atom_feed(50, seed=7), atom_feed(50, seed=7))
+        self.assertEqual(len(from_atom), 50)
+        self.assertTrue(any(len(tender.cpv_codes) > 1 for tender in from_atom))
+        for atom, json in zip(from_atom, from_json):
+            self.assertEqual(
+                (atom.external_id, atom.published_at, atom.deadline_at, atom.region, atom.cpv_codes, atom.budget_amount),
+                (json.external_id, json.published_at, json.deadline_at, json.region, json.cpv_codes, json.budget_amount),
+            )
+        self.assertEqual(spanish_amount(1234567.5), "1.234.567,50")
+
+
+class CompareResultsTests(unittest.TestCase):
+    def test_regressions_respect_metric_direction(self) -> None:
+        baseline = {"metrics": {"upsert_entries_per_s": 1000.0, "capture_wall_s": 10.0, "capture_peak_rss_mb": 100.0}}
+        current = {"metrics": {"upsert_entries_per_s": 800.0, "capture_wall_s": 8.0, "capture_peak_rss_mb": 110.0}}
+
+        flagged = {name: regressed for name, _, _, _, regressed in compare_results(baseline, current, threshold=0.15)}
+
+        self.assertEqual(flagged, {"upsert_entries_per_s": True, "capture_wall_s": False, "capture_peak_rss_mb": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
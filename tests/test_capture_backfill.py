@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from app.capture.backfill import ArchiveBackfill, BackfillConfig, iter_months
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+
+
+def _atom(entry_ids: list[str]) -> str:
+    entries = "".join(
+        f"<entry><id>{entry_id}</id><title>{entry_id}</title><updated>2023-01-15T09:00:00Z</updated></entry>"
+        for entry_id in entry_ids
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+
+class ArchiveBackfillTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.folder = Path(self._tmpdir.name)
+        with zipfile.ZipFile(self.folder / "bundle_202301.zip", "w") as archive:
+            archive.writestr("bundle_202301_1.atom", _atom(["a1", "a2"]))
+            archive.writestr("bundle_202301_2.atom", _atom(["b1"]))
+            archive.writestr("readme.txt", "not a feed")
+        with zipfile.ZipFile(self.folder / "bundle_202302.zip", "w") as archive:
+            archive.writestr("bundle_202302_1.atom", _atom(["c1", "a1"]))
+        self.db_path = self.folder / "capture.db"
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _backfill(self) -> ArchiveBackfill:
+        return ArchiveBackfill(
+            BackfillConfig(archive_source=str(self.folder), archive_prefix="bundle", workers=2),
+            repository=RawTenderRepository(self.db_path),
+            state_store=StateStore(self.db_path),
+        )
+
+    def test_iter_months_crosses_year_boundary(self) -> None:
+        self.assertEqual(list(iter_months("2023-11", "2024-02")), [(2023, 11), (2023, 12), (2024, 1), (2024, 2)])
+
+    def test_backfill_loads_archives_and_skips_missing_months(self) -> None:
+        result = self._backfill().run("2023-01", "2023-03")
+
+        self.assertEqual(result.archives, 2)
+        self.assertEqual(result.members, 3)
+        self.assertEqual(result.fetched, 5)
+        self.assertEqual(result.inserted, 4)
+        with sqlite3.connect(self.db_path) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+        self.assertEqual(total, 4)
+
+    def test_backfill_resumes_from_member_checkpoints(self) -> None:
+        StateStore(self.db_path).mark_backfill_member_completed("bundle_202301.zip", "bundle_202301_1.atom")
+
+        first = self._backfill().run("2023-01", "2023-01")
+        second = self._backfill().run("2023-01", "2023-01")
+
+        self.assertEqual((first.members, first.skipped_members, first.inserted), (1, 1, 1))
+        self.assertEqual((second.archives, second.members), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
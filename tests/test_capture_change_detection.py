@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.storage import RawTenderRepository
+
+
+def _tender(external_id: str, budget: float = 50000.0) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title=f"Contrato {external_id}",
+        summary="Resumen",
+        link=f"https://example.org/{external_id}",
+        published_at=datetime(2026, 1, 1, 9, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 2, 1, 12, tzinfo=timezone.utc),
+        buyer_name="Ayuntamiento",
+        region="ES300",
+        cpv="79341000",
+        budget_amount=budget,
+    )
+
+
+class CaptureChangeDetectionTests(unittest.TestCase):
+    def test_republished_changes_update_row_and_keep_history(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            repo = RawTenderRepository(db_path, database=Database(db_path))
+            first_run = datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+            second_run = datetime(2026, 1, 2, 10, tzinfo=timezone.utc)
+
+            first = repo.upsert_many([_tender("a"), _tender("b")], first_run)
+            republished = replace(_tender("a", budget=65000.0), published_at=second_run)
+            second = repo.upsert_many([republished, _tender("b"), _tender("c")], second_run)
+
+            self.assertEqual((first.inserted, first.updated, first.unchanged), (2, 0, 0))
+            self.assertEqual((second.inserted, second.updated, second.unchanged), (1, 1, 1))
+            with repo.database.connection() as conn:
+                budget, created_at, updated_at = conn.execute(
+                    "SELECT budget_amount, created_at, updated_at FROM tenders_raw WHERE external_id = 'a'"
+                ).fetchone()
+                history = conn.execute(
+                    "SELECT external_id, budget_amount, superseded_at FROM tenders_raw_history"
+                ).fetchall()
+            self.assertEqual(budget, 65000.0)
+            self.assertEqual(created_at, first_run.isoformat())
+            self.assertEqual(updated_at, second_run.isoformat())
+            self.assertEqual(history, [("a", 50000.0, second_run.isoformat())])
+
+    def test_publication_timestamp_alone_is_not_a_change(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            repo = RawTenderRepository(db_path, database=Database(db_path))
+            run_at = datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+
+            repo.upsert_many([_tender("a")], run_at)
+            again = repo.upsert_many([replace(_tender("a"), published_at=run_at)], run_at)
+
+            self.assertEqual((again.inserted, again.updated, again.unchanged), (0, 0, 1))
+
+    def test_lot_cpvs_of_a_tender_without_main_cpv_are_change_detected(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            repo = RawTenderRepository(db_path, database=Database(db_path))
+            run_at = datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+
+            repo.upsert_many([replace(_tender("a"), cpv="", cpv_codes=["45000000"])], run_at)
+            again = repo.upsert_many([replace(_tender("a"), cpv="", cpv_codes=["72000000"])], run_at)
+
+            self.assertEqual((again.inserted, again.updated, again.unchanged), (0, 1, 0))
+            with repo.database.connection() as conn:
+                stored = conn.execute("SELECT cpv_codes FROM tenders_raw WHERE external_id = 'a'").fetchone()[0]
+            self.assertEqual(stored, "72000000")
+
+    def test_legacy_table_gets_hashes_without_spurious_updates(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE tenders_raw (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        external_id TEXT NOT NULL, title TEXT NOT NULL, summary TEXT NOT NULL,
+                        link TEXT NOT NULL, published_at TEXT NOT NULL, deadline_at TEXT,
+                        buyer_name TEXT NOT NULL, region TEXT NOT NULL, cpv TEXT NOT NULL,
+                        budget_amount REAL, source TEXT NOT NULL, created_at TEXT NOT NULL,
+                        UNIQUE (external_id, source)
+                    )
+                    """
+                )
+                tender = _tender("a")
+                conn.execute(
+                    "INSERT INTO tenders_raw VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        tender.external_id,
+                        tender.title,
+                        tender.summary,
+                        tender.link,
+                        tender.published_at.isoformat(),
+                        tender.deadline_at.isoformat(),
+                        tender.buyer_name,
+                        tender.region,
+                        tender.cpv,
+                        tender.budget_amount,
+                        tender.source,
+                        "2025-12-31T00:00:00+00:00",
+                    ),
+                )
+
+            repo = RawTenderRepository(db_path, database=Database(db_path))
+            result = repo.upsert_many([_tender("a")], datetime(2026, 1, 3, tzinfo=timezone.utc))
+
+            self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
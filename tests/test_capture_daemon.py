@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import signal
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from app.capture.daemon import CaptureDaemon, PollSchedule
+from app.capture.database import Database
+from app.capture.metrics import RunLedger
+from app.capture.models import FeedValidators, TenderRaw
+from app.capture.placsp_client import PlacspClientConfig
+from app.capture.service import CaptureInterrupted, CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+
+# 2026-03-03 is a Tuesday; Madrid is UTC+1 in March.
+TUESDAY_MORNING = datetime(2026, 3, 3, 9, 0, tzinfo=timezone.utc)
+TUESDAY_NIGHT = datetime(2026, 3, 3, 22, 0, tzinfo=timezone.utc)
+SUNDAY_MORNING = datetime(2026, 3, 8, 9, 0, tzinfo=timezone.utc)
+
+
+class _StoppingClient:
+    """Yields ``count`` tenders and sets ``stop_event`` once ``stop_after`` have been yielded."""
+
+    def __init__(self, count: int, stop_event: threading.Event, stop_after: int) -> None:
+        self.config = PlacspClientConfig(source_url="file:///dev/null")
+        self.count = count
+        self.stop_event = stop_event
+        self.stop_after = stop_after
+
+    def iter_since(self, since: Optional[datetime], validators: Optional[FeedValidators] = None) -> Iterator[TenderRaw]:
+        for index in range(self.count):
+            if index == self.stop_after:
+                self.stop_event.set()
+            yield TenderRaw(
+                external_id=f"exp-{index}",
+                title=f"Contrato {index}",
+                summary="",
+                link="",
+                published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                deadline_at=None,
+                buyer_name="",
+                region="",
+                cpv="",
+                budget_amount=None,
+            )
+
+
+class PollScheduleTests(unittest.TestCase):
+    def test_interval_follows_activity_and_spanish_business_hours(self) -> None:
+        schedule = PollSchedule(jitter=0.0)
+
+        self.assertEqual(schedule.next_interval(TUESDAY_NIGHT, idle_polls=0), schedule.active_seconds)
+        self.assertEqual(
+            [schedule.next_interval(TUESDAY_MORNING, idle_polls) for idle_polls in (1, 2, 3, 10)],
+            [45.0, 67.5, 90.0, 90.0],
+        )
+        self.assertEqual(schedule.next_interval(TUESDAY_NIGHT, 1), schedule.off_hours_seconds)
+        self.assertEqual(schedule.next_interval(SUNDAY_MORNING, 1), schedule.off_hours_seconds)
+        self.assertEqual(schedule.next_interval(SUNDAY_MORNING, 20), schedule.max_off_hours_seconds)
+
+
+class CaptureDaemonTests(unittest.TestCase):
+    def test_failed_polls_are_logged_and_the_daemon_keeps_polling(self) -> None:
+        outcomes: List[object] = [3, RuntimeError("feed down"), 0, 2]
+
+        def poll() -> int:
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome  # type: ignore[return-value]
+
+        schedule = PollSchedule(active_seconds=0, business_seconds=0, off_hours_seconds=0)
+        with self.assertLogs("app.capture.daemon", level="ERROR"):
+            result = CaptureDaemon(poll, schedule, max_polls=4).run()
+
+        self.assertEqual((result.polls, result.failed_polls, result.changed), (4, 1, 5))
+
+    def test_sigterm_during_a_poll_stops_the_daemon_before_the_next_wait(self) -> None:
+        polls: List[int] = []
+
+        def poll() -> int:
+            polls.append(1)
+            os.kill(os.getpid(), signal.SIGTERM)
+            return 1
+
+        daemon = CaptureDaemon(poll, PollSchedule(active_seconds=60))
+        previous = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+        daemon.install_signal_handlers()
+        try:
+            result = daemon.run()
+        finally:
+            signal.signal(signal.SIGTERM, previous[0])
+            signal.signal(signal.SIGINT, previous[1])
+
+        self.assertEqual((len(polls), result.polls), (1, 1))
+
+
+class InterruptedCaptureTests(unittest.TestCase):
+    def test_stop_between_batches_keeps_written_rows_and_the_watermark(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            database = Database(db_path)
+            stop_event = threading.Event()
+            state_store = StateStore(db_path, database=database)
+            ledger = RunLedger(db_path, database=database)
+            service = CaptureService(
+                _StoppingClient(100, stop_event, stop_after=25),  # type: ignore[arg-type]
+                RawTenderRepository(db_path, database=database),
+                state_store,
+                batch_size=10,
+                ledger=ledger,
+                stop_event=stop_event,
+            )
+
+            with self.assertRaises(CaptureInterrupted):
+                service.run()
+            result = CaptureDaemon(service.run, stop_event=stop_event).run()
+            with database.connection() as conn:
+                stored = conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+            last_run = state_store.get_last_run_at()
+            statuses = [run.status for run in ledger.recent(5)]
+            database.close()
+
+        # The stop lands while the third batch is parsed; all three parsed batches are written.
+        self.assertEqual(stored, 30)
+        self.assertIsNone(last_run)
+        self.assertEqual(statuses, ["interrupted"])
+        self.assertEqual(result.polls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
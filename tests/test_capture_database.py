@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+
+
+def _tender(external_id: str) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title="Contrato",
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=None,
+        buyer_name="",
+        region="",
+        cpv="",
+        budget_amount=None,
+    )
+
+
+class CaptureDatabaseTests(unittest.TestCase):
+    def test_stores_share_one_wal_connection(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            repo = RawTenderRepository(db_path)
+            state = StateStore(db_path)
+
+            self.assertIs(repo.database, state.database)
+            with repo.database.connection() as conn:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+    def test_inserts_and_state_roll_back_together(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            database = Database(db_path)
+            repo = RawTenderRepository(db_path, batch_size=1, database=database)
+            state = StateStore(db_path, database=database)
+            run_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+            with self.assertRaises(RuntimeError):
+                with database.transaction():
+                    repo.upsert_many([_tender("a"), _tender("b")], run_at)
+                    state.set_last_run_at(run_at)
+                    raise RuntimeError("writer crashed")
+
+            self.assertIsNone(state.get_last_run_at())
+            database.close()
+            with sqlite3.connect(db_path) as conn:
+                total = conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+            self.assertEqual(total, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
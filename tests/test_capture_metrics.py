@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.metrics import NULL_METRICS, MetricsRecorder, RunLedger
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.service import CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+from benchmarks.feed_generator import atom_feed
+
+
+class CaptureMetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+        self.db_path = self.tmp / "capture.db"
+        self.database = Database(self.db_path)
+        self.textfile = self.tmp / "metrics" / "tenderloin.prom"
+        self.ledger = RunLedger(self.db_path, database=self.database, textfile_path=self.textfile)
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _service(self, source_url: str, metrics: MetricsRecorder) -> CaptureService:
+        return CaptureService(
+            PlacspClient(PlacspClientConfig(source_url=source_url), metrics=metrics),
+            RawTenderRepository(self.db_path, database=self.database),
+            StateStore(self.db_path, database=self.database),
+            batch_size=10,
+            metrics=metrics,
+            ledger=self.ledger,
+        )
+
+    def test_successful_run_is_recorded_with_stage_timings_and_counters(self) -> None:
+        feed = self.tmp / "feed.xml"
+        feed.write_bytes(atom_feed(25))
+
+        result = self._service(f"file://{feed}", MetricsRecorder()).run()
+
+        [run] = self.ledger.recent()
+        self.assertEqual((run.run_id, run.status, run.fetched, run.inserted), (result.run_id, "ok", 25, 25))
+        self.assertLessEqual({"download", "parse", "transform", "persist"}, set(run.timings))
+        self.assertEqual(run.counters, {"pages": 1, "bytes_downloaded": feed.stat().st_size})
+        exported = self.textfile.read_text(encoding="utf-8")
+        self.assertIn('tenderloin_capture_last_run_success{source="placsp"} 1', exported)
+        self.assertIn('tenderloin_capture_last_run_rows{source="placsp",outcome="inserted"} 25', exported)
+        self.assertTrue(exported.endswith("# EOF\n"))
+
+    def test_failed_run_is_recorded_and_disabled_metrics_stay_empty(self) -> None:
+        service = self._service(f"file://{self.tmp / 'missing.xml'}", NULL_METRICS)
+
+        with self.assertRaises(FileNotFoundError):
+            service.run()
+
+        [run] = self.ledger.recent()
+        self.assertEqual(run.status, "failed")
+        self.assertIn("FileNotFoundError", run.error)
+        self.assertEqual((run.timings, run.counters), ({}, {}))
+        self.assertIsNone(service.state_store.get_last_run_at())
+        self.assertIn('tenderloin_capture_last_run_success{source="placsp"} 0', self.textfile.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
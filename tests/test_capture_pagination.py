@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import io
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from email.message import Message
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from app.capture.pagination import PagePrefetcher, PageStream
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.transport import HttpResponse
+
+
+def _write_page(path: Path, entry_ids: list[str], updated: str, next_href: Optional[str]) -> None:
+    next_link = f'<link rel="next" href="{next_href}" />' if next_href else ""
+    entries = "".join(
+        f"<entry><id>{entry_id}</id><title>{entry_id}</title><updated>{updated}</updated></entry>"
+        for entry_id in entry_ids
+    )
+    path.write_text(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<feed xmlns="http://www.w3.org/2005/Atom"><link rel="self" href="{path.name}" />{next_link}{entries}</feed>',
+        encoding="utf-8",
+    )
+
+
+class _PagesTransport:
+    """Serve fixed page bodies by URL and record the requests."""
+
+    def __init__(self, pages: Dict[str, bytes]) -> None:
+        self.pages = pages
+        self.requested: List[str] = []
+
+    @contextmanager
+    def open(self, url: str, headers: Mapping[str, str]) -> Iterator[HttpResponse]:
+        self.requested.append(url)
+        yield HttpResponse(url=url, status=200, headers=Message(), body=io.BytesIO(self.pages[url]))
+
+    def close(self) -> None:
+        pass
+
+
+class CapturePaginationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.folder = Path(self._tmpdir.name)
+        _write_page(self.folder / "page1.xml", ["a1", "a2"], "2026-01-10T09:00:00Z", "page2.xml")
+        _write_page(self.folder / "page2.xml", ["b1"], "2026-01-08T09:00:00Z", "page3.xml")
+        _write_page(self.folder / "page3.xml", ["c1"], "2026-01-05T09:00:00Z", "page4.xml")
+        _write_page(self.folder / "page4.xml", ["d1"], "2026-01-01T09:00:00Z", None)
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _client(self, **overrides: object) -> PlacspClient:
+        config = PlacspClientConfig(source_url=f"file://{self.folder / 'page1.xml'}", **overrides)
+        return PlacspClient(config)
+
+    def test_without_since_reads_only_the_first_page_by_default(self) -> None:
+        ids = [tender.external_id for tender in self._client().iter_since(None)]
+
+        self.assertEqual(ids, ["a1", "a2"])
+
+    def test_follows_next_links_until_a_page_is_older_than_since(self) -> None:
+        since = datetime(2026, 1, 9, tzinfo=timezone.utc)
+
+        ids = [tender.external_id for tender in self._client(prefetch_pages=3).iter_since(since)]
+
+        self.assertEqual(ids, ["a1", "a2", "b1"])
+
+    def test_max_pages_walks_the_whole_chain_in_order(self) -> None:
+        ids = [tender.external_id for tender in self._client(max_pages=10, prefetch_pages=2).iter_since(None)]
+
+        self.assertEqual(ids, ["a1", "a2", "b1", "c1", "d1"])
+
+    def test_pagination_loop_is_not_walked_twice(self) -> None:
+        _write_page(self.folder / "page2.xml", ["b1"], "2026-01-08T09:00:00Z", "page1.xml")
+
+        ids = [tender.external_id for tender in self._client(max_pages=10).iter_since(None)]
+
+        self.assertEqual(ids, ["a1", "a2", "b1"])
+
+
+    def test_remote_pages_do_not_follow_next_links_to_local_files(self) -> None:
+        page = self.folder / "remote.xml"
+        _write_page(page, ["r1"], "2026-01-10T09:00:00Z", f"file://{self.folder / 'page2.xml'}")
+        transport = _PagesTransport({"https://feed.test/atom": page.read_bytes()})
+        client = PlacspClient(PlacspClientConfig(source_url="https://feed.test/atom", max_pages=10), transport=transport)
+
+        ids = [tender.external_id for tender in client.iter_since(None)]
+
+        self.assertEqual(ids, ["r1"])
+        self.assertEqual(transport.requested, ["https://feed.test/atom"])
+
+class PagePrefetcherTests(unittest.TestCase):
+    def test_prefetched_pages_buffer_a_bounded_number_of_chunks(self) -> None:
+        produced = {"page1": 0, "page2": 0}
+        page2_blocked = threading.Event()
+
+        def fetch(url: str, on_next_link, stream: PageStream) -> None:
+            on_next_link("page2" if url == "page1" else None)
+            for index in range(50):
+                if url == "page2" and produced[url] == 3:
+                    page2_blocked.set()
+                stream.put(f"{url}:{index};".encode())
+                produced[url] += 1
+
+        with PagePrefetcher(fetch, "page1", depth=2, buffer_chunks=3) as prefetcher:
+            pages = iter(prefetcher)
+            url, first = next(pages)
+            self.assertTrue(page2_blocked.wait(5))
+            # The second page waits for its parser once its buffer is full.
+            self.assertLessEqual(produced["page2"], 4)
+            self.assertEqual(len(b"".join(first).split(b";")) - 1, 50)
+            url, second = next(pages)
+            self.assertEqual(url, "page2")
+            self.assertEqual(len(b"".join(second).split(b";")) - 1, 50)
+
+    def test_download_errors_surface_in_the_page_stream(self) -> None:
+        def fetch(url: str, on_next_link, stream: PageStream) -> None:
+            on_next_link(None)
+            stream.put(b"partial")
+            raise OSError("connection reset")
+
+        with PagePrefetcher(fetch, "page1") as prefetcher:
+            (_, stream), = list(prefetcher)
+            chunks = iter(stream)
+            self.assertEqual(next(chunks), b"partial")
+            with self.assertRaises(OSError):
+                next(chunks)
+
+
+if __name__ == "__main__":
+    unittest.main()
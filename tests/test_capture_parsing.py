@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+import unittest
+
+from app.capture.normalize import iso_date_column, parse_amount, parse_amount_column, parse_datetime
+
+
+class ParseDatetimeTests(unittest.TestCase):
+    def test_feed_and_archive_formats(self) -> None:
+        utc = timezone.utc
+        cases = {
+            "2026-01-10T09:00:00Z": datetime(2026, 1, 10, 9, tzinfo=utc),
+            "2026-01-10T09:00:00.123+01:00": datetime(2026, 1, 10, 9, 0, 0, 123000, tzinfo=timezone(timedelta(hours=1))),
+            "2026-02-10": datetime(2026, 2, 10),
+            " 2026-02-10 ": datetime(2026, 2, 10),
+            "10/02/2026": datetime(2026, 2, 10),
+            "1/2/2026 13:45": datetime(2026, 2, 1, 13, 45),
+            "Tue, 10 Feb 2026 09:00:00 GMT": datetime(2026, 2, 10, 9, tzinfo=utc),
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_datetime(text), expected, text)
+
+    def test_unrecognised_values_are_none(self) -> None:
+        for value in ("", None, "mañana", "31/02/2026", "2026-13-01", 20260210):
+            self.assertIsNone(parse_datetime(value), value)  # type: ignore[arg-type]
+
+
+class ParseAmountTests(unittest.TestCase):
+    def test_plain_and_spanish_amounts(self) -> None:
+        cases = {
+            "125000.50": 125000.5,
+            "1.234.567,89": 1234567.89,
+            "1.234.567,89 €": 1234567.89,
+            "1 000,5\xa0€": 1000.5,
+            "350,25": 350.25,
+            "abc": None,
+            "": None,
+            None: None,
+            42: 42.0,
+        }
+        for value, expected in cases.items():
+            self.assertEqual(parse_amount(value), expected, value)
+
+    def test_column_treats_nan_as_blank(self) -> None:
+        self.assertEqual(parse_amount_column(["1.000,00", float("nan"), 7.5]), [1000.0, None, 7.5])
+
+
+class IsoDateColumnTests(unittest.TestCase):
+    def test_mixed_spreadsheet_cells(self) -> None:
+        values = ["10/02/2026", "10/02/2026", datetime(2026, 3, 1, 12), date(2026, 3, 2), float("nan"), None, "n/d", "2026-04-01"]
+
+        self.assertEqual(
+            iso_date_column(values),
+            ["2026-02-10", "2026-02-10", "2026-03-01", "2026-03-02", None, None, None, "2026-04-01"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.migrations import MIGRATIONS, SCHEMA_VERSION_KEY, apply_migrations
+from app.capture.normalize import normalize_cpv_prefix, normalize_region_code
+from app.capture.storage import RawTenderRepository
+from app.filtering.hard_filter import SELECT_BATCH_SQL, HardFilter, HardFilterConfig
+
+
+class CaptureSchemaTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(db_path)
+        self.repo = RawTenderRepository(db_path, database=self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def test_migrations_are_versioned_and_idempotent(self) -> None:
+        with self.database.transaction() as conn:
+            version = conn.execute("SELECT value FROM pipeline_state WHERE key = ?", (SCHEMA_VERSION_KEY,)).fetchone()
+            self.assertEqual(apply_migrations(conn), int(version[0]))
+        self.assertEqual(int(version[0]), MIGRATIONS[-1].version)
+
+    def test_normalisers(self) -> None:
+        self.assertEqual(normalize_cpv_prefix("79341000-7"), "79341")
+        self.assertEqual(normalize_cpv_prefix("79000000"), "79")
+        self.assertEqual(normalize_cpv_prefix("sin código"), "")
+        self.assertEqual(normalize_region_code(" es300 "), "ES300")
+        self.assertEqual(normalize_region_code("Comunidad de Madrid"), "")
+
+    def test_triage_indexes_are_dropped(self) -> None:
+        with self.database.connection() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+        self.assertFalse(indexes & {"idx_tenders_raw_triage", "idx_tenders_raw_deadline", "idx_tenders_raw_cpv_prefix"})
+        self.assertIn("idx_tenders_raw_published", indexes)
+
+    def test_hard_filter_batches_are_served_by_updated_at_index(self) -> None:
+        HardFilter(self.repo.db_path, HardFilterConfig(), database=self.database)
+        with self.database.connection() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {SELECT_BATCH_SQL}", ("", 0, 5000)))
+
+        self.assertIn("SEARCH tenders_raw USING INDEX idx_tenders_raw_updated_at", plan)
+        self.assertNotIn("SCAN tenders_raw", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.search import TenderSearch, to_fts_query
+from app.capture.storage import RawTenderRepository
+
+
+def _tender(external_id: str, title: str, region: str = "ES300", cpv: str = "79341000") -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title=title,
+        summary="Servicio para el ayuntamiento",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 2, 1, tzinfo=timezone.utc),
+        buyer_name="",
+        region=region,
+        cpv=cpv,
+        budget_amount=None,
+    )
+
+
+class TenderSearchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(db_path)
+        self.repo = RawTenderRepository(db_path, database=self.database)
+        self.search = TenderSearch(db_path, database=self.database)
+        self.repo.upsert_many(
+            [
+                _tender("a", "Campaña de comunicación institucional"),
+                _tender("b", "Comunicación y relaciones públicas", region="ES511"),
+                _tender("c", "Suministro de mobiliario", cpv="39100000"),
+            ],
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def test_search_ignores_accents_and_highlights_matches(self) -> None:
+        hits = self.search.search("comunicacion")
+
+        self.assertEqual({hit.external_id for hit in hits}, {"a", "b"})
+        self.assertIn("[comunicación]", hits[0].snippet.lower())
+
+    def test_filters_apply_region_and_cpv_prefixes(self) -> None:
+        self.assertEqual([hit.external_id for hit in self.search.search("comunicación", region="ES3")], ["a"])
+        self.assertEqual(self.search.search("servicio", cpv="391")[0].external_id, "c")
+
+    def test_index_follows_updated_titles(self) -> None:
+        renamed = _tender("c", "Suministro de material de comunicación")
+        self.repo.upsert_many([renamed], datetime(2026, 1, 2, tzinfo=timezone.utc))
+
+        self.assertEqual({hit.external_id for hit in self.search.search("comunicación")}, {"a", "b", "c"})
+        self.assertEqual(self.search.search("mobiliario"), [])
+
+    def test_deadline_filter_compares_instants_across_offsets(self) -> None:
+        madrid = timezone(timedelta(hours=1))
+        late = _tender("d", "Comunicación municipal")
+        late.deadline_at = datetime(2026, 2, 1, 0, 30, tzinfo=madrid)  # 2026-01-31T23:30Z
+        self.repo.upsert_many([late], datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+        hits = self.search.search("comunicación", deadline_to=datetime(2026, 1, 31, 23, 45, tzinfo=timezone.utc))
+
+        self.assertEqual([hit.external_id for hit in hits], ["d"])
+
+    def test_free_text_is_quoted_for_fts(self) -> None:
+        self.assertEqual(to_fts_query('comunicación "AND" rel*'), '"comunicación" "AND" "rel"*')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+from app.capture.database import Database
+from app.capture.metrics import MetricsRecorder
+from app.capture.sources import DEFAULT_SOURCES_FILE, CaptureScheduler, SourcesFailed, load_sources
+from app.capture.state_store import StateStore
+from app.capture.transport import RateLimiter
+from benchmarks.feed_generator import atom_feed, json_feed
+
+
+class SourcesConfigTests(unittest.TestCase):
+    def test_shipped_sources_file_loads_with_distinct_state_keys(self) -> None:
+        config = load_sources(DEFAULT_SOURCES_FILE)
+
+        self.assertGreaterEqual(len(config.sources), 2)
+        self.assertEqual(config.sources[0].state_key, "capture")
+        self.assertEqual(len({source.state_key for source in config.sources}), len(config.sources))
+
+    def test_repeated_names_and_unknown_formats_are_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "sources.json"
+            for sources in (
+                [{"name": "a", "url": "file:///a"}, {"name": "a", "url": "file:///b"}],
+                [{"name": "a", "url": "file:///a", "format": "csv"}],
+            ):
+                path.write_text(json.dumps({"sources": sources}), encoding="utf-8")
+                with self.assertRaises(ValueError):
+                    load_sources(path)
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_requests_are_spaced_to_the_configured_rate(self) -> None:
+        limiter = RateLimiter(rate=20, burst=1)
+
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+
+class CaptureSchedulerTests(unittest.TestCase):
+    def test_sources_run_in_parallel_with_isolated_failures_and_state(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            (tmp / "placsp.xml").write_bytes(atom_feed(30, seed=1))
+            (tmp / "regional.json").write_bytes(json_feed(20, seed=2))
+            sources_file = tmp / "sources.json"
+            sources_file.write_text(
+                json.dumps(
+                    {
+                        "max_connections": 2,
+                        "sources": [
+                            {"name": "placsp", "url": f"file://{tmp / 'placsp.xml'}", "state_key": "capture"},
+                            {"name": "regional", "url": f"file://{tmp / 'regional.json'}", "format": "json"},
+                            {"name": "broken", "url": f"file://{tmp / 'missing.xml'}"},
+                            {"name": "off", "url": f"file://{tmp / 'missing.xml'}", "enabled": False},
+                        ],
+                    }
+                ),
+                encoding="utf-8",
+            )
+            db_path = tmp / "capture.db"
+            database = Database(db_path)
+
+            results = {
+                item.name: item
+                for item in CaptureScheduler(db_path, load_sources(sources_file), database=database).run()
+            }
+            state = StateStore(db_path, database=database)
+            last_runs = [
+                state.get_last_run_at(f"{key}.last_successful_run_at")
+                for key in ("capture", "capture.regional", "capture.broken")
+            ]
+            with database.connection() as conn:
+                per_source = dict(conn.execute("SELECT source, COUNT(*) FROM tenders_raw GROUP BY source").fetchall())
+            database.close()
+
+        self.assertEqual(sorted(results), ["broken", "placsp", "regional"])
+        self.assertEqual((results["placsp"].result.inserted, results["regional"].result.inserted), (30, 20))
+        self.assertIn("FileNotFoundError", results["broken"].error)
+        self.assertEqual(per_source, {"placsp": 30, "regional": 20})
+        self.assertEqual([moment is not None for moment in last_runs], [True, True, False])
+
+    def test_daemon_polls_reuse_clients_and_fail_when_every_source_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            (tmp / "placsp.xml").write_bytes(atom_feed(10, seed=1))
+            sources_file = tmp / "sources.json"
+            sources_file.write_text(
+                json.dumps(
+                    {
+                        "sources": [
+                            {"name": "placsp", "url": f"file://{tmp / 'placsp.xml'}"},
+                            {"name": "broken", "url": f"file://{tmp / 'missing.xml'}"},
+                        ]
+                    }
+                ),
+                encoding="utf-8",
+            )
+            db_path = tmp / "capture.db"
+            database = Database(db_path)
+            built: List[MetricsRecorder] = []
+
+            def metrics_factory() -> MetricsRecorder:
+                # Called once per source as its transport, client and service are built.
+                built.append(MetricsRecorder())
+                return built[-1]
+
+            scheduler = CaptureScheduler(
+                db_path, load_sources(sources_file), metrics_factory=metrics_factory, database=database
+            )
+
+            first = scheduler.poll()
+            second = scheduler.poll()
+            (tmp / "placsp.xml").unlink()
+            with self.assertRaises(SourcesFailed):
+                scheduler.poll()
+            scheduler.close()
+            database.close()
+
+        self.assertEqual((first, second), (10, 0))
+        self.assertEqual(len(built), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
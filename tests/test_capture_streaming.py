@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.service import CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+
+
+def _atom_feed(entry_count: int) -> str:
+    entries = "".join(
+        f"""
+  <entry>
+    <id>exp-{index:04d}</id>
+    <title>Contrato {index}</title>
+    <summary>Resumen {index}</summary>
+    <updated>2026-01-10T09:00:00Z</updated>
+    <link href="https://example.org/atom/{index}" />
+    <cbc:PartyName>Organismo {index}</cbc:PartyName>
+    <cbc:TotalAmount>1.000,{index % 100:02d}</cbc:TotalAmount>
+  </entry>"""
+        for index in range(entry_count)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">
+  <title>Feed</title>{entries}
+</feed>
+"""
+
+
+class CaptureStreamingTests(unittest.TestCase):
+    def test_iter_since_streams_entries_across_chunk_boundaries(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            payload_path = Path(tmpdir) / "feed.xml"
+            payload_path.write_text(_atom_feed(3000), encoding="utf-8")
+            self.assertGreater(payload_path.stat().st_size, 64 * 1024)
+
+            client = PlacspClient(PlacspClientConfig(source_url=f"file://{payload_path}"))
+            stream = client.iter_since(None)
+            first = next(stream)
+            rest = list(stream)
+
+            self.assertEqual(first.external_id, "exp-0000")
+            self.assertEqual(len(rest), 2999)
+            self.assertEqual(rest[-1].buyer_name, "Organismo 2999")
+            self.assertAlmostEqual(rest[-1].budget_amount or 0.0, 1000.99, places=2)
+
+    def test_capture_service_persists_in_bounded_batches(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            payload_path = Path(tmpdir) / "feed.xml"
+            payload_path.write_text(_atom_feed(25), encoding="utf-8")
+
+            db_path = Path(tmpdir) / "capture.db"
+            client = PlacspClient(PlacspClientConfig(source_url=f"file://{payload_path}"))
+            repo = RawTenderRepository(db_path, batch_size=4)
+            state = StateStore(db_path)
+            service = CaptureService(client=client, repository=repo, state_store=state, batch_size=10)
+
+            result = service.run()
+
+            self.assertEqual(result.fetched, 25)
+            self.assertEqual(result.inserted, 25)
+            with sqlite3.connect(db_path) as conn:
+                total = conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+            self.assertEqual(total, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.storage import TENDER_COLUMNS, RawTenderRepository
+from app.capture.tender_batch import TenderBatch
+from benchmarks.feed_generator import atom_feed
+
+CAPTURED_AT = datetime(2026, 3, 1, 6, 0, tzinfo=timezone.utc)
+MADRID_WINTER = timezone(timedelta(hours=1))
+
+
+def _edge_cases() -> List[TenderRaw]:
+    return [
+        TenderRaw(
+            external_id="con-offset",
+            title="Servicio de limpieza",
+            summary="Resumen",
+            link="https://example.org/1",
+            published_at=datetime(2026, 1, 5, 9, 30, 15, 250000, tzinfo=MADRID_WINTER),
+            deadline_at=datetime(2026, 2, 1, 14, 0, tzinfo=MADRID_WINTER),
+            buyer_name="Ayuntamiento de Madrid",
+            region="ES300",
+            cpv="90910000-9",
+            budget_amount=120000.5,
+            cpv_codes=["90910000-9", "90911000-6"],
+            document_urls=["https://example.org/pcap.pdf"],
+        ),
+        TenderRaw(
+            external_id="sin-plazo",
+            title="Suministro",
+            summary="",
+            link="",
+            published_at=datetime(2026, 1, 6, 12, 0),
+            deadline_at=None,
+            buyer_name="Ayuntamiento de Madrid",
+            region="",
+            cpv="",
+            budget_amount=None,
+            source="archivo",
+        ),
+        TenderRaw(
+            external_id="antiguo",
+            title="Obra",
+            summary="",
+            link="",
+            published_at=datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=timezone.utc),
+            deadline_at=datetime(2026, 2, 1, 14, 0, tzinfo=MADRID_WINTER),
+            buyer_name="Diputación",
+            region="ES300",
+            cpv="45000000-7",
+            budget_amount=0.0,
+        ),
+    ]
+
+
+class TenderBatchTests(unittest.TestCase):
+    def test_records_round_trip_exactly(self) -> None:
+        tenders = _edge_cases()
+
+        batch = TenderBatch.from_tenders(iter(tenders))
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(list(batch), tenders)
+        self.assertEqual(batch[-1], tenders[-1])
+        self.assertEqual(batch[0].published_at.isoformat(), tenders[0].published_at.isoformat())
+        self.assertIsNone(batch[1].published_at.tzinfo)
+        # Two buyers, "ES300", "", three CPV codes and two sources.
+        self.assertEqual(len(batch.strings), 9)
+        self.assertIs(batch[0].buyer_name, batch[1].buyer_name)
+
+    def test_upserting_a_batch_stores_the_same_rows_as_the_records(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url="file:///dev/null"))
+        tenders = client._parse_atom(atom_feed(120, seed=3).decode("utf-8")) + _edge_cases()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stored = []
+            for name, payload in (("records", tenders), ("batch", TenderBatch.from_tenders(tenders))):
+                db_path = Path(tmpdir) / f"{name}.db"
+                database = Database(db_path)
+                repository = RawTenderRepository(db_path, batch_size=50, database=database)
+                first = repository.upsert_many(payload, CAPTURED_AT)
+                again = repository.upsert_many(TenderBatch.from_tenders(tenders), CAPTURED_AT)
+                with database.connection() as conn:
+                    rows = conn.execute(f"SELECT {', '.join(TENDER_COLUMNS)} FROM tenders_raw ORDER BY id").fetchall()
+                stored.append(rows)
+                database.close()
+                self.assertEqual((first.inserted, again.unchanged), (len(tenders), len(tenders)))
+
+        self.assertEqual(stored[0], stored[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import gzip
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.capture.service import CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><id>exp-http-1</id><title>Contrato HTTP</title><updated>2026-01-10T09:00:00Z</updated></entry>
+</feed>
+"""
+ETAG = '"feed-v1"'
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: List[int] = []
+    statuses: List[int] = []
+    fail_first: int = 0
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections.append(self.client_address[1])
+
+    def do_GET(self) -> None:  # noqa: N802
+        handler = type(self)
+        if handler.fail_first:
+            handler.fail_first -= 1
+            self._reply(503, b"", {"Retry-After": "0"})
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self._reply(304, b"", {"ETag": ETAG})
+            return
+        body = FEED
+        headers = {"ETag": ETAG, "Content-Type": "application/atom+xml"}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._reply(200, body, headers)
+
+    def _reply(self, status: int, body: bytes, headers: dict) -> None:
+        type(self).statuses.append(status)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+class CaptureTransportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        _FeedHandler.connections = []
+        _FeedHandler.statuses = []
+        _FeedHandler.fail_first = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/feed.xml"
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmpdir.name) / "capture.db"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmpdir.cleanup()
+
+    def _service(self, client: PlacspClient) -> CaptureService:
+        return CaptureService(
+            client=client,
+            repository=RawTenderRepository(self.db_path),
+            state_store=StateStore(self.db_path),
+        )
+
+    def test_gzip_feed_is_decoded_and_connection_reused(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url=self.url))
+        try:
+            first = client.fetch_since(None)
+            second = client.fetch_since(None)
+        finally:
+            client.close()
+
+        self.assertEqual([tender.external_id for tender in first + second], ["exp-http-1", "exp-http-1"])
+        self.assertEqual(len(_FeedHandler.connections), 1)
+
+    def test_not_modified_feed_turns_run_into_noop(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url=self.url))
+        try:
+            first = self._service(client).run()
+            second = self._service(client).run()
+        finally:
+            client.close()
+
+        self.assertEqual(first.inserted, 1)
+        self.assertFalse(first.not_modified)
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.fetched, 0)
+        self.assertEqual(second.new_last_run_at, first.new_last_run_at)
+        self.assertEqual(StateStore(self.db_path).get_feed_validators().etag, ETAG)
+        self.assertEqual(_FeedHandler.statuses, [200, 304])
+
+    def test_retryable_status_is_retried_after_retry_after(self) -> None:
+        _FeedHandler.fail_first = 2
+        client = PlacspClient(PlacspClientConfig(source_url=self.url, retry_backoff_seconds=0.01))
+        try:
+            tenders = client.fetch_since(None)
+        finally:
+            client.close()
+
+        self.assertEqual(len(tenders), 1)
+        self.assertEqual(_FeedHandler.statuses, [503, 503, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from app.capture.database import Database
+from app.capture.models import FeedValidators, TenderRaw
+from app.capture.placsp_client import PlacspClientConfig
+from app.capture.service import CaptureService
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository, UpsertResult
+from app.capture.writer import SerialWriter
+
+
+def _tender(index: int) -> TenderRaw:
+    return TenderRaw(
+        external_id=f"exp-{index}",
+        title=f"Contrato {index}",
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=None,
+        buyer_name="",
+        region="",
+        cpv="",
+        budget_amount=None,
+    )
+
+
+class _SlowClient:
+    """Yields ``count`` tenders, sleeping per batch as if downloading and parsing, and can fail midway."""
+
+    def __init__(self, count: int, batch_size: int, delay: float = 0.0, fail_at: Optional[int] = None) -> None:
+        self.config = PlacspClientConfig(source_url="file:///dev/null")
+        self.count = count
+        self.batch_size = batch_size
+        self.delay = delay
+        self.fail_at = fail_at
+
+    def iter_since(self, since: Optional[datetime], validators: Optional[FeedValidators] = None) -> Iterator[TenderRaw]:
+        for index in range(self.count):
+            if index == self.fail_at:
+                raise ConnectionError("feed dropped")
+            if index % self.batch_size == 0:
+                time.sleep(self.delay)
+            yield _tender(index)
+
+
+class _SlowRepository(RawTenderRepository):
+    def __init__(self, *args: object, delay: float = 0.0, fail_on_call: Optional[int] = None, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.fail_on_call = fail_on_call
+        self.threads: List[str] = []
+
+    def upsert_many(self, tenders: List[TenderRaw], captured_at: datetime) -> UpsertResult:
+        self.threads.append(threading.current_thread().name)
+        if len(self.threads) == self.fail_on_call:
+            raise RuntimeError("disk full")
+        time.sleep(self.delay)
+        return super().upsert_many(tenders, captured_at)
+
+
+class SerialWriterTests(unittest.TestCase):
+    def test_jobs_run_in_order_and_the_first_failure_is_reraised(self) -> None:
+        done: List[int] = []
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        writer = SerialWriter(depth=1)
+        writer.submit(lambda: done.append(1))
+        writer.submit(fail)
+        writer.submit(lambda: done.append(3))
+        with self.assertRaises(ValueError):
+            writer.close()
+
+        self.assertEqual(done, [1])
+
+
+class OverlappedCaptureTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(self.db_path)
+        self.state_store = StateStore(self.db_path, database=self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _service(self, client: _SlowClient, repository: _SlowRepository) -> CaptureService:
+        return CaptureService(client, repository, self.state_store, batch_size=client.batch_size)  # type: ignore[arg-type]
+
+    def _stored(self) -> int:
+        with self.database.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tenders_raw").fetchone()[0]
+
+    def test_parse_and_persist_overlap_on_a_single_writer_thread(self) -> None:
+        repository = _SlowRepository(self.db_path, database=self.database, delay=0.1)
+        started = time.perf_counter()
+        result = self._service(_SlowClient(50, 10, delay=0.1), repository).run()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual((result.fetched, result.inserted, self._stored()), (50, 50, 50))
+        self.assertEqual(set(repository.threads), {"capture-writer"})
+        # Sequential would take ~1.0s (five batches x 0.1s produce + 0.1s write).
+        self.assertLess(elapsed, 0.85)
+        self.assertIsNotNone(self.state_store.get_last_run_at())
+
+    def test_failure_in_any_stage_keeps_the_watermark(self) -> None:
+        failing_writer = _SlowRepository(self.db_path, database=self.database, fail_on_call=2)
+        with self.assertRaises(RuntimeError):
+            self._service(_SlowClient(50, 10), failing_writer).run()
+        self.assertIsNone(self.state_store.get_last_run_at())
+
+        repository = _SlowRepository(self.db_path, database=self.database)
+        with self.assertRaises(ConnectionError):
+            self._service(_SlowClient(50, 10, fail_at=35), repository).run()
+        self.assertIsNone(self.state_store.get_last_run_at())
+        # Batches already written stay (queued ones may be dropped); the next run re-reads them anyway.
+        self.assertLessEqual(self._stored(), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
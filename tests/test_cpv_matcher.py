@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.capture.placsp_client import PlacspClient, PlacspClientConfig
+from app.filtering.cpv_matcher import CpvMatcher
+
+ATOM_WITH_LOTS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:cbc="urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2">
+  <entry>
+    <id>lot-tender</id>
+    <title>Campana institucional</title>
+    <summary>Lotes de creatividad y eventos</summary>
+    <updated>2026-01-01T10:00:00Z</updated>
+    <cbc:ItemClassificationCode>79341000</cbc:ItemClassificationCode>
+    <cbc:ItemClassificationCode>79952000</cbc:ItemClassificationCode>
+    <cbc:ItemClassificationCode>79341000</cbc:ItemClassificationCode>
+  </entry>
+</feed>
+"""
+
+
+class CpvMatcherTests(unittest.TestCase):
+    def test_hierarchy_and_exclusions(self) -> None:
+        matcher = CpvMatcher(include=["79340000", "72000000"], exclude=["72500000"])
+
+        self.assertTrue(matcher.match("79341000-7"))
+        self.assertTrue(matcher.match("79340000"))
+        self.assertTrue(matcher.match("72400000"))
+        self.assertFalse(matcher.match("72510000"))
+        self.assertFalse(matcher.match("79300000"))
+        self.assertFalse(matcher.match(""))
+        self.assertEqual(
+            matcher.match_column(["45000000 79341000", "45000000", "", "45000000 79341000"]),
+            [True, False, False, True],
+        )
+
+    def test_from_file_reads_agency_codes_and_exclusions(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "cpv.txt"
+            path.write_text(
+                "79340000 – Servicios de publicidad y marketing\n"
+                "- 79342000 – Servicios de marketing\n"
+                "sin código\n",
+                encoding="utf-8",
+            )
+            matcher = CpvMatcher.from_file(path)
+
+        self.assertEqual((matcher.include, matcher.exclude), (("7934",), ("79342",)))
+        self.assertFalse(matcher.match("79342200"))
+        self.assertIn("79416", CpvMatcher.from_file().include)
+
+    def test_atom_entries_keep_every_cpv(self) -> None:
+        client = PlacspClient(PlacspClientConfig(source_url="file:///dev/null"))
+
+        (tender,) = client._parse_page(ATOM_WITH_LOTS)
+
+        self.assertEqual(tender.cpv, "79341000")
+        self.assertEqual(tender.cpv_codes, ["79341000", "79952000"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+from app.filtering.dedup import MinHasher, TenderDeduplicator, estimated_jaccard, tender_shingles
+from app.filtering.hard_filter import HardFilter, HardFilterConfig
+
+BUYER = "Ayuntamiento de Alcobendas"
+TITLE = "Servicio de diseño, planificación y ejecución de la campaña de comunicación de las fiestas patronales 2026"
+
+
+def _tender(
+    external_id: str,
+    title: str = TITLE,
+    buyer: str = BUYER,
+    budget: Optional[float] = 60000.0,
+    source: str = "placsp",
+) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title=title,
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 2, 1, tzinfo=timezone.utc),
+        buyer_name=buyer,
+        region="ES300",
+        cpv="79341000",
+        budget_amount=budget,
+        source=source,
+    )
+
+
+class MinHashTests(unittest.TestCase):
+    def test_signature_similarity_tracks_jaccard(self) -> None:
+        hasher = MinHasher(64)
+        base = tender_shingles(TITLE, BUYER, 60000.0)
+        mirrored = tender_shingles(TITLE.upper() + ".", BUYER, 60500.0)
+        other = tender_shingles("Obras de pavimentación del polígono industrial", BUYER, 60000.0)
+
+        same = estimated_jaccard(hasher.signature(base), hasher.signature(mirrored))
+        different = estimated_jaccard(hasher.signature(base), hasher.signature(other))
+
+        self.assertEqual(same, 1.0)
+        self.assertLess(different, 0.4)
+        self.assertIsNone(hasher.signature([]))
+
+
+class TenderDeduplicatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(self.db_path)
+        self.repo = RawTenderRepository(self.db_path, database=self.database)
+        self.state_store = StateStore(self.db_path, database=self.database)
+        self.dedup = TenderDeduplicator(
+            self.db_path, state_store=self.state_store, database=self.database, batch_size=2
+        )
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _clusters(self) -> dict:
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT t.external_id, canonical.external_id
+                FROM tender_clusters AS c
+                JOIN tenders_raw AS t ON t.id = c.tender_id
+                JOIN tenders_raw AS canonical ON canonical.id = c.cluster_id
+                """
+            ).fetchall()
+        return dict(rows)
+
+    def test_republications_and_mirrors_share_a_canonical_tender(self) -> None:
+        first_run = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.repo.upsert_many(
+            [
+                _tender("placsp-1"),
+                _tender("other", title="Obras de pavimentación del polígono industrial"),
+                _tender("cat-1", title=TITLE + ".", budget=60500.0, source="contractaciopublica"),
+            ],
+            first_run,
+        )
+        first = self.dedup.run()
+        self.repo.upsert_many([_tender("placsp-1-republished")], datetime(2026, 1, 2, tzinfo=timezone.utc))
+        second = self.dedup.run()
+
+        self.assertEqual((first.processed, first.duplicates), (3, 1))
+        self.assertEqual((second.processed, second.duplicates), (1, 1))
+        self.assertEqual(
+            self._clusters(),
+            {"placsp-1": "placsp-1", "other": "other", "cat-1": "placsp-1", "placsp-1-republished": "placsp-1"},
+        )
+
+    def test_downstream_filter_only_sees_canonical_tenders(self) -> None:
+        self.repo.upsert_many(
+            [_tender("a"), replace(_tender("b"), source="mirror")],
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        self.dedup.run()
+
+        result = HardFilter(
+            self.db_path, HardFilterConfig(), state_store=self.state_store, database=self.database
+        ).run(datetime(2026, 1, 10, tzinfo=timezone.utc))
+
+        self.assertEqual((result.processed, result.passed), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import csv
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.storage import RawTenderRepository
+from app.export.columnar import FORMAT_CSV, HAS_PYARROW, ColumnarExporter
+from app.filtering.cpv_matcher import CpvMatcher
+from app.filtering.hard_filter import HardFilter, HardFilterConfig
+
+NOW = datetime(2026, 3, 10, tzinfo=timezone.utc)
+LATER = datetime(2026, 3, 11, tzinfo=timezone.utc)
+
+
+def _tender(external_id: str, published: datetime, title: str = "Contrato", region: str = "ES300") -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title=title,
+        summary="",
+        link="",
+        published_at=published,
+        deadline_at=datetime(2026, 4, 1, tzinfo=timezone.utc),
+        buyer_name="Ayuntamiento de Madrid",
+        region=region,
+        cpv="79341000-7",
+        budget_amount=50000.0,
+        document_urls=["https://example.org/pcap.pdf"],
+    )
+
+
+class ColumnarExporterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+        db_path = self.tmp / "capture.db"
+        self.database = Database(db_path)
+        self.repo = RawTenderRepository(db_path, database=self.database)
+        self.hard_filter = HardFilter(
+            db_path,
+            HardFilterConfig(cpv_matcher=CpvMatcher(["79340000"])),
+            database=self.database,
+        )
+        self.db_path = db_path
+        self.out_dir = self.tmp / "exports"
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _exporter(self, file_format: str = FORMAT_CSV) -> ColumnarExporter:
+        return ColumnarExporter(
+            self.db_path,
+            out_dir=self.out_dir,
+            file_format=file_format,
+            batch_size=2,
+            database=self.database,
+        )
+
+    def _partitions(self, dataset: str) -> List[str]:
+        return sorted(path.parent.name for path in (self.out_dir / dataset).glob("*/part-0.*"))
+
+    def _read_csv(self, dataset: str, month: str) -> List[dict]:
+        with (self.out_dir / dataset / f"published_month={month}" / "part-0.csv").open(encoding="utf-8") as handle:
+            return list(csv.DictReader(handle))
+
+    def test_only_partitions_with_changed_rows_are_rewritten(self) -> None:
+        january = datetime(2026, 1, 15, tzinfo=timezone.utc)
+        february = datetime(2026, 2, 3, tzinfo=timezone.utc)
+        self.repo.upsert_many(
+            [_tender(f"ene-{index}", january) for index in range(5)] + [_tender("feb-1", february)],
+            NOW,
+        )
+        self.hard_filter.run(now=NOW)
+
+        first = self._exporter().run()
+        january_file = self.out_dir / "tenders" / "published_month=2026-01" / "part-0.csv"
+        january_mtime = january_file.stat().st_mtime_ns
+        self.repo.upsert_many([_tender("feb-1", february, title="Contrato modificado")], LATER)
+        second = self._exporter().run()
+
+        self.assertEqual(set(first), {"tenders", "tenders_filtered"})
+        self.assertEqual((first["tenders"].written, first["tenders"].rows), (2, 6))
+        self.assertEqual((second["tenders"].written, second["tenders"].unchanged), (1, 1))
+        self.assertEqual((second["tenders_filtered"].written, second["tenders_filtered"].unchanged), (0, 2))
+        self.assertEqual(january_file.stat().st_mtime_ns, january_mtime)
+        self.assertEqual(self._partitions("tenders"), ["published_month=2026-01", "published_month=2026-02"])
+        rows = self._read_csv("tenders", "2026-01")
+        self.assertEqual([row["external_id"] for row in rows], [f"ene-{index}" for index in range(5)])
+        self.assertEqual(rows[0]["published_at"], "2026-01-15T00:00:00+00:00")
+        self.assertEqual(rows[0]["buyer_name"], "Ayuntamiento de Madrid")
+        self.assertEqual(self._read_csv("tenders", "2026-02")[0]["title"], "Contrato modificado")
+        self.assertEqual({row["passed_filter"] for row in self._read_csv("tenders_filtered", "2026-01")}, {"1"})
+
+    def test_rows_moving_to_another_month_rewrite_both_and_empty_partitions_are_removed(self) -> None:
+        self.repo.upsert_many([_tender("exp-1", datetime(2026, 1, 31, 23, 0, tzinfo=timezone.utc))], NOW)
+        self._exporter().run()
+
+        # The publication date alone does not count as a change; it moves along with one.
+        moved = _tender("exp-1", datetime(2026, 2, 1, 9, 0, tzinfo=timezone.utc), title="Contrato rectificado")
+        self.repo.upsert_many([moved], LATER)
+        result = self._exporter().run()["tenders"]
+
+        self.assertEqual((result.written, result.removed), (1, 1))
+        self.assertEqual(self._partitions("tenders"), ["published_month=2026-02"])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet_partitions_are_typed_and_dictionary_encoded(self) -> None:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        january = datetime(2026, 1, 15, tzinfo=timezone.utc)
+        self.repo.upsert_many([_tender(f"exp-{index}", january) for index in range(3)], NOW)
+        self._exporter("parquet").run()
+
+        dataset = ds.dataset(self.out_dir / "tenders", format="parquet", partitioning="hive")
+        table = dataset.to_table(filter=ds.field("published_month") == "2026-01")
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.schema.field("published_at").type, pa.timestamp("s", tz="UTC"))
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("buyer_name").type))
+        self.assertEqual(table.column("document_urls").to_pylist()[0], ["https://example.org/pcap.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.state_store import StateStore
+from app.capture.storage import RawTenderRepository
+from app.filtering.cpv_matcher import CpvMatcher
+from app.filtering.hard_filter import WATERMARK_KEY, HardFilter, HardFilterConfig
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def _tender(
+    external_id: str,
+    region: str = "ES300",
+    budget: Optional[float] = 50000.0,
+    deadline_day: int = 20,
+    cpv: str = "79341000-7",
+) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title="Contrato",
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=datetime(2026, 1, deadline_day, tzinfo=timezone.utc),
+        buyer_name="",
+        region=region,
+        cpv=cpv,
+        budget_amount=budget,
+    )
+
+
+class HardFilterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(db_path)
+        self.repo = RawTenderRepository(db_path, database=self.database)
+        self.state_store = StateStore(db_path, database=self.database)
+        self.hard_filter = HardFilter(
+            db_path,
+            HardFilterConfig(cpv_matcher=CpvMatcher(["79340000", "79950000"]), batch_size=2),
+            state_store=self.state_store,
+            database=self.database,
+        )
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def _reasons(self) -> dict:
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT t.external_id, f.passed_filter, f.discard_reason
+                FROM tenders_filtered AS f JOIN tenders_raw AS t ON t.id = f.tender_id
+                """
+            ).fetchall()
+        return {external_id: (passed, reason) for external_id, passed, reason in rows}
+
+    def test_each_rule_records_first_failing_reason(self) -> None:
+        self.repo.upsert_many(
+            [
+                _tender("ok"),
+                _tender("free-text-madrid", region="Comunidad de Madrid"),
+                _tender("expired", deadline_day=5, region="ES618"),
+                _tender("seville", region="ES618", budget=1000.0),
+                _tender("small", budget=40000.0),
+                _tender("no-budget", budget=None),
+                _tender("works", cpv="45000000"),
+                replace(_tender("works-with-pr-lot", cpv="45000000"), cpv_codes=["45000000", "79952000"]),
+            ],
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+
+        result = self.hard_filter.run(NOW)
+
+        self.assertEqual(
+            self._reasons(),
+            {
+                "ok": (1, None),
+                "free-text-madrid": (1, None),
+                "expired": (0, "deadline"),
+                "seville": (0, "region"),
+                "small": (0, "budget"),
+                "no-budget": (0, "budget"),
+                "works": (0, "cpv"),
+                "works-with-pr-lot": (1, None),
+            },
+        )
+        self.assertEqual((result.processed, result.passed), (8, 3))
+        self.assertEqual(result.discarded, {"deadline": 1, "region": 1, "budget": 2, "cpv": 1})
+
+    def test_only_new_or_changed_rows_are_reprocessed(self) -> None:
+        self.repo.upsert_many([_tender("a"), _tender("b")], datetime(2026, 1, 1, tzinfo=timezone.utc))
+        first = self.hard_filter.run(NOW)
+        nothing = self.hard_filter.run(NOW)
+
+        self.repo.upsert_many(
+            [replace(_tender("a"), budget_amount=1000.0), _tender("b"), _tender("c")],
+            datetime(2026, 1, 2, tzinfo=timezone.utc),
+        )
+        second = self.hard_filter.run(NOW)
+
+        self.assertEqual((first.processed, nothing.processed, second.processed), (2, 0, 2))
+        self.assertEqual(self._reasons(), {"a": (0, "budget"), "b": (1, None), "c": (1, None)})
+        self.assertEqual(self.state_store.get_watermark(WATERMARK_KEY), second.watermark)
+
+    def test_rows_committed_by_a_running_capture_below_the_watermark_are_not_skipped(self) -> None:
+        self.repo.upsert_many([_tender("a")], datetime(2026, 1, 1, tzinfo=timezone.utc))
+        self.hard_filter.run(NOW)
+        # A capture commits its first batch, with a higher id, before re-sending "a" under the same stamp.
+        captured_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        self.state_store.mark_capture_running("capture", captured_at.isoformat())
+        self.repo.upsert_many([_tender("b")], captured_at)
+        during = self.hard_filter.run(NOW)
+        self.repo.upsert_many([replace(_tender("a"), budget_amount=1000.0)], captured_at)
+        self.state_store.clear_capture_running("capture")
+
+        after = self.hard_filter.run(NOW)
+
+        self.assertEqual(during.processed, 1)
+        self.assertEqual(self._reasons(), {"a": (0, "budget"), "b": (1, None)})
+        self.assertEqual(after.processed, 2)
+        self.assertEqual(self.hard_filter.run(NOW).processed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
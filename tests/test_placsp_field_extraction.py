@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import unittest
+from xml.etree import ElementTree as ET
+
+from app.capture.placsp_client import _ENTRY_FIELDS
+from benchmarks.bench_field_extraction import _per_field_scans, build_entry
+
+
+class EntryFieldExtractorTests(unittest.TestCase):
+    def test_single_pass_matches_per_field_scans(self) -> None:
+        entry = build_entry(lots=5)
+
+        fields, _ = _ENTRY_FIELDS.extract(entry)
+
+        expected = {field: value for field, value in _per_field_scans(entry).items() if value}
+        self.assertEqual(fields, expected)
+        self.assertEqual(fields["cpv"], "79341000")
+        self.assertEqual(fields["budget"], "125.000,50")
+
+    def test_first_non_empty_candidate_in_document_order_wins(self) -> None:
+        entry = ET.fromstring(
+            """<entry xmlns:cbc="urn:cbc">
+  <cbc:CPVCode>   </cbc:CPVCode>
+  <cbc:EndDate>2026-03-01</cbc:EndDate>
+  <cbc:ItemClassificationCode>79340000</cbc:ItemClassificationCode>
+  <cbc:DeadlineDate>2026-02-01</cbc:DeadlineDate>
+  <cbc:cpv>72000000</cbc:cpv>
+</entry>"""
+        )
+
+        fields, _ = _ENTRY_FIELDS.extract(entry)
+
+        self.assertEqual(fields["cpv"], "79340000")
+        self.assertEqual(fields["deadline"], "2026-03-01")
+        self.assertNotIn("budget", fields)
+
+
+    def test_documents_come_only_from_document_reference_external_references(self) -> None:
+        entry = ET.fromstring(
+            """<entry xmlns:cac="urn:cac" xmlns:cbc="urn:cbc">
+  <cac:ContractingParty><cac:ExternalReference><cbc:URI>https://perfil</cbc:URI></cac:ExternalReference></cac:ContractingParty>
+  <cac:LegalDocumentReference>
+    <cbc:URI>https://no-attachment</cbc:URI>
+    <cac:Attachment><cac:ExternalReference><cbc:URI>https://pcap.pdf</cbc:URI></cac:ExternalReference></cac:Attachment>
+  </cac:LegalDocumentReference>
+  <cac:AdditionalDocumentReference>
+    <cac:Attachment><cac:ExternalReference><cbc:URI>https://anexo.pdf</cbc:URI></cac:ExternalReference></cac:Attachment>
+  </cac:AdditionalDocumentReference>
+</entry>"""
+        )
+
+        fields, lists = _ENTRY_FIELDS.extract(entry)
+
+        self.assertEqual(lists["documents"], ["https://pcap.pdf", "https://anexo.pdf"])
+        self.assertEqual(fields["documents"], "https://pcap.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
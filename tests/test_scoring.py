@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.capture.database import Database
+from app.capture.models import TenderRaw
+from app.capture.storage import RawTenderRepository
+from app.scoring.features import TfidfVectorizer, normalize_text
+from app.scoring.model import REVIEW_SCORE, load_model, load_training_csv, save_model, train_model
+from app.scoring.scorer import TenderScorer
+
+TRAINING = [
+    ("Campaña de comunicación institucional y publicidad en medios", 5.0),
+    ("Servicio de comunicación y relaciones con medios de prensa", 5.0),
+    ("Diseño gráfico y campaña de publicidad para la promoción turística", 4.0),
+    ("Organización de eventos y producción audiovisual", 4.0),
+    ("Obras de pavimentación de calles y aceras", 1.0),
+    ("Suministro de material de limpieza para colegios", 1.0),
+    ("Mantenimiento de ascensores en edificios municipales", 1.0),
+    ("Obras de reforma del pabellón y pavimentación", 1.0),
+]
+
+
+def _tender(external_id: str, title: str) -> TenderRaw:
+    return TenderRaw(
+        external_id=external_id,
+        title=title,
+        summary="",
+        link="",
+        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        deadline_at=None,
+        buyer_name="",
+        region="ES300",
+        cpv="79341000",
+        budget_amount=50000.0,
+    )
+
+
+class AffinityModelTests(unittest.TestCase):
+    def setUp(self) -> None:
+        texts, scores = zip(*TRAINING)
+        self.model = train_model(list(texts), list(scores), vectorizer=TfidfVectorizer(min_df=1))
+
+    def test_features_fold_accents_and_batch_scores_match_vectors(self) -> None:
+        texts = ["Campaña de COMUNICACION institucional", "Obras de pavimentación", "zzz"]
+
+        scores = self.model.score_texts(texts)
+
+        self.assertEqual(normalize_text("Comunicación Ñandú"), "comunicacion nandu")
+        for fast, slow in zip(scores, self.model.predict(self.model.vectorizer.transform(texts))):
+            self.assertAlmostEqual(fast, slow)
+        self.assertGreater(scores[0], 3.5)
+        self.assertLess(scores[1], 2.0)
+        self.assertEqual(scores[2], REVIEW_SCORE)
+
+    def test_artifact_round_trip_is_hash_checked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "model.json"
+            digest = save_model(self.model, path)
+            loaded = load_model(path)
+            self.assertEqual(loaded.content_hash, digest)
+            self.assertEqual(loaded.score_texts(["campaña de publicidad"]), self.model.score_texts(["campaña de publicidad"]))
+
+            path.write_text(path.read_text(encoding="utf-8").replace('"intercept":', '"intercept":1', 1), encoding="utf-8")
+            with self.assertRaises(ValueError):
+                load_model(path)
+
+    def test_training_csv_skips_unscored_and_review_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "historico.csv"
+            path.write_text(
+                "\ufeffSourceFile,Objeto,Score\n"
+                "20260102_Licitaciones.xlsx,Segunda,4\n"
+                "20260101_Licitaciones.xlsx,Primera,2\n"
+                "20260101_Licitaciones.xlsx,Sin puntuar,\n"
+                "20260101_Licitaciones.xlsx,Revisar,0\n",
+                encoding="utf-8",
+            )
+
+            self.assertEqual(load_training_csv(path), (["Primera", "Segunda"], [2.0, 4.0]))
+
+
+class TenderScorerTests(unittest.TestCase):
+    def test_scores_only_new_or_changed_rows(self) -> None:
+        texts, scores = zip(*TRAINING)
+        model = train_model(list(texts), list(scores), vectorizer=TfidfVectorizer(min_df=1))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "capture.db"
+            model_path = Path(tmpdir) / "model.json"
+            save_model(model, model_path)
+            database = Database(db_path)
+            repo = RawTenderRepository(db_path, database=database)
+            scorer = TenderScorer(db_path, model_path=model_path, database=database, batch_size=1)
+
+            repo.upsert_many(
+                [_tender("a", "Campaña de publicidad institucional"), _tender("b", "Obras de pavimentación")],
+                datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+            first = scorer.run()
+            again = scorer.run()
+            repo.upsert_many(
+                [replace(_tender("a", "Campaña de publicidad institucional"), title="Obras de pavimentación")],
+                datetime(2026, 1, 2, tzinfo=timezone.utc),
+            )
+            changed = scorer.run()
+
+            with database.connection() as conn:
+                levels = dict(
+                    conn.execute(
+                        "SELECT t.external_id, s.score_level FROM tenders_scored AS s JOIN tenders_raw AS t ON t.id = s.tender_id"
+                    ).fetchall()
+                )
+            database.close()
+
+        self.assertEqual((first.scored, again.scored, changed.scored), (2, 0, 1))
+        self.assertEqual(first.model_hash, model.content_hash)
+        # "a" now carries the same text as "b", so its rescored level matches.
+        self.assertEqual(levels["a"], levels["b"])
+        self.assertLessEqual(levels["b"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
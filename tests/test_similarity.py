@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.capture.database import Database
+from app.scoring.similarity import HistoricTender, SimilarityIndex, load_historic_tenders
+
+HISTORY = [
+    HistoricTender("Campaña de publicidad institucional en medios", "Ayuntamiento de Madrid", 5.0, "a.xlsx"),
+    HistoricTender("Organización de las fiestas patronales", "Ayuntamiento de Getafe", 4.0, "a.xlsx"),
+    HistoricTender("Obras de pavimentación de calles", "Ayuntamiento de Leganés", 1.0, "a.xlsx"),
+]
+
+
+class SimilarityIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = Path(self._tmpdir.name) / "capture.db"
+        self.database = Database(db_path)
+        self.index = SimilarityIndex(db_path, database=self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+        self._tmpdir.cleanup()
+
+    def test_batched_top_k_queries(self) -> None:
+        self.index.add(HISTORY)
+
+        results = self.index.similar(
+            ["Campaña de PUBLICIDAD en medios", "pavimentación de calles del centro", "zzz"],
+            k=2,
+        )
+
+        self.assertEqual([hit.organismo for hit in results[0]][:1], ["Ayuntamiento de Madrid"])
+        self.assertEqual(results[0][0].score, 5.0)
+        self.assertEqual([hit.score for hit in results[1]], [1.0])
+        self.assertEqual(results[2], [])
+        self.assertGreater(results[0][0].similarity, 0.5)
+
+    def test_append_indexes_only_new_documents(self) -> None:
+        self.assertEqual(self.index.add(HISTORY[:2]), 2)
+        rescored = HistoricTender(HISTORY[0].objeto, HISTORY[0].organismo, 3.0, "a.xlsx")
+
+        self.assertEqual(self.index.add([rescored, HISTORY[2], HISTORY[2]]), 1)
+
+        self.assertEqual(len(self.index), 3)
+        (hit,) = self.index.similar(["pavimentación de calles"], k=1)[0]
+        self.assertEqual(hit.organismo, "Ayuntamiento de Leganés")
+        self.assertEqual(self.index.similar(["publicidad institucional"], k=1)[0][0].score, 3.0)
+
+    def test_loads_historic_csv(self) -> None:
+        documents = load_historic_tenders()
+
+        self.assertGreater(len(documents), 500)
+        self.assertTrue(all(document.objeto for document in documents))
+
+
+if __name__ == "__main__":
+    unittest.main()